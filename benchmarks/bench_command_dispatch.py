@@ -0,0 +1,58 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Time taken to find the plugin of the commands typed in the shell, by
+faraday_plugins' CommandAnalyzer and by the CommandDispatchIndex.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_command_dispatch --rounds 50
+"""
+import time
+import argparse
+
+from faraday_plugins.plugins.manager import PluginsManager, CommandAnalyzer
+
+from faraday_client.plugins.command_dispatch import CommandDispatchIndex
+
+# Mostly commands without a plugin, as in a real shell
+COMMANDS = [
+    'ls -la', 'cd /tmp', 'git status', 'vim notes.txt', 'cat /etc/hosts', 'grep -r password .',
+    'nmap -sV 10.0.0.1', 'sudo nmap -p 80 10.0.0.0/24', 'python3 dirsearch.py -u http://example.com',
+    'ping -c 1 8.8.8.8', 'hydra -l admin -P words.txt ssh://10.0.0.1', 'whois example.com',
+]
+
+
+def timed(function, rounds):
+    start = time.monotonic()
+    for _ in range(rounds):
+        plugins = [function(command) for command in COMMANDS]
+    return [plugin and plugin.id for plugin in plugins], (time.monotonic() - start) / rounds / len(COMMANDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    plugins_manager = PluginsManager()
+    analyzer = CommandAnalyzer(plugins_manager)
+    start = time.monotonic()
+    index = CommandDispatchIndex(plugins_manager)
+    print('index built in {0:.3f}s'.format(time.monotonic() - start))
+
+    expected, analyzer_seconds = timed(analyzer.get_plugin, args.rounds)
+    dispatched, index_seconds = timed(index.get_plugin, args.rounds)
+    assert dispatched == expected, list(zip(COMMANDS, expected, dispatched))
+    print('{0:>15} {1:>12}'.format('', 'per command'))
+    for name, seconds in (('CommandAnalyzer', analyzer_seconds), ('index', index_seconds)):
+        print('{0:>15} {1:>10.3f}ms'.format(name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
+
+
+# I'm Py3
@@ -0,0 +1,80 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Memory taken and time spent creating the vulns of a big workspace and
+reading their names, with the regular models, the compact ones
+(models.get_all_vulns(compact=True)) and the lazy ones (lazy=True).
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_compact_models --vulns 200000
+"""
+import gc
+import time
+import argparse
+import tracemalloc
+
+from faraday_client.persistence.server import models
+
+
+def vuln_row(index):
+    """A vuln like the server sends them"""
+    return {'id': index, 'key': index, 'value': {
+        '_id': index,
+        'id': index,
+        'name': 'Vuln {0}'.format(index % 500),
+        'desc': 'Description of vuln {0}'.format(index % 500),
+        'description': 'Description of vuln {0}'.format(index % 500),
+        'severity': ('info', 'low', 'medium', 'high', 'critical')[index % 5],
+        'status': ''.join(['op', 'en']),  # a new string for every vuln, like json does
+        'refs': [],
+        'confirmed': False,
+        'resolution': '',
+        'data': '',
+        'owner': '',
+        'owned': False,
+        'parent': index // 10,
+        'parent_type': 'Host',
+        'policyviolations': [],
+        'metadata': {'creator': '', 'owner': '', 'create_time': 0, 'update_time': 0},
+        'type': ('Vulnerability', 'VulnerabilityWeb')[index % 2],
+    }}
+
+
+def measure(rows, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    start = time.monotonic()
+    vulns = models._get_faraday_ready_vulns('benchmark', rows, **kwargs)
+    for vuln in vulns:
+        vuln.name
+    elapsed = time.monotonic() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vulns
+    return size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vulns', type=int, default=50000)
+    args = parser.parse_args()
+
+    rows = [vuln_row(index) for index in range(args.vulns)]
+    print('{0:>8} {1:>10} {2:>14} {3:>10}'.format('models', 'vulns', 'bytes per vuln', 'seconds'))
+    results = {}
+    for name, kwargs in [('regular', {}), ('compact', {'compact': True}), ('lazy', {'lazy': True})]:
+        results[name] = measure(rows, **kwargs)
+        size, elapsed = results[name]
+        print('{0:>8} {1:>10} {2:>14.0f} {3:>10.3f}'.format(name, args.vulns, size / args.vulns, elapsed))
+    print('compact vulns take {0:.0%} less memory, lazy ones are built {1:.0f} times faster'.format(
+        1 - results['compact'][0] / results['regular'][0], results['regular'][1] / results['lazy'][1]))
+
+
+if __name__ == '__main__':
+    main()
+
+
+# I'm Py3
@@ -0,0 +1,107 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+How long a plugin is blocked creating objects through the ModelController,
+and how long until they are all saved, with a server answering in
+--latency seconds.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_model_ids --hosts 10 --services 5 --vulns 10
+"""
+import time
+import argparse
+import threading
+from queue import Queue
+from unittest import mock
+
+from faraday_client.model import Modelactions
+from faraday_client.model.controller import ModelController
+
+
+class SlowMappersManager:
+    """Answers like the server would, after latency seconds."""
+
+    def __init__(self, latency):
+        self.workspace_name = 'benchmark'
+        self.latency = latency
+        self.requests = 0
+        self._ids = iter(range(1, 10 ** 9))
+        self._lock = threading.Lock()
+
+    def _request(self):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            return next(self._ids)
+
+    def save(self, obj, command_id=None):
+        return self._request()
+
+    def bulk_save(self, data):
+        self._request()
+        return {}
+
+    def find(self, class_signature, obj_id):
+        return None
+
+
+def run(batch_size, hosts, services, vulns, latency):
+    mappers_manager = SlowMappersManager(latency)
+    controller = ModelController(mappers_manager, Queue(), batch_size=batch_size, batch_window=0.05)
+    controller.start()
+    objects = []
+    start = time.monotonic()
+    for host_index in range(hosts):
+        host = controller.newHost('10.0.{0}.{1}'.format(host_index // 256, host_index % 256))
+        controller.add_action((Modelactions.ADDHOST, host))
+        objects.append(host)
+        for port in range(services):
+            service = controller.newService('srv', 'tcp', [port], parent_id=host.getID())
+            controller.add_action((Modelactions.ADDSERVICEHOST, service))
+            objects.append(service)
+            for vuln_index in range(vulns):
+                vuln = controller.newVuln('vuln {0}'.format(vuln_index), severity='low',
+                                          parent_id=service.getID())
+                vuln.setParentType('Service')
+                controller.add_action((Modelactions.ADDVULNSRV, vuln))
+                objects.append(vuln)
+    created = time.monotonic() - start
+    for obj in objects:
+        obj.id_future.result()
+    saved = time.monotonic() - start
+    controller.stop()
+    controller.join()
+    return {
+        'objects': len(objects),
+        'requests': mappers_manager.requests,
+        'creation_seconds': created,
+        'saved_seconds': saved,
+        'objects_per_second': len(objects) / saved if saved else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=10)
+    parser.add_argument('--services', type=int, default=5)
+    parser.add_argument('--vulns', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.005)
+    args = parser.parse_args()
+
+    print('{0:>10} {1:>8} {2:>9} {3:>12} {4:>10} {5:>10}'.format(
+        'batch size', 'objects', 'requests', 'plugin wait', 'all saved', 'objects/s'))
+    with mock.patch('faraday_client.model.controller.notifier'):
+        for batch_size in (1, 500):
+            result = run(batch_size, args.hosts, args.services, args.vulns, args.latency)
+            print('{0:>10} {objects:>8} {requests:>9} {creation_seconds:>11.3f}s '
+                  '{saved_seconds:>9.3f}s {objects_per_second:>10.0f}'.format(batch_size, **result))
+
+
+if __name__ == '__main__':
+    main()
+
+
+# I'm Py3
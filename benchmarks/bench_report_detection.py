@@ -0,0 +1,90 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Time taken to find the plugin of every report of a drop folder, by
+faraday_plugins' ReportAnalyzer and by the ReportDetectionIndex.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_report_detection --reports 2000
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+from faraday_plugins.plugins.manager import PluginsManager, ReportAnalyzer
+
+from faraday_client.plugins.report_detection import ReportDetectionIndex
+
+REPORTS = [
+    ('nmap.xml', b'<?xml version="1.0"?><nmaprun scanner="nmap">%s</nmaprun>',
+     b'<host><address addr="10.0.0.1"/></host>'),
+    ('scan.nessus', b'<?xml version="1.0" ?><NessusClientData_v2><Report>%s</Report></NessusClientData_v2>',
+     b'<ReportHost name="10.0.0.1"><ReportItem port="80"/></ReportHost>'),
+    ('burp.xml', b'<?xml version="1.0"?><issues burpVersion="2">%s</issues>',
+     b'<issue><name>XSS</name></issue>'),
+    ('inspector.json', None, {'findings': [{'title': 'finding'}] * 10}),
+    ('notes.txt', b'%s', b'some notes\n'),
+]
+
+
+def write_reports(directory, count, big_size):
+    paths = []
+    for index in range(count):
+        name, template, item = REPORTS[index % len(REPORTS)]
+        path = os.path.join(directory, '{0}_{1}'.format(index, name))
+        # One report of each kind is big
+        repeat = big_size // 64 if index < len(REPORTS) else 10
+        with open(path, 'wb') as report:
+            if template is None:
+                report.write(json.dumps(item).encode())
+            else:
+                report.write(template % (item * repeat))
+        paths.append(path)
+    return paths
+
+
+def timed(function, paths):
+    start = time.monotonic()
+    plugins = [function(path) for path in paths]
+    return [plugin and plugin.id for plugin in plugins], time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=1000)
+    parser.add_argument('--big-size', type=int, default=20 * 1024 * 1024,
+                        help='size in bytes of the biggest reports')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = write_reports(directory, args.reports, args.big_size)
+        plugins_manager = PluginsManager()
+        analyzer = ReportAnalyzer(plugins_manager)
+        start = time.monotonic()
+        index = ReportDetectionIndex(plugins_manager)
+        print('index built in {0:.3f}s'.format(time.monotonic() - start))
+
+        expected, analyzer_seconds = timed(analyzer.get_plugin, paths)
+        detected, index_seconds = timed(index.get_plugin, paths)
+        assert detected == expected, [(path, a, b) for path, a, b in zip(paths, expected, detected) if a != b]
+        _, cached_seconds = timed(index.get_plugin, paths)
+        print('{0:>14} {1:>10} {2:>14}'.format('', 'total', 'per report'))
+        for name, seconds in (('ReportAnalyzer', analyzer_seconds), ('index', index_seconds),
+                              ('index cached', cached_seconds)):
+            print('{0:>14} {1:>9.3f}s {2:>12.3f}ms'.format(name, seconds, seconds / len(paths) * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
+
+
+# I'm Py3
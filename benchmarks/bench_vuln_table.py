@@ -0,0 +1,81 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Time taken by the filters of a VulnTable, compared with the same filters
+written as loops over compact Vuln objects.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_vuln_table --vulns 1000000
+"""
+import re
+import time
+import argparse
+
+from faraday_client.persistence.server import models
+from faraday_client.persistence.server.vuln_table import VulnTable
+
+NAMES = ['ssl-cert', 'ssl-date', 'Traceroute Information', 'TCP/IP Timestamps Supported',
+         'OS Identification', 'SQL Injection', 'XSS'] + ['Vuln {0}'.format(i) for i in range(2000)]
+REGEX = r"ssl\-cert|ssl\-date|Traceroute Information|TCP\/IP Timestamps Supported|OS Identification"
+
+
+def vuln_row(index):
+    return {'id': index, 'key': index, 'value': {
+        'id': index,
+        'name': NAMES[index % len(NAMES)],
+        'desc': '',
+        'severity': ('info', 'low', 'med', 'high', 'critical')[index % 5],
+        'status': ('open', 'closed', 're-opened')[index % 3],
+        'type': ('Vulnerability', 'VulnerabilityWeb')[index % 2],
+        'target': '10.0.{0}.{1}'.format(index // 256 % 256, index % 256),
+        'metadata': {'create_time': 1500000000 + index * 60},
+    }}
+
+
+def timed(function):
+    start = time.monotonic()
+    result = function()
+    return result, time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vulns', type=int, default=200000)
+    args = parser.parse_args()
+
+    rows = [vuln_row(index) for index in range(args.vulns)]
+    table, build_seconds = timed(lambda: VulnTable.from_rows(rows))
+    vulns = models._get_faraday_ready_vulns('benchmark', rows, compact=True)
+    threshold = 1500000000 + args.vulns * 30
+    regex = re.compile(REGEX)
+
+    filters = [
+        ('name regex', lambda: table.name_matches(REGEX).count(),
+         lambda: sum(1 for vuln in vulns if regex.search(vuln.name))),
+        ('severity set', lambda: table.severity_in({'high', 'critical'}).count(),
+         lambda: sum(1 for vuln in vulns if vuln.severity in {'high', 'critical'})),
+        ('old and open', lambda: (table.created_before(threshold) & ~table.status_in({'closed'})).count(),
+         lambda: sum(1 for vuln in vulns if vuln.status != 'closed' and
+                     vuln.getMetadata()['create_time'] < threshold)),
+        ('group by severity', lambda: len(table.group_by('severity')), None),
+    ]
+    print('table of {0} vulns built in {1:.3f}s'.format(len(table), build_seconds))
+    print('{0:>18} {1:>12} {2:>12}'.format('filter', 'table', 'objects'))
+    for name, table_filter, objects_filter in filters:
+        table_result, table_seconds = timed(table_filter)
+        if objects_filter is None:
+            print('{0:>18} {1:>11.4f}s {2:>12}'.format(name, table_seconds, '-'))
+            continue
+        objects_result, objects_seconds = timed(objects_filter)
+        assert table_result == objects_result, (name, table_result, objects_result)
+        print('{0:>18} {1:>11.4f}s {2:>11.4f}s'.format(name, table_seconds, objects_seconds))
+
+
+if __name__ == '__main__':
+    main()
+
+
+# I'm Py3
@@ -9,7 +9,7 @@ import threading
 import logging
 import base64
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from tornado.wsgi import WSGIContainer  # pylint: disable=import-error
 from tornado.httpserver import HTTPServer  # pylint: disable=import-error
 from tornado.ioloop import IOLoop  # pylint: disable=import-error
@@ -17,6 +17,9 @@ from tornado import gen # pylint: disable=import-error
 
 from faraday_client.config.configuration import getInstanceConfiguration
 from faraday_client.model.visitor import VulnsLookupVisitor
+from faraday_client.persistence.server import server
+from faraday_client.managers.outbox_manager import get_outbox_status
+from faraday_client.managers.parse_cache import get_parse_cache
 
 CONF = getInstanceConfiguration()
 
@@ -160,6 +163,30 @@ class ModelControllerAPI(RESTApi):
                             view_func=self.statusCheck,
                             methods=['GET']))
 
+        routes.append(Route(path='/status/metrics',
+                            view_func=self.statusMetrics,
+                            methods=['GET']))
+
+        routes.append(Route(path='/status/metrics/prometheus',
+                            view_func=self.statusMetricsPrometheus,
+                            methods=['GET']))
+
+        routes.append(Route(path='/status/pending_actions',
+                            view_func=self.statusPendingActions,
+                            methods=['GET']))
+
+        routes.append(Route(path='/status/outbox',
+                            view_func=self.statusOutbox,
+                            methods=['GET']))
+
+        routes.append(Route(path='/status/parse_cache',
+                            view_func=self.statusParseCache,
+                            methods=['GET']))
+
+        routes.append(Route(path='/status/identity_map',
+                            view_func=self.statusIdentityMap,
+                            methods=['GET']))
+
 
         return routes
 
@@ -285,6 +312,25 @@ class ModelControllerAPI(RESTApi):
     def statusCheck(self):
         return self.ok("Faraday API Status: OK")
 
+    def statusMetrics(self):
+        return self.ok(server.get_client_metrics())
+
+    def statusMetricsPrometheus(self):
+        return Response(server.get_client_metrics_prometheus(),
+                        mimetype='text/plain; version=0.0.4')
+
+    def statusPendingActions(self):
+        return self.ok(self.controller.getPendingActionsStats())
+
+    def statusOutbox(self):
+        return self.ok(get_outbox_status())
+
+    def statusParseCache(self):
+        return self.ok(get_parse_cache().stats())
+
+    def statusIdentityMap(self):
+        return self.ok(self.controller.getIdentityMapStats())
+
 
 class PluginControllerAPI(RESTApi):
     def __init__(self, plugin_controller):
@@ -3,49 +3,33 @@ Faraday Penetration Test IDE
 Copyright (C) 2016  Infobyte LLC (http://www.infobytesec.com/)
 See the file 'doc/LICENSE' for the license information
 """
-import requests
+import time
+
 from tqdm import tqdm
-from dateutil import parser
-from datetime import datetime
 
 from faraday_client.persistence.server import models
+from faraday_client.persistence.server.vuln_table import VulnTable, iter_vulns_by_id
 
 
 __description__ = 'Closes vulns from the current workspace if a certain time has passed'
 __prettyname__ = 'Close vulns if a certain time has passed'
 
 
-def get_vulns_from_workspace(session, url, workspace):
-    vulns = session.get('{url}/_api/v3/ws/{ws_name}/vulns'\
-                        .format(url=url, ws_name=workspace))
-
-    return vulns.json()
+def get_vulns_to_close(table, duration_time):
+    """Return the ids of the vulns of table created more than duration_time
+    seconds ago which aren't closed."""
+    old_vulns = table.created_before(time.time() - duration_time)
+    return table.ids(old_vulns & ~table.status_in({'closed'}))
 
 
-def close_vulns(session, url, workspace, vulns, duration_time):
+def close_vulns(workspace, vuln_ids):
     vuln_closed_count = 0
-    vulnerabilities = vulns['vulnerabilities']
-    with tqdm(total=len(vulnerabilities)) as progress_bar:
-        for vuln in vulnerabilities:
-            create_time = vuln['value']['metadata']['create_time']
-
-            # Convert date
-            # create_time[:-6] -> date without timezone
-            creation_date = parser.parse(create_time[:-6])
-            elapsed_time = datetime.now() - creation_date
-
-            # If elapsed time since creation is greater than duration time, the vuln will be closed
-            if elapsed_time.total_seconds() > duration_time and vuln['value']['status'] != 'closed':
-                vuln['value']['status'] = 'closed'
-                close = session.put('{url}/_api/v3/ws/{ws_name}/vulns/{vuln_id}'\
-                                    .format(url=url,
-                                            ws_name=workspace,
-                                            vuln_id=vuln['id']
-                                            ),
-                                    json=vuln['value']
-                                    )
-                vuln_closed_count += 1
-                progress_bar.update(1)
+    with tqdm(total=len(vuln_ids)) as progress_bar:
+        for vuln in iter_vulns_by_id(workspace, vuln_ids):
+            vuln.status = 'closed'
+            models.update_object(workspace, vuln.class_signature, vuln, None)
+            vuln_closed_count += 1
+            progress_bar.update(1)
 
     return vuln_closed_count
 
@@ -56,17 +40,8 @@ def main(workspace='', args=None, parser=None):
                         required=True)
     vuln_duration = parser.parse_args(args).vuln_duration
 
-    s = requests.Session()
-
-    url = models.server.SERVER_URL
-    data = {
-        "email": models.server.AUTH_USER,
-        "password": models.server.AUTH_PASS
-    }
-    login_response = s.post('{url}/_api/login'.format(url=url), data=data)
-
-    vulns = get_vulns_from_workspace(s, url, workspace)
-    vulns_closed = close_vulns(s, url, workspace, vulns, float(vuln_duration))
+    table = VulnTable.from_workspace(workspace)
+    vulns_closed = close_vulns(workspace, get_vulns_to_close(table, float(vuln_duration)))
 
     print("[+] {count} vulnerabilities closed in workspace '{ws}'".format(count=vulns_closed, ws=workspace))
     return 0, None
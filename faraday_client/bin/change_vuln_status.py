@@ -7,6 +7,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 from faraday_client.persistence.server.server_io_exceptions  import ResourceDoesNotExist
 from faraday_client.persistence.server import models
+from faraday_client.persistence.server.vuln_table import VulnTable, iter_vulns_by_id
 from faraday_client.utils.user_input import query_yes_no
 
 __description__ = 'Changes Vulns Status (to closed)'
@@ -18,7 +19,7 @@ def main(workspace='', args=None, parser=None):
     parsed_args = parser.parse_args(args)
 
     try:
-        vulns = models.get_all_vulns(workspace)
+        table = VulnTable.from_workspace(workspace)
     except ResourceDoesNotExist:
         print ("Invalid workspace name: ", workspace)
         return 1, None
@@ -27,23 +28,14 @@ def main(workspace='', args=None, parser=None):
         if not query_yes_no("Are you sure you want to change the status to closed of all the vulns in workspace %s" % workspace, default='no'):
             return 1, None
 
+    # Only the vulns which aren't closed are turned into objects
     count = 0
-    for vuln in vulns:
+    for vuln in iter_vulns_by_id(workspace, table.ids(~table.status_in({'closed'}))):
         old_status = vuln.status
-
-        # Valid status
-        if vuln.status != "closed":
-
-            vuln.status = "closed"
-            count += 1
-
-            if vuln.class_signature == "Vulnerability":
-                models.update_vuln(workspace, vuln)
-
-            elif vuln.class_signature == "VulnerabilityWeb":
-                models.update_vuln_web(workspace, vuln)
-
-            print (vuln.name, ": Status changed from", old_status,"to closed successfully")
+        vuln.status = "closed"
+        count += 1
+        models.update_object(workspace, vuln.class_signature, vuln, None)
+        print (vuln.name, ": Status changed from", old_status,"to closed successfully")
 
     print ("End of process:", count, "vulnerabilities changed to closed")
     return 0, None
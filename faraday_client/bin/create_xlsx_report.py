@@ -9,14 +9,12 @@ import os
 import re
 import sys
 import datetime
-import json
 
 try:
     import xlsxwriter
 except ImportError:
     xlsxwriter = None
 
-from requests import Session
 from tqdm import tqdm
 
 from faraday_client.persistence.server import models
@@ -208,10 +206,6 @@ def main(workspace='', args=None, parser=None):
         print('ImportError: XlsxWriter is not installed. Please install it by running: pip install xlsxwriter')
         return 0, None
 
-    session = Session()
-    session.post(models.server.SERVER_URL + '/_api/login', json={'email': models.server.AUTH_USER, 'password': models.server.AUTH_PASS})
-    vulns = session.get(models.server.SERVER_URL + '/_api/v3/ws/' + workspace + '/vulns')
-
     parser.add_argument('-o', '--output', help='Output xlsx file report', required=True)
     parsed_args = parser.parse_args(args)
     xls_output_file = parsed_args.output
@@ -233,9 +227,9 @@ def main(workspace='', args=None, parser=None):
 
         row = 2
 
-        vulns_dict = json.loads(vulns.content)
-        with tqdm(total=vulns_dict['count']) as pbar:
-            for index, value in enumerate(vulns_dict['vulnerabilities']):
+        # Every column of every vuln is written, they are walked page by page
+        with tqdm(total=models.get_vulns_number(workspace)) as pbar:
+            for index, value in enumerate(models.server.iter_vulns(workspace)):
                 vuln = csv_escape(value['value'])
                 # Writing order
                 worksheet.write(row, 1, index + 1, content_center_format)
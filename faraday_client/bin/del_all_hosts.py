@@ -23,9 +23,11 @@ def main(workspace='', args=None, parser=None):
                    workspace))
         if input(msg) not in ('y', 'yes'):
             return 1, None
-    for host in models.get_hosts(workspace):
-        print('Delete Host:' + host.name)
-        models.delete_host(workspace, host.id)
+    # Deleting while walking the pages would shift them, keep only the ids
+    hosts = [(host.id, host.name) for host in models.iter_hosts(workspace, compact=True)]
+    for host_id, host_name in hosts:
+        print('Delete Host:' + host_name)
+        models.delete_host(workspace, host_id)
     return 0, None
 
 
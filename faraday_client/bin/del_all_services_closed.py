@@ -19,10 +19,12 @@ def main(workspace='', args=None, parser=None):
                             "workspace %s" % workspace, default='no'):
             return 1, None
 
-    for service in models.get_services(workspace):
-        if service.status != 'open' and service.status != 'opened':
-            print('Deleted service: ' + service.name)
-            models.delete_service(workspace, service.id)
+    # Deleting while walking the pages would shift them, keep only the ids
+    services = [(service.id, service.name) for service in models.iter_services(workspace)
+                if service.status != 'open' and service.status != 'opened']
+    for service_id, service_name in services:
+        print('Deleted service: ' + service_name)
+        models.delete_service(workspace, service_id)
     return 0, None
 
 
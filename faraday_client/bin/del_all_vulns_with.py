@@ -7,8 +7,8 @@ from __future__ import absolute_import
 from __future__ import print_function
 from builtins import input
 
-import re
 from faraday_client.persistence.server import models
+from faraday_client.persistence.server.vuln_table import VulnTable
 
 __description__ = "Delete all vulnerabilities matched with regex"
 __prettyname__ = "Delete all vulnerabilities with (...)"
@@ -29,10 +29,12 @@ def main(workspace='', args=None, parser=None):
         if input(msg) not in ('y', 'yes'):
             return 1, None
 
-    for vuln in models.get_all_vulns(workspace):
-        if re.findall(parsed_args.regex, vuln.name, ) != []:
-            print("Delete Vuln: " + vuln.name)
-            models.delete_vuln(workspace, vuln.id)
+    # Deleting while walking the pages would shift them, keep only the ids
+    table = VulnTable.from_workspace(workspace)
+    matching = table.name_matches(parsed_args.regex)
+    for vuln_id, vuln_name in zip(table.ids(matching), table.values('name', matching)):
+        print("Delete Vuln: " + vuln_name)
+        models.delete_vuln(workspace, vuln_id)
     return 0, None
 
 
@@ -18,7 +18,6 @@ import requests
 
 from subprocess import Popen, PIPE, call
 from faraday_client.persistence.server import models, server
-from faraday_client.persistence.server.server import SERVER_URL
 
 __description__ = 'Script to perform a brute force attack on different services in a workspace'
 __prettyname__ = 'FBrute'
@@ -66,7 +65,7 @@ def search_hosts_by_service(workspace, b_service):
 
 def total_credentials(workspace):
     json_creds = server._get(
-        SERVER_URL + "/_api/v3/ws/%s/credential" % workspace)
+        server._create_server_api_url() + "/ws/%s/credential" % workspace)
 
     return len(json_creds["rows"])
 
@@ -75,7 +74,7 @@ def get_credentials(workspace, key):
     credentials = ""
 
     json_creds = server._get(
-        SERVER_URL + "/_api/v3/ws/%s/credential" % workspace)
+        server._create_server_api_url() + "/ws/%s/credential" % workspace)
 
     if len(json_creds["rows"]) > 0:
 
@@ -93,7 +92,7 @@ def show_table_services(workspace):
     table = ""
 
     j_parsed = server._get(
-        SERVER_URL + "/_api/v3/ws/%s/services/count?group_by=name" % workspace)
+        server._create_server_api_url() + "/ws/%s/services/count?group_by=name" % workspace)
 
     if len(j_parsed["groups"]) > 0:
 
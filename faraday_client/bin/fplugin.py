@@ -22,7 +22,7 @@ from colorama import Fore
 from faraday_client.config.configuration import getInstanceConfiguration
 from faraday_client.managers.mapper_manager import MapperManager
 from faraday_client.model.controller import ModelController
-from faraday_client.persistence.server.server import login_user
+from faraday_client.persistence.server.server import login_user, ServerClient, set_default_client
 
 CONF = getInstanceConfiguration()
 
@@ -84,10 +84,10 @@ def dispatch(args, unknown, user_help, username, password):
     # Get filename and import this
     loader = SourceFileLoader('module_fplugin', plugin_path)
     module_fplugin = loader.load_module()
-    module_fplugin.models.server.FARADAY_UP = False
-    module_fplugin.models.server.SERVER_URL = args.url
-    module_fplugin.models.server.AUTH_USER = username
-    module_fplugin.models.server.AUTH_PASS = password
+    set_default_client(ServerClient(args.url,
+                                    cookies=CONF.getFaradaySessionCookies(),
+                                    username=username,
+                                    password=password))
 
     call_main = getattr(module_fplugin, 'main', None)
 
@@ -13,7 +13,7 @@ __prettyname__ = "Get All IPs Interfaces"
 def main(workspace='', args=None, parser=None):
     ip_regex = re.compile("^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")
     not_matching_count = 0
-    for host in models.get_hosts(workspace):
+    for host in models.iter_hosts(workspace, compact=True):
         if re.match(ip_regex, host.ip):
             print(host.ip)
         else:
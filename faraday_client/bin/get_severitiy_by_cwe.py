@@ -11,6 +11,8 @@ import json
 import requests
 
 from faraday_client.persistence.server import models
+from faraday_client.persistence.server.server_io_exceptions import CantCommunicateWithServerError
+from faraday_client.persistence.server.vuln_table import VulnTable, iter_vulns_by_id
 
 __description__ = 'Get Vulns filtered by Severity and change Severity based in CWE'
 __prettyname__ = 'Get Severity By CWE'
@@ -61,43 +63,15 @@ def getCweData(couch_url):
         print('Error couchDB: ' + str(response_code) + str(r.text))
 
 
-def checkSeverity(vuln, cwe_dict, severity_choose, workspace, couch_url):
-    severity_dict = {
-        'unclassified': 0,
-        'info': 1,
-        'low': 2,
-        'med': 3,
-        'high': 4,
-        'critical': 5,
-        'all': 100
-    }
-
-    if vuln._name in cwe_dict and severity_dict[vuln.severity] <= severity_dict[severity_choose]:
-
-        print('Change: ' + vuln._name + ' to ' + cwe_dict[vuln._name])
-
-        # Get object Vuln
-        response = requests.get(
-            models.server.SERVER_URL + '/' + workspace + '/' + str(vuln._id)
-        )
-        vulnWeb = response.json()
-
-        # Change severity
-        vulnWeb['severity'] = cwe_dict[vuln._name]
-
-        # Put changes...
-        headers = {'Content-Type': 'application/json'}
-        update = requests.put(
-            couch_url + '/' + workspace + '/' + vuln._id,
-            headers=headers,
-            data=json.dumps(vulnWeb)
-        )
-
-        if update.status_code == 200 or update.status_code == 201:
-            print('Change OK\n')
-        else:
-            print('Error in update Vulnerability, status code: ' + str(update.status_code))
-            print(update.text)
+def checkSeverity(vuln, cwe_dict, workspace):
+    print('Change: ' + vuln.name + ' to ' + cwe_dict[vuln.name])
+    vuln.severity = vuln.standarize(cwe_dict[vuln.name])
+    try:
+        models.update_object(workspace, vuln.class_signature, vuln, None)
+    except CantCommunicateWithServerError as error:
+        print('Error in update Vulnerability: ' + str(error))
+    else:
+        print('Change OK\n')
 
 
 def main(workspace='', args=None, parser=None):
@@ -112,14 +86,15 @@ def main(workspace='', args=None, parser=None):
         print('CWE DB not downloaded....EXIT')
         return 2, None
 
-    for host in models.get_hosts(workspace):
-        for v in host.getVulns():
-            checkSeverity(v, cwe, parsed_args.severity, workspace, parsed_args.couchdb)
+    table = VulnTable.from_workspace(workspace)
+    selected = table.where('name', cwe.__contains__)
+    if parsed_args.severity != 'all':
+        # SEVERITY_OPTIONS goes from the lowest to the highest
+        severities = SEVERITY_OPTIONS[:SEVERITY_OPTIONS.index(parsed_args.severity) + 1]
+        selected &= table.severity_in(severities)
 
-        for i in host.getAllInterfaces():
-            for s in i.getAllServices():
-                for v in s.getVulns():
-                    checkSeverity(v, cwe, parsed_args.severity, workspace, parsed_args.couchdb)
+    for vuln in iter_vulns_by_id(workspace, table.ids(selected)):
+        checkSeverity(vuln, cwe, workspace)
 
     return 0, None
 
@@ -17,7 +17,7 @@ def main(workspace='', args=None, parser=None):
 
     parsed_args = parser.parse_args(args)
 
-    for host in models.get_hosts(workspace):
+    for host in models.iter_hosts(workspace, compact=True):
 
         if not parsed_args.os_filter or (parsed_args.os_filter and host.os in parsed_args.os_filter):
             print('%s\t%s' % (host.name, host.os))
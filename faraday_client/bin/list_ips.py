@@ -19,7 +19,7 @@ def main(workspace='', args=None, parser=None):
 
     ips = []
 
-    for host in models.get_hosts(workspace):
+    for host in models.get_hosts(workspace, compact=True):
 
         if parsed_args.sorted:
             ips += [host.name]
@@ -19,7 +19,7 @@ def main(workspace='', args=None, parser=None):
 
     host_count = {}
 
-    for host in models.get_hosts(workspace):
+    for host in models.iter_hosts(workspace, compact=True):
 
         if parsed_args.unique:
             if host.os in host_count:
@@ -0,0 +1,47 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+from faraday_client.managers.outbox_manager import get_outbox, OutboxFlusher
+
+__description__ = 'Show the data waiting in the outbox to be sent to the server'
+__prettyname__ = 'Outbox Status'
+
+
+def main(workspace='', args=None, parser=None):
+    parser.add_argument('--flush', help='Try to send the queued data now.', action='store_true')
+    parser.add_argument('--retry-failed', help='Queue again the data the server rejected.',
+                        action='store_true')
+
+    parsed_args = parser.parse_args(args)
+
+    outbox = get_outbox()
+    if parsed_args.retry_failed:
+        print('Queued again: {0}'.format(outbox.retry_dead_letters()))
+    if parsed_args.flush:
+        flusher = OutboxFlusher(outbox)
+        while flusher.flush():
+            pass
+
+    status = outbox.stats()
+    print('Outbox: {0}'.format(status['path']))
+    print('Queued: {0}'.format(status['depth']))
+    for kind, count in sorted(status['by_kind'].items()):
+        print('  {0}: {1}'.format(kind, count))
+    if status['depth']:
+        print('Oldest entry: {0:.0f} seconds ago'.format(status['oldest_age']))
+        print('Next attempt in: {0:.0f} seconds'.format(status['next_attempt_in']))
+    if status['last_error']:
+        print('Last error: {0}'.format(status['last_error']))
+    if status['dead_letters']:
+        print('Failed: {0} (queue them again with --retry-failed)'.format(status['dead_letters']))
+        print('Last failure: {0}'.format(status['last_dead_letter_error']))
+
+    return 0, None
+
+
+# I'm Py3
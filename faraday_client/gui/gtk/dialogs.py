@@ -19,6 +19,7 @@ from faraday_client.start_client import FARADAY_CLIENT_BASE
 gi.require_version('Gtk', '3.0')
 
 from faraday_client.persistence.server.server import ResourceDoesNotExist
+from faraday_client.persistence.server.models import prefetch
 from gi.repository import Gtk, GdkPixbuf, Gdk  # pylint: disable=import-error
 from faraday_client.config.configuration import getInstanceConfiguration
 from faraday_client.persistence.server.server import (
@@ -878,7 +879,9 @@ class HostInfoDialog(Gtk.Window):
         self.set_modal(True)
         self.connect("key_press_event", key_reactions)
 
-        self.host = host
+        # The services and vulns of the host in two requests, instead of
+        # one per service selected in the tree
+        self.host = prefetch([host], 'services', 'vulns')[0]
         self.model = self.create_model(self.host)
         host_info = self.model[0]
 
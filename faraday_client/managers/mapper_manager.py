@@ -3,8 +3,15 @@ Faraday Penetration Test IDE
 Copyright (C) 2013  Infobyte LLC (http://www.infobytesec.com/)
 See the file 'doc/LICENSE' for the license information
 """
+import time
 import logging
+import threading
+from collections import OrderedDict
+
+from faraday_client.model.id_future import TemporaryID
 from faraday_client.persistence.server.models import create_object, get_object, update_object, delete_object
+from faraday_client.persistence.server.server import bulk_create
+from faraday_client.persistence.server.changes_stream import add_change_listener
 
 # NOTE: This class is intended to be instantiated by the
 # service or controller that needs it.
@@ -13,33 +20,142 @@ from faraday_client.persistence.server.models import create_object, get_object,
 # be unique too (they have identity maps for every model object)
 logger = logging.getLogger(__name__)
 
+IDENTITY_MAP_MAX_OBJECTS = 10000
+# Objects are read again from the server after IDENTITY_MAP_TTL seconds,
+# which bounds how stale they can be when no changes stream is connected
+IDENTITY_MAP_TTL = 30
+
+
+class IdentityMap:
+    """An LRU of the objects of a workspace by (class_signature, id), with
+    a TTL.
+
+    Ids are compared as strings, and an id is invalidated in every class,
+    as vulns and web vulns share them and the changes stream doesn't always
+    name the type as the class_signature.
+    """
+
+    def __init__(self, max_objects=None, ttl=None):
+        self.max_objects = max_objects if max_objects is not None else IDENTITY_MAP_MAX_OBJECTS
+        self.ttl = ttl if ttl is not None else IDENTITY_MAP_TTL
+        # (class_signature, id) -> (stored at, object)
+        self._objects = OrderedDict()
+        self._class_signatures = set()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0,
+                          'invalidations': 0}
+
+    def __len__(self):
+        return len(self._objects)
+
+    def get(self, class_signature, obj_id):
+        key = (class_signature, str(obj_id))
+        with self._lock:
+            entry = self._objects.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            stored_at, obj = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._objects[key]
+                self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._objects.move_to_end(key)
+            self._counters['hits'] += 1
+            return obj
+
+    def put(self, class_signature, obj_id, obj):
+        if obj_id is None or isinstance(obj_id, TemporaryID) or self.max_objects <= 0:
+            return
+        key = (class_signature, str(obj_id))
+        with self._lock:
+            self._objects.pop(key, None)
+            self._objects[key] = (time.monotonic(), obj)
+            self._class_signatures.add(class_signature)
+            while len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def invalidate(self, obj_id):
+        obj_id = str(obj_id)
+        with self._lock:
+            for class_signature in self._class_signatures:
+                if self._objects.pop((class_signature, obj_id), None) is not None:
+                    self._counters['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._counters['invalidations'] += len(self._objects)
+            self._objects.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, objects=len(self._objects),
+                         max_objects=self.max_objects, ttl=self.ttl)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
 
 class MapperManager:
-    def __init__(self):
+    def __init__(self, identity_map=None):
         # create and store the datamappers
         self.workspace_name = None
         self.session = None
+        self.identity_map = identity_map if identity_map is not None else IdentityMap()
+        # Objects changed by other clients are read again from the server
+        add_change_listener(self._on_change)
+
+    def _on_change(self, workspace_name, change):
+        if workspace_name != self.workspace_name:
+            return
+        if change is None:
+            self.identity_map.clear()
+        elif change.get('id') is not None:
+            self.identity_map.invalidate(change['id'])
 
     def createMappers(self, workpace_name):
+        if workpace_name != self.workspace_name:
+            self.identity_map.clear()
         self.workspace_name = workpace_name
 
     def save(self, obj, command_id=None):
         saved_raw_obj = create_object(self.workspace_name, obj.class_signature, obj, command_id)
         if '_id' in saved_raw_obj or 'id' in saved_raw_obj:
-            return saved_raw_obj.get('_id', None) or saved_raw_obj['id']
+            obj_id = saved_raw_obj.get('_id', None) or saved_raw_obj['id']
+            self.identity_map.put(obj.class_signature, obj_id, obj)
+            return obj_id
         raise RuntimeError('Could not retrieve id from server.')
 
+    def bulk_save(self, data):
+        """Create the hosts, services, vulns and credentials of a bulk_create
+        payload in one request."""
+        return bulk_create(self.workspace_name, data)
+
     def update(self, obj, command_id=None):
+        # If it fails, the server keeps a version which isn't obj
+        self.identity_map.invalidate(obj.getID())
         if update_object(self.workspace_name, obj.class_signature, obj, command_id):
+            self.identity_map.put(obj.class_signature, obj.getID(), obj)
             return True
         return False
 
     def find(self, class_signature, obj_id):
         if self.workspace_name is None:
             logger.warning('No workspace detected. please call createMappers first.')
-        return get_object(self.workspace_name, class_signature, obj_id)
+        obj = self.identity_map.get(class_signature, obj_id)
+        if obj is None:
+            obj = get_object(self.workspace_name, class_signature, obj_id)
+            if obj is not None:
+                self.identity_map.put(class_signature, obj_id, obj)
+        return obj
 
     def remove(self, obj_id, class_signature):
+        self.identity_map.invalidate(obj_id)
         return delete_object(self.workspace_name, class_signature, obj_id)
 
+    def getIdentityMapStats(self):
+        return self.identity_map.stats()
+
 # I'm Py3
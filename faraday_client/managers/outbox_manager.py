@@ -0,0 +1,287 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+A durable outbox for the data which could not be sent to the server: plugin
+results and command updates are stored in a SQLite database under the
+faraday home and sent by OutboxFlusher once the server answers again.
+Entries the server rejects, or which fail too many times, are moved to a
+dead letters table, where they wait until they are retried by hand.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from threading import Thread
+from contextlib import contextmanager
+
+from faraday_client.config.constant import CONST_FARADAY_HOME_PATH
+from faraday_client.persistence.server.server import update_command_run
+from faraday_client.persistence.server.bulk_upload import BulkUploader
+from faraday_client.persistence.server.server_io_exceptions import (BulkUploadIncomplete,
+                                                                    ConflictInDatabase,
+                                                                    ResourceDoesNotExist,
+                                                                    ServerRequestException,
+                                                                    ServerUnavailable,
+                                                                    Unauthorized)
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PATH = os.path.join(CONST_FARADAY_HOME_PATH, 'outbox.sqlite')
+FLUSH_INTERVAL = 5
+FLUSH_BATCH_SIZE = 20
+FLUSH_BACKOFF_MAX = 300
+# About 8 hours of a server down with the maximum backoff
+OUTBOX_MAX_ATTEMPTS = 100
+# Client errors which may go away if the request is sent again later
+RETRYABLE_CLIENT_ERRORS = frozenset([408, 429])
+
+BULK_CREATE = 'bulk_create'
+COMMAND_UPDATE = 'command_update'
+
+
+class Outbox:
+    """The queue of requests waiting to be sent, stored in a SQLite database.
+
+    Every entry has a dedup key, a hash of its kind, workspace and payload:
+    queueing the same data twice keeps only one entry.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or OUTBOX_PATH
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with self._transaction() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS outbox ('
+                               'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                               'dedup_key TEXT UNIQUE NOT NULL, '
+                               'kind TEXT NOT NULL, '
+                               'workspace TEXT NOT NULL, '
+                               'payload TEXT NOT NULL, '
+                               'created REAL NOT NULL, '
+                               'attempts INTEGER NOT NULL DEFAULT 0, '
+                               'next_attempt REAL NOT NULL DEFAULT 0, '
+                               'last_error TEXT)')
+            connection.execute('CREATE TABLE IF NOT EXISTS dead_letters ('
+                               'id INTEGER PRIMARY KEY, '
+                               'dedup_key TEXT UNIQUE NOT NULL, '
+                               'kind TEXT NOT NULL, '
+                               'workspace TEXT NOT NULL, '
+                               'payload TEXT NOT NULL, '
+                               'created REAL NOT NULL, '
+                               'attempts INTEGER NOT NULL, '
+                               'failed REAL NOT NULL, '
+                               'last_error TEXT)')
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            try:
+                with connection:
+                    yield connection
+            finally:
+                connection.close()
+
+    def put(self, kind, workspace, payload):
+        """Queue payload. Return False if it was already queued."""
+        payload = json.dumps(payload, sort_keys=True)
+        dedup_key = hashlib.sha256('\0'.join([kind, workspace, payload]).encode('utf-8')).hexdigest()
+        with self._transaction() as connection:
+            cursor = connection.execute('INSERT OR IGNORE INTO outbox '
+                                        '(dedup_key, kind, workspace, payload, created) '
+                                        'VALUES (?, ?, ?, ?, ?)',
+                                        (dedup_key, kind, workspace, payload, time.time()))
+            return cursor.rowcount == 1
+
+    def due(self, limit):
+        """Return up to limit entries which can be sent now, oldest first."""
+        with self._transaction() as connection:
+            rows = connection.execute('SELECT id, kind, workspace, payload, attempts FROM outbox '
+                                      'WHERE next_attempt <= ? ORDER BY id LIMIT ?',
+                                      (time.time(), limit)).fetchall()
+        return [dict(row, payload=json.loads(row['payload'])) for row in rows]
+
+    def ack(self, entry_id):
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+
+    def nack(self, entry_id, error, retry_in):
+        with self._transaction() as connection:
+            connection.execute('UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, '
+                               'last_error = ? WHERE id = ?',
+                               (time.time() + retry_in, str(error), entry_id))
+
+    def dead_letter(self, entry_id, error):
+        """Move the entry out of the queue, it won't be sent anymore unless
+        retry_dead_letters is called."""
+        with self._transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO dead_letters '
+                               '(id, dedup_key, kind, workspace, payload, created, attempts, failed, last_error) '
+                               'SELECT id, dedup_key, kind, workspace, payload, created, attempts + 1, ?, ? '
+                               'FROM outbox WHERE id = ?',
+                               (time.time(), str(error), entry_id))
+            connection.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+
+    def retry_dead_letters(self):
+        """Queue the dead letters again. Return how many were queued."""
+        with self._transaction() as connection:
+            cursor = connection.execute('INSERT OR IGNORE INTO outbox '
+                                        '(dedup_key, kind, workspace, payload, created) '
+                                        'SELECT dedup_key, kind, workspace, payload, created '
+                                        'FROM dead_letters ORDER BY id')
+            connection.execute('DELETE FROM dead_letters')
+            return cursor.rowcount
+
+    def depth(self):
+        with self._transaction() as connection:
+            return connection.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def stats(self):
+        with self._transaction() as connection:
+            by_kind = dict(connection.execute('SELECT kind, COUNT(*) FROM outbox GROUP BY kind'))
+            oldest, next_attempt, max_attempts = connection.execute(
+                'SELECT MIN(created), MIN(next_attempt), MAX(attempts) FROM outbox').fetchone()
+            last_error = connection.execute('SELECT last_error FROM outbox WHERE last_error IS NOT NULL '
+                                            'ORDER BY next_attempt DESC LIMIT 1').fetchone()
+            dead_letters, last_dead_letter_error = connection.execute(
+                'SELECT COUNT(*), (SELECT last_error FROM dead_letters ORDER BY failed DESC LIMIT 1) '
+                'FROM dead_letters').fetchone()
+        return {
+            'path': self.path,
+            'depth': sum(by_kind.values()),
+            'by_kind': by_kind,
+            'oldest_age': time.time() - oldest if oldest else 0,
+            'next_attempt_in': max(0, next_attempt - time.time()) if next_attempt else 0,
+            'max_attempts': max_attempts or 0,
+            'last_error': last_error[0] if last_error else None,
+            'dead_letters': dead_letters,
+            'last_dead_letter_error': last_dead_letter_error,
+        }
+
+
+def is_permanent_error(error):
+    """Return if sending an entry again would fail the same way, because
+    the server rejected it with a client error other than 408 or 429."""
+    if isinstance(error, BulkUploadIncomplete):
+        return any(is_permanent_error(chunk_error)
+                   for chunk_error in error.result.failed.values() if chunk_error is not None)
+    if isinstance(error, (ConflictInDatabase, ResourceDoesNotExist, Unauthorized)):
+        return True
+    response = getattr(error, 'response', None)
+    return (response is not None and 400 <= response.status_code < 500
+            and response.status_code not in RETRYABLE_CLIENT_ERRORS)
+
+
+def send_entry(entry):
+    """Send an entry of the outbox to the server, raising
+    ServerRequestException if it couldn't be sent."""
+    if entry['kind'] == BULK_CREATE:
+        # Resumed from the chunks already sent by previous attempts
+        BulkUploader(entry['workspace']).upload(entry['payload'])
+    elif entry['kind'] == COMMAND_UPDATE:
+        update_command_run(entry['workspace'], entry['payload']['id'], entry['payload']['data'])
+    else:
+        logger.error('Dropping outbox entry %s of unknown kind %s', entry['id'], entry['kind'])
+
+
+class OutboxFlusher(Thread):
+    """Sends the entries of the outbox in batches of batch_size.
+
+    When an entry fails, the batch is stopped and the flusher backs off
+    exponentially (or for as long as the circuit of the server is open),
+    so an overloaded server isn't flooded with the whole backlog. Entries
+    the server rejects, and those which failed max_attempts times, are
+    moved to the dead letters so they don't hold back the rest.
+    """
+
+    def __init__(self, outbox=None, interval=None, batch_size=None, backoff_max=None,
+                 max_attempts=None):
+        Thread.__init__(self, name="OutboxFlusherThread")
+        self.daemon = True
+        self.outbox = outbox or get_outbox()
+        self.interval = interval or FLUSH_INTERVAL
+        self.batch_size = batch_size or FLUSH_BATCH_SIZE
+        self.backoff_max = backoff_max or FLUSH_BACKOFF_MAX
+        self.max_attempts = max_attempts or OUTBOX_MAX_ATTEMPTS
+        self._backoff = 0
+        self._wake_up = threading.Event()
+        self._must_stop = False
+
+    def run(self):
+        while not self._must_stop:
+            try:
+                while self.flush() == self.batch_size and not self._backoff and not self._must_stop:
+                    pass
+            except Exception:
+                logger.exception('Unexpected error flushing the outbox')
+            self._wake_up.wait(self._backoff or self.interval)
+            self._wake_up.clear()
+
+    def stop(self):
+        self._must_stop = True
+        self._wake_up.set()
+
+    def wake_up(self):
+        self._wake_up.set()
+
+    def flush(self):
+        """Send one batch of entries. Return the amount of entries sent."""
+        sent = 0
+        for entry in self.outbox.due(self.batch_size):
+            try:
+                send_entry(entry)
+            except ServerRequestException as ex:
+                if is_permanent_error(ex) or entry['attempts'] + 1 >= self.max_attempts:
+                    logger.error('Giving up sending outbox entry %s after %s attempts: %s',
+                                 entry['id'], entry['attempts'] + 1, ex)
+                    self.outbox.dead_letter(entry['id'], ex)
+                    continue
+                self._backoff = min(self.backoff_max, max(self.interval, self._backoff * 2))
+                if isinstance(ex, ServerUnavailable):
+                    self._backoff = max(self._backoff, ex.retry_in)
+                logger.info('Could not send outbox entry %s, retrying in %ss: %s',
+                            entry['id'], self._backoff, ex)
+                self.outbox.nack(entry['id'], ex, self._backoff)
+                break
+            self.outbox.ack(entry['id'])
+            self._backoff = 0
+            sent += 1
+        if sent:
+            logger.info('Sent %s entries of the outbox, %s left', sent, self.outbox.depth())
+        return sent
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Return the process wide outbox, creating it on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        return _outbox
+
+
+def enqueue_bulk_create(workspace_name, data):
+    return get_outbox().put(BULK_CREATE, workspace_name, data)
+
+
+def enqueue_command_update(workspace_name, command_id, command_data):
+    return get_outbox().put(COMMAND_UPDATE, workspace_name, {'id': command_id, 'data': command_data})
+
+
+def get_outbox_status():
+    return get_outbox().stats()
+
+
+# I'm Py3
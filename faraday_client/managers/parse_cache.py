@@ -0,0 +1,155 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+A cache of the results of the plugins, so a report imported again (dropped
+twice, or in several workspaces) isn't parsed again. Results are stored
+compressed in a SQLite database under the faraday home, by the hash of the
+report and the id and version of the plugin which parsed it.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+from faraday_client.config.constant import CONST_FARADAY_HOME_PATH
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_PATH = os.path.join(CONST_FARADAY_HOME_PATH, 'parse_cache.sqlite')
+# Size of the compressed results kept, the least recently used go first
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Don't import a report twice in the same workspace
+SKIP_IMPORTED_REPORTS = False
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_report(filepath):
+    """Return the sha256 of the content of filepath, read by chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as report:
+        for chunk in iter(lambda: report.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def plugin_cache_key(content_hash, plugin):
+    version = getattr(plugin, 'plugin_version', None) or getattr(plugin, 'version', None)
+    return '{0}:{1}:{2}'.format(content_hash, plugin.id, version)
+
+
+class ParseCache:
+    """The results of get_json of the plugins, compressed, in a SQLite
+    database, and the reports imported in every workspace."""
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or PARSE_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else PARSE_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with self._transaction() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS results ('
+                               'key TEXT PRIMARY KEY, '
+                               'size INTEGER NOT NULL, '
+                               'last_used REAL NOT NULL, '
+                               'data BLOB NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+            connection.execute('CREATE TABLE IF NOT EXISTS imports ('
+                               'workspace TEXT NOT NULL, '
+                               'content_hash TEXT NOT NULL, '
+                               'imported REAL NOT NULL, '
+                               'PRIMARY KEY (workspace, content_hash))')
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            connection = sqlite3.connect(self.path, timeout=30)
+            try:
+                with connection:
+                    yield connection
+            finally:
+                connection.close()
+
+    def get(self, key):
+        """Return the result stored for key, None if there isn't one."""
+        with self._transaction() as connection:
+            row = connection.execute('SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+            connection.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+            self._counters['hits'] += 1
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key, result):
+        data = zlib.compress(result.encode('utf-8'))
+        if len(data) > self.max_bytes:
+            return False
+        with self._transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO results (key, size, last_used, data) '
+                               'VALUES (?, ?, ?, ?)',
+                               (key, len(data), time.time(), sqlite3.Binary(data)))
+            self._evict(connection)
+        return True
+
+    def _evict(self, connection):
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in connection.execute('SELECT key, size FROM results '
+                                            'ORDER BY last_used').fetchall():
+            connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            self._counters['evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def was_imported(self, workspace_name, content_hash):
+        with self._transaction() as connection:
+            return connection.execute('SELECT 1 FROM imports WHERE workspace = ? AND content_hash = ?',
+                                      (workspace_name, content_hash)).fetchone() is not None
+
+    def mark_imported(self, workspace_name, content_hash):
+        with self._transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO imports (workspace, content_hash, imported) '
+                               'VALUES (?, ?, ?)', (workspace_name, content_hash, time.time()))
+
+    def stats(self):
+        with self._transaction() as connection:
+            results, size = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+            imports = connection.execute('SELECT COUNT(*) FROM imports').fetchone()[0]
+        return dict(self._counters, path=self.path, results=results, bytes=size,
+                    max_bytes=self.max_bytes, imports=imports)
+
+
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """Return the process wide parse cache, creating it on first use."""
+    global _parse_cache
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache()
+        return _parse_cache
+
+
+def configure_parse_cache(path=None, max_bytes=None):
+    global _parse_cache
+    with _parse_cache_lock:
+        _parse_cache = ParseCache(path, max_bytes)
+        return _parse_cache
+
+
+# I'm Py3
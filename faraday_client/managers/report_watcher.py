@@ -0,0 +1,282 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Watching of the report directory of a workspace. On Linux the kernel tells
+us (inotify) when a file is closed after being written or moved into the
+directory, elsewhere the directory is polled. Either way a report is only
+handed out once it's complete and hasn't changed for DEBOUNCE seconds.
+"""
+import os
+import sys
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Seconds a report must be left alone before processing it, as some tools
+# write their reports in several steps
+DEBOUNCE = 0.5
+POLL_INTERVAL = 1.0
+# Seconds before trying again a report which failed, doubled on every
+# failure up to MAX_RETRY_DELAY
+RETRY_DELAY = 10.0
+MAX_RETRY_DELAY = 600.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_ONLYDIR = 0x01000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o0004000
+
+_EVENT = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    """The names of the files closed after writing or moved into a
+    directory, from Linux inotify."""
+
+    def __init__(self, path):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or libc_name is None:
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.path = path
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+        if libc.inotify_add_watch(self._fd, os.fsencode(path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, 'inotify_add_watch failed on {0}'.format(path))
+
+    def wait(self, timeout):
+        """Return the names of the files written in the next timeout
+        seconds, or None if events were lost and the directory should be
+        scanned again."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                raise OSError(errno.ENOENT, '{0} is no longer watched'.format(self.path))
+            if name and not mask & IN_ISDIR:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PollingWatcher:
+    """The names of the files of a directory whose size and modification
+    time stopped changing, by listing it every interval seconds."""
+
+    def __init__(self, path, interval=None):
+        self.path = path
+        self.interval = interval if interval is not None else POLL_INTERVAL
+        self._seen = self._scan()
+        # Files which changed in the last scan, reported when they don't in
+        # the next one
+        self._changing = {}
+
+    def _scan(self):
+        files = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return files
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        files = self._scan()
+        names = [name for name, stat in self._changing.items() if files.get(name) == stat]
+        self._changing = {name: stat for name, stat in files.items()
+                          if self._seen.get(name) != stat}
+        self._seen = files
+        return names
+
+    def close(self):
+        pass
+
+
+class ReadyReports:
+    """The reports waiting to be processed, in the order they were
+    written. A report written again goes back to the end of the queue."""
+
+    def __init__(self, debounce=None):
+        self.debounce = debounce if debounce is not None else DEBOUNCE
+        # path -> monotonic time since which it can be processed
+        self._pending = OrderedDict()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, path):
+        return path in self._pending
+
+    def add(self, path, delay=None):
+        self._pending.pop(path, None)
+        self._pending[path] = time.monotonic() + (self.debounce if delay is None else delay)
+
+    def next_ready_in(self):
+        """Return the seconds until the first report is ready, None if
+        there aren't any."""
+        if not self._pending:
+            return None
+        return max(0.0, min(self._pending.values()) - time.monotonic())
+
+    def pop_ready(self):
+        now = time.monotonic()
+        # Reports tried again are ready later than those added after them
+        ready = [path for path, ready_at in self._pending.items() if ready_at <= now]
+        for path in ready:
+            del self._pending[path]
+        return ready
+
+
+def create_watcher(path, use_inotify=True, poll_interval=None):
+    """Return an InotifyWatcher of path, or a PollingWatcher if inotify
+    can't be used."""
+    if use_inotify:
+        try:
+            return InotifyWatcher(path)
+        except OSError as e:
+            logger.info('Polling %s, inotify is not available: %s', path, e)
+    return PollingWatcher(path, poll_interval)
+
+
+class ReportWatcher:
+    """The complete reports dropped in a directory, files in it but not in
+    its subdirectories. Those already in the directory when it is created
+    are the first ones.
+
+    If the directory stops being watched, because it was removed or
+    moved, it's watched again (and scanned) as soon as it exists.
+    """
+
+    def __init__(self, path, debounce=None, use_inotify=True, poll_interval=None):
+        self.path = path
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval if poll_interval is not None else POLL_INTERVAL
+        self.ready_reports = ReadyReports(debounce)
+        self._failures = {}
+        self._watcher = create_watcher(path, use_inotify, poll_interval)
+        self._add_all()
+
+    def _add_all(self):
+        files = []
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        files.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    # Removed while scanning
+                    continue
+        for _, path in sorted(files):
+            if path not in self.ready_reports:
+                self.ready_reports.add(path)
+
+    def _watch_again(self):
+        """Create the watcher again and scan the directory. Return False
+        if it can't be watched yet."""
+        try:
+            watcher = create_watcher(self.path, self.use_inotify, self.poll_interval)
+        except OSError as e:
+            logger.debug("Can't watch %s: %s", self.path, e)
+            return False
+        self._watcher = watcher
+        try:
+            self._add_all()
+        except OSError:
+            self._stop_watching()
+            return False
+        logger.info('Watching %s again', self.path)
+        return True
+
+    def _stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def retry(self, path):
+        """Queue again the report of path, which failed to be processed."""
+        failures = self._failures.get(path, 0) + 1
+        self._failures[path] = failures
+        delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+        logger.info('Trying %s again in %.0f seconds', path, delay)
+        self.ready_reports.add(path, delay)
+
+    def done(self, path):
+        """Forget the failures of the report of path, which was processed."""
+        self._failures.pop(path, None)
+
+    def wait_reports(self, timeout):
+        """Return the paths of the reports which can be processed, waiting
+        up to timeout seconds for one."""
+        deadline = time.monotonic() + timeout
+        while True:
+            ready = [path for path in self.ready_reports.pop_ready() if os.path.isfile(path)]
+            remaining = deadline - time.monotonic()
+            if ready or remaining <= 0:
+                return ready
+            next_ready_in = self.ready_reports.next_ready_in()
+            if next_ready_in is not None:
+                remaining = min(remaining, next_ready_in)
+            if self._watcher is None and not self._watch_again():
+                time.sleep(min(remaining, self.poll_interval))
+                continue
+            try:
+                names = self._watcher.wait(remaining)
+                if names is None:
+                    logger.warning('Too many changes in %s, scanning it again', self.path)
+                    self._add_all()
+                    continue
+            except OSError as e:
+                logger.warning('Stopped watching %s: %s', self.path, e)
+                self._stop_watching()
+                continue
+            for name in names:
+                self.ready_reports.add(os.path.join(self.path, name))
+
+    def close(self):
+        self._stop_watching()
+
+
+# I'm Py3
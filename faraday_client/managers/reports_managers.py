@@ -14,6 +14,7 @@ from random import random
 from threading import Thread, Timer
 
 from faraday_client.config.configuration import getInstanceConfiguration
+from faraday_client.managers.report_watcher import ReportWatcher
 
 CONF = getInstanceConfiguration()
 
@@ -98,6 +99,9 @@ class ReportProcessor:
         """Sends a report to the appropiate plugin specified by plugin_id"""
         logger.info('The file is %s, %s', filename, plugin_id)
         command_id = self.plugin_controller.processReport(plugin_id, filename, ws_name=self.ws_name)
+        if command_id is None:
+            # Already imported in the workspace
+            return None
         if not command_id:
             logger.error("Faraday doesn't have a plugin for this tool... Processing: ABORT")
             return None
@@ -127,19 +131,33 @@ class ReportManager(Thread):
 
     def run(self):
         self.online_plugins.start()
-        tmp_timer = .0
-        while not self._must_stop:
-            time.sleep(.1)
-            tmp_timer += .1
-            if tmp_timer >= self.timer:
-                try:
-                    self.syncReports()
-                    if not self.polling:
+        if not self.polling:
+            deadline = time.monotonic() + self.timer
+            while not self._must_stop and time.monotonic() < deadline:
+                time.sleep(.1)
+            try:
+                self.syncReports()
+            except Exception:
+                logger.error("An exception was captured while saving reports\n%s", traceback.format_exc())
+            return
+        # timer is the polling interval if inotify is not available
+        watcher = ReportWatcher(self._report_path, poll_interval=self.timer)
+        try:
+            while not self._must_stop:
+                # Wake up now and then to notice stop
+                for filename in watcher.wait_reports(timeout=.5):
+                    if self._must_stop:
                         break
-                except Exception:
-                    logger.error("An exception was captured while saving reports\n%s", traceback.format_exc())
-                finally:
-                    tmp_timer = 0
+                    try:
+                        self._processReportFile(filename)
+                    except Exception:
+                        logger.error("An exception was captured while saving reports\n%s", traceback.format_exc())
+                        # Still in the directory, it won't be written again
+                        watcher.retry(filename)
+                    else:
+                        watcher.done(filename)
+        finally:
+            watcher.close()
 
     def stop(self):
         self._must_stop = True
@@ -154,17 +172,19 @@ class ReportManager(Thread):
             # skip processed and unprocessed directories
             if root == self._report_path:
                 for name in files:
-                    filename = os.path.join(root, name)
-                    name = os.path.basename(filename)
-                    # If plugin not is detected... move to unprocessed
-                    # PluginCommiter will rename the file to processed or unprocessed
-                    # when the plugin finishes
-                    if self.processor.processReport(filename) is False:
-                        logger.info('Plugin not detected. Moving {0} to unprocessed'.format(filename))
-                        os.rename(filename, os.path.join(self._report_upath, name))
-                    else:
-                        logger.info("Detected valid report {%s}", filename)
-                        os.rename(filename, os.path.join(self._report_ppath, name))
+                    self._processReportFile(os.path.join(root, name))
+
+    def _processReportFile(self, filename):
+        name = os.path.basename(filename)
+        # If plugin not is detected... move to unprocessed
+        # PluginCommiter will rename the file to processed or unprocessed
+        # when the plugin finishes
+        if self.processor.processReport(filename) is False:
+            logger.info('Plugin not detected. Moving {0} to unprocessed'.format(filename))
+            os.rename(filename, os.path.join(self._report_upath, name))
+        else:
+            logger.info("Detected valid report {%s}", filename)
+            os.rename(filename, os.path.join(self._report_ppath, name))
 
     def sendReportToPluginById(self, plugin_id, filename):
         """Sends a report to be processed by the specified plugin_id"""
@@ -15,8 +15,6 @@ import logging
 
 import faraday_client.apis.rest.api as restapi
 
-from queue import Queue
-
 import faraday_client.model.api
 import faraday_client.model.guiapi
 import faraday_client.model.log
@@ -25,7 +23,9 @@ from faraday_client.config.configuration import getInstanceConfiguration
 from faraday_client.plugins.manager import PluginManager
 from faraday_client.managers.mapper_manager import MapperManager
 from faraday_client.managers.workspace_manager import WorkspaceManager
+from faraday_client.managers.outbox_manager import OutboxFlusher
 from faraday_client.model.controller import ModelController
+from faraday_client.model.pending_actions import PendingActionsScheduler
 from faraday_client.persistence.server.server import login_user
 from faraday_client.plugins.controller import PluginController
 from faraday_client.utils.error_report import exception_handler
@@ -47,7 +47,7 @@ class MainApplication:
         self.args = args
 
         self._mappers_manager = MapperManager()
-        pending_actions = Queue()
+        pending_actions = PendingActionsScheduler()
         self._model_controller = ModelController(self._mappers_manager, pending_actions)
 
         self._plugin_manager = PluginManager(
@@ -58,6 +58,8 @@ class MainApplication:
         self._workspace_manager = WorkspaceManager(
             self._mappers_manager)
 
+        self._outbox_flusher = OutboxFlusher()
+
         # Create a PluginController and send this to UI selected.
         self._plugin_controller = PluginController(
             'PluginController',
@@ -106,6 +108,7 @@ class MainApplication:
             faraday_client.model.api.devlog("Starting model controller daemon...")
 
             self._model_controller.start()
+            self._outbox_flusher.start()
             faraday_client.model.api.startAPIServer()
             restapi.startAPIs(
                 self._plugin_controller,
@@ -137,6 +140,7 @@ class MainApplication:
         faraday_client.model.api.devlog("stopping model controller thread...")
         faraday_client.model.api.stopAPIServer()
         restapi.stopServer()
+        self._outbox_flusher.stop()
         self._model_controller.stop()
         if self._model_controller.isAlive():
             # runs only if thread has started, i.e. self._model_controller.start() is run first
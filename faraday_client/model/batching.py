@@ -0,0 +1,219 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Grouping of the add actions of the ModelController in bulk_create requests.
+"""
+from datetime import datetime, timezone
+
+from faraday_client.model import Modelactions
+from faraday_client.model.id_future import TemporaryID
+from faraday_client.persistence.server import models
+from faraday_client.persistence.server.utils import (get_host_properties,
+                                                     get_service_properties,
+                                                     get_vuln_properties,
+                                                     get_vuln_web_properties,
+                                                     get_credential_properties)
+
+BATCHABLE_ACTIONS = frozenset([
+    Modelactions.ADDHOST,
+    Modelactions.ADDSERVICEHOST,
+    Modelactions.ADDVULNHOST,
+    Modelactions.ADDVULNSRV,
+    Modelactions.ADDVULNWEBSRV,
+    Modelactions.ADDCREDSRV,
+])
+
+_NOT_SENT_IN_BULK = ('parent', 'parent_type', 'metadata', 'owner')
+
+
+def _without_local_fields(properties):
+    for key in _NOT_SENT_IN_BULK:
+        properties.pop(key, None)
+    return properties
+
+
+def bulk_host(host):
+    return _without_local_fields(get_host_properties(host))
+
+
+def bulk_service(service):
+    properties = _without_local_fields(get_service_properties(service))
+    ports = properties.pop('ports', None) or [None]
+    properties['port'] = ports[0] if isinstance(ports, list) else ports
+    return properties
+
+
+def bulk_vuln(vuln):
+    properties = _without_local_fields(get_vuln_properties(vuln))
+    properties['type'] = 'Vulnerability'
+    return properties
+
+
+def bulk_vuln_web(vuln_web):
+    properties = _without_local_fields(get_vuln_web_properties(vuln_web))
+    properties['type'] = 'VulnerabilityWeb'
+    return properties
+
+
+def bulk_credential(credential):
+    return _without_local_fields(get_credential_properties(credential))
+
+
+def bulk_command(command):
+    """Return command, a CommandRunInformation or a Command read from the
+    server (whose itime is in milliseconds), as a bulk_create command."""
+    itime = command.itime / 1000.0 if isinstance(command, models.Command) else command.itime
+    bulk = {
+        'tool': command.command,
+        'command': command.command,
+        'params': command.params,
+        'user': command.user,
+        'hostname': command.hostname,
+        'import_source': command.import_source,
+    }
+    if itime is not None:
+        bulk['start_date'] = datetime.fromtimestamp(itime, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')
+    return bulk
+
+
+class ActionBatch:
+    """Add actions of the same command converted to one bulk_create payload.
+
+    known_nodes maps the TemporaryID of the hosts and services already
+    batched, in this batch or a previous one, to their fields, so children
+    added later can be nested in a copy of them (the server merges hosts
+    and services sent more than once).
+    """
+
+    def __init__(self, known_nodes):
+        self._known_nodes = known_nodes
+        self._nodes = {}
+        self.hosts = []
+        self.actions = []
+        self.command_id = None
+
+    def __len__(self):
+        return len(self.actions)
+
+    def _node(self, object_id):
+        node = self._nodes.get(object_id)
+        if node is not None:
+            return node
+        known = self._known_nodes.get(object_id)
+        if known is None:
+            return None
+        kind, fields, parent_id = known
+        node = dict(fields, vulnerabilities=[], credentials=[])
+        if kind == 'host':
+            node['services'] = []
+            self.hosts.append(node)
+        else:
+            self._node(parent_id)['services'].append(node)
+        self._nodes[object_id] = node
+        return node
+
+    def add(self, action, new_obj, command_id=None):
+        """Add the object of an add action to the batch.
+
+        Return False if it can't be sent in this bulk_create: its parent is
+        not in a batch, it isn't a temporary object or it was found by
+        another command than the objects of the batch.
+        """
+        if action not in BATCHABLE_ACTIONS or not isinstance(new_obj.id, TemporaryID):
+            return False
+        if self.actions and command_id != self.command_id:
+            return False
+        self.command_id = command_id
+        if action == Modelactions.ADDHOST:
+            self._known_nodes[new_obj.id] = ('host', bulk_host(new_obj), None)
+            self._node(new_obj.id)
+            self.actions.append((action, new_obj, command_id))
+            return True
+        parent_id = new_obj.getParent()
+        parent = self._node(parent_id) if isinstance(parent_id, TemporaryID) else None
+        if parent is None:
+            return False
+        if action == Modelactions.ADDSERVICEHOST:
+            if 'services' not in parent:
+                return False
+            self._known_nodes[new_obj.id] = ('service', bulk_service(new_obj), parent_id)
+            self._node(new_obj.id)
+        elif action == Modelactions.ADDVULNWEBSRV:
+            parent['vulnerabilities'].append(bulk_vuln_web(new_obj))
+        elif action == Modelactions.ADDCREDSRV:
+            parent['credentials'].append(bulk_credential(new_obj))
+        else:
+            parent['vulnerabilities'].append(bulk_vuln(new_obj))
+        self.actions.append((action, new_obj, command_id))
+        return True
+
+    def to_bulk_data(self, command=None):
+        """Return the bulk_create payload, with command (see bulk_command),
+        to which the server attributes the objects, if given."""
+        data = {'hosts': self.hosts}
+        if command is not None:
+            data['command'] = command
+        return data
+
+
+def _same_ports(ports, other_ports):
+    return sorted(map(str, ports or [])) == sorted(map(str, other_ports or []))
+
+
+def _same_parent(obj, parent_id, parent_type=None):
+    # Hosts and services may have the same id
+    if parent_type is not None and obj.getParentType() not in (None, parent_type):
+        return False
+    return obj.getParent() is None or str(obj.getParent()) == str(parent_id)
+
+
+class SavedObjectsFinder:
+    """Finds the server ids of the objects created by a bulk_create, which
+    doesn't answer them, by the fields the server keeps unique under their
+    parent: the ip of the hosts, the protocol and ports of the services,
+    the name and description of the vulns and the username and password of
+    the credentials. Each listing is requested once.
+    """
+
+    def __init__(self, workspace_name):
+        self.workspace_name = workspace_name
+        self._listings = {}
+
+    def _listing(self, key, get_objects, **params):
+        if key not in self._listings:
+            self._listings[key] = list(get_objects(self.workspace_name, **params))
+        return self._listings[key]
+
+    def find(self, action, new_obj, parent_id=None):
+        """Return the server id of new_obj, whose parent has the server id
+        parent_id. None if it isn't in the server."""
+        if action == Modelactions.ADDHOST:
+            matches = [host for host in self._listing(('hosts', new_obj.ip), models.get_hosts,
+                                                      compact=True, ip=new_obj.ip)
+                       if host.ip == new_obj.ip]
+        elif action == Modelactions.ADDSERVICEHOST:
+            matches = [service for service in self._listing(('services', parent_id), models.get_services,
+                                                            compact=True, host_id=parent_id)
+                       if _same_parent(service, parent_id) and service.protocol == new_obj.protocol
+                       and _same_ports(service.ports, new_obj.ports)]
+        elif action == Modelactions.ADDCREDSRV:
+            matches = [credential for credential in self._listing(('credentials', parent_id),
+                                                                  models.get_credentials,
+                                                                  service_id=parent_id)
+                       if _same_parent(credential, parent_id) and credential.username == new_obj.username
+                       and credential.password == new_obj.password]
+        else:
+            if action == Modelactions.ADDVULNHOST:
+                parent_type, params = 'Host', {'host_id': parent_id}
+            else:
+                parent_type, params = 'Service', {'service_id': parent_id}
+            matches = [vuln for vuln in self._listing(('vulns', parent_type, parent_id), models.get_all_vulns,
+                                                      compact=True, **params)
+                       if _same_parent(vuln, parent_id, parent_type) and vuln.name == new_obj.name
+                       and vuln.description == new_obj.description]
+        return matches[0].getID() if matches else None
+
+
+# I'm Py3
@@ -13,9 +13,10 @@ from faraday_client.config.configuration import getInstanceConfiguration
 CONF = getInstanceConfiguration()
 
 
-from threading import Event
 from sys import platform as _platform
 
+from faraday_client.model.id_future import IDFuture
+
 
 def get_private_ip():
     """
@@ -74,19 +75,17 @@ class CommandRunInformation:
         self.workspace = None
         self.import_source = None
         self._id = None
-        self.id_available = Event()
+        self.id_future = IDFuture()
 
         for k, v in kwargs.items():
             setattr(self, k, v)
 
     def getID(self):
-        if self._id is None:
-            self.id_available.wait(timeout=1)
         return self._id
 
     def setID(self, id):
         self._id = id
-        self.id_available.set()
+        self.id_future.set(id)
 
     def toDict(self):
         return self.__dict__
@@ -8,6 +8,7 @@ from __future__ import absolute_import
 
 import time
 import logging
+import threading
 import traceback
 import faraday_client.model.common  # this is to make sure the factory is created
 from multiprocessing import Lock
@@ -16,7 +17,12 @@ from threading import Thread
 
 from faraday_client.config.configuration import getInstanceConfiguration
 from faraday_client.model import Modelactions
-from faraday_client.persistence.server.server_io_exceptions import ConflictInDatabase
+from faraday_client.persistence.server.server_io_exceptions import (ConflictInDatabase,
+                                                                    ServerRequestException)
+from faraday_client.model.batching import ActionBatch, BATCHABLE_ACTIONS, SavedObjectsFinder, bulk_command
+from faraday_client.model.commands_history import CommandRunInformation
+from faraday_client.model.id_future import ObjectNotSaved, TemporaryID
+from faraday_client.model.pending_actions import FROM_PLUGIN, FROM_USER, put_action
 import faraday_client.model.api as api
 from faraday_client.model.guiapi import notification_center as notifier
 from functools import wraps
@@ -29,10 +35,15 @@ from faraday_client.persistence.server import models
 CONF = getInstanceConfiguration()
 logger = logging.getLogger(__name__)
 
+# Add actions sent together in one bulk_create, and how long to wait for
+# more actions before sending them. A batch size of 1 disables batching.
+ACTIONS_BATCH_SIZE = 500
+ACTIONS_BATCH_WINDOW = 0.5
+
 
 class ModelController(Thread):
 
-    def __init__(self, mappers_manager, pending_actions):
+    def __init__(self, mappers_manager, pending_actions, batch_size=None, batch_window=None):
         #Thread.__init__(self)
         super().__init__(name="ModelControllerThread")
 
@@ -70,12 +81,26 @@ class ModelController(Thread):
         self._saving_model_flag = False
         self._saving_model_lock = Lock()
 
+        # Cleared while any of the flags above is set, the thread waits on
+        # it instead of polling them
+        self._processing_allowed = threading.Event()
+        self._processing_allowed.set()
+
         self._actionDispatcher = None
         self._setupActionDispatcher()
 
         self.objects_with_updates = []
         self.processing = False
 
+        self.batch_size = ACTIONS_BATCH_SIZE if batch_size is None else batch_size
+        self.batch_window = ACTIONS_BATCH_WINDOW if batch_window is None else batch_window
+        # hosts and services sent in batches, by TemporaryID
+        self._batched_nodes = {}
+        # server ids of the objects with a TemporaryID saved one by one
+        self._temporary_ids = {}
+        # commands of the batches, by id, as bulk_create commands
+        self._bulk_commands = {}
+
         # Fix for using PyDev in DEBUG
         self.is_pydev_daemon_thread = ""
         self.__pydevd_id__ = ""
@@ -195,7 +220,7 @@ class ModelController(Thread):
         It works kind of a dispatcher
         """
         if sync:
-            self._sync_api_request = True
+            self._set_sync_api_request(True)
 
         api.devlog("_processAction - %s - parameters = %s" %
                    (action, str(parameters)))
@@ -211,7 +236,7 @@ class ModelController(Thread):
             api.devlog("Action code %d failed. Parameters = %s" %
                     (action, str(parameters)))
         if sync:
-            self._sync_api_request = False
+            self._set_sync_api_request(False)
 
     def conflictMissing(self, conflict):
         """
@@ -245,6 +270,7 @@ class ModelController(Thread):
     def setSavingModel(self, value):
         api.devlog("setSavingModel: %s" % value)
         self._saving_model_flag = value
+        self._update_processing_allowed()
         if value:
             self._saving_model_lock.acquire()
         else:
@@ -270,16 +296,40 @@ class ModelController(Thread):
             # or if the model is being saved/sync'ed
             # or if we have pending duplicated hosts that need to be
             # merged by the userget
-            if not self._sync_api_request and not self._saving_model_flag:
+            if self._processing_allowed.is_set():
                 self.processAction()
             else:
                 # there is some object requesting for a sync api so we
-                # sleep the thread execution for a moment to let others work
-                # XXX: check if this time is not too much...
-                time.sleep(0.01)
+                # wait until it finishes (or timeout, to check the stop flag)
+                self._processing_allowed.wait(timeout=2)
+
+    def _update_processing_allowed(self):
+        if self._sync_api_request or self._saving_model_flag:
+            self._processing_allowed.clear()
+        else:
+            self._processing_allowed.set()
+
+    def _set_sync_api_request(self, value):
+        self._sync_api_request = value
+        self._update_processing_allowed()
+
+    def getPendingActionsStats(self):
+        """Return the statistics of the pending actions lanes, or just the
+        amount of them if they are in a plain Queue."""
+        stats = getattr(self._pending_actions, 'stats', None)
+        if stats is not None:
+            return stats()
+        return {'depth': self._pending_actions.qsize()}
+
+    def getIdentityMapStats(self):
+        """Return the hits and misses of the objects cached by find."""
+        return self.mappers_manager.getIdentityMapStats()
 
     def processAllPendingActions(self):
         for _ in range(self._pending_actions.qsize()):
+            if self._pending_actions.empty():
+                # The previous ones were processed in a batch
+                break
             self.processAction()
 
     def processAction(self):
@@ -292,7 +342,10 @@ class ModelController(Thread):
             action = current_action[0]
             parameters = current_action[1:]
             # dispatch the action
-            self._processAction(action, list(parameters))
+            if self._is_batching() and action in BATCHABLE_ACTIONS:
+                self._processBatch(current_action)
+            else:
+                self._processAction(action, list(parameters))
         except Empty:
             # if timeout was reached, just let the daemon run again
             # this is done just to be able to test the stop flag
@@ -303,21 +356,134 @@ class ModelController(Thread):
                 "something strange happened... unhandled exception?")
             logger.debug(traceback.format_exc())
 
+    def _is_batching(self):
+        return self.batch_size > 1
+
+    def _processBatch(self, first_action):
+        """
+        Process first_action and the add actions queued after it, up to
+        batch_size actions or for batch_window seconds, sending them to
+        the server in bulk_create requests.
+        Actions which can't be batched are processed as usual, after
+        sending the previous ones.
+        """
+        batch = ActionBatch(self._batched_nodes)
+        deadline = time.monotonic() + self.batch_window
+        current_action = first_action
+        while current_action is not None:
+            action = current_action[0]
+            parameters = list(current_action[1:])
+            if action not in BATCHABLE_ACTIONS or not batch.add(action, *parameters):
+                self._sendBatch(batch)
+                batch = ActionBatch(self._batched_nodes)
+                # Those of another command start a new batch
+                if action not in BATCHABLE_ACTIONS or not batch.add(action, *parameters):
+                    self._processAction(action, parameters)
+                    if action not in BATCHABLE_ACTIONS:
+                        break
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                current_action = self._pending_actions.get(timeout=remaining)
+            except Empty:
+                current_action = None
+        self._sendBatch(batch)
+
+    def _sendBatch(self, batch):
+        """
+        Send the objects of batch in one bulk_create. If the server
+        doesn't accept it, they are saved one by one, so conflicts are
+        resolved per object. Once they are sent, they get their server ids
+        (see _resolveBatchIDs).
+        """
+        if not len(batch):
+            return
+        sent = False
+        command = None
+        if batch.command_id is not None:
+            command = self._bulkCommand(batch.command_id)
+        self.__acquire_host_lock()
+        try:
+            if batch.command_id is None or command is not None:
+                self.mappers_manager.bulk_save(batch.to_bulk_data(command))
+                sent = True
+        except ServerRequestException as ex:
+            logger.warning('Could not send %s objects together, sending them one by one: %s',
+                           len(batch), ex)
+        finally:
+            self.__release_host_lock()
+        if sent:
+            api.devlog("Sent %d objects in bulk" % len(batch))
+            self._resolveBatchIDs(batch)
+            return
+        for action, new_obj, command_id in batch.actions:
+            self._processAction(action, [new_obj, command_id])
+
+    def _bulkCommand(self, command_id):
+        """Return the command of id command_id as a bulk_create command,
+        None if it can't be read, so the objects are saved one by one with
+        their command."""
+        command = self._bulk_commands.get(command_id)
+        if command is None:
+            try:
+                saved_command = self.mappers_manager.find(CommandRunInformation.class_signature, command_id)
+            except ServerRequestException as ex:
+                logger.warning('Could not read the command %s: %s', command_id, ex)
+                return None
+            if saved_command is None:
+                return None
+            command = bulk_command(saved_command)
+            self._bulk_commands[command_id] = command
+        return command
+
+    def _resolveBatchIDs(self, batch):
+        """
+        Give the objects created by a bulk_create, which doesn't answer
+        their ids, their server ids, looked up by their unique fields.
+        Those which can't be found are saved on their own: if they exist,
+        the server answers a conflict with their id.
+        """
+        finder = SavedObjectsFinder(self.mappers_manager.workspace_name)
+        for action, new_obj, command_id in batch.actions:
+            parent_id = new_obj.getParent()
+            parent_id = self._temporary_ids.get(parent_id, parent_id)
+            server_id = None
+            if not isinstance(parent_id, TemporaryID):
+                try:
+                    server_id = finder.find(action, new_obj, parent_id)
+                except ServerRequestException as ex:
+                    logger.warning('Could not look up the id of %s %s: %s',
+                                   new_obj.class_signature, new_obj.getName(), ex)
+            if server_id is None:
+                logger.info('%s %s not found after sending it in bulk, saving it on its own',
+                            new_obj.class_signature, new_obj.getName())
+                self._processAction(action, [new_obj, command_id])
+                continue
+            if parent_id is not None:
+                new_obj.setParent(parent_id)
+            self._set_server_id(new_obj, server_id)
+            notifier.addObject(new_obj)
+
     def sync_lock(self):
-        self._sync_api_request = True
+        self._set_sync_api_request(True)
         self.__acquire_host_lock()
 
     def sync_unlock(self):
-        self._sync_api_request = False
+        self._set_sync_api_request(False)
         self.__release_host_lock()
 
     # TODO: >>> APIs <<< we have to know which plugin called the apis to store
     # in the history
 
     def add_action(self, action):
-        self._pending_actions.put(action)
+        if action[0] in BATCHABLE_ACTIONS and action[1].id is None:
+            # So the creator gets an id for the children without waiting,
+            # they are resolved to the server id when saved
+            action[1].setID(TemporaryID.new())
+        put_action(self._pending_actions, action, FROM_USER)
 
-    def __addPendingAction(self, *args):
+    def __addPendingAction(self, *args, origin=FROM_USER, producer=None):
         """
         Adds a new pending action to the queue
         Action is build with generic args tuple.
@@ -325,7 +491,7 @@ class ModelController(Thread):
         way since no checks are preformed over args
         """
         new_action = args
-        self._pending_actions.put(new_action)
+        put_action(self._pending_actions, new_action, origin, producer=producer)
 
     def addUpdate(self, old_object, new_object, command_id):
         # Returns True if the update was resolved without user interaction
@@ -347,14 +513,34 @@ class ModelController(Thread):
     def find(self, class_signature, obj_id):
         return self.mappers_manager.find(class_signature, obj_id)
 
+    def _resolve_temporary_parent(self, new_object):
+        """Replace the TemporaryID of the parent of new_object with its
+        server id. Return False if the parent wasn't saved."""
+        parent_id = new_object.getParent()
+        if not isinstance(parent_id, TemporaryID):
+            return True
+        if parent_id not in self._temporary_ids:
+            logger.error("Parent of %s %s was not saved", new_object.class_signature, new_object.getName())
+            new_object.id_future.set_exception(ObjectNotSaved('The parent {0} was not saved'.format(parent_id)))
+            return False
+        new_object.setParent(self._temporary_ids[parent_id])
+        return True
+
+    def _set_server_id(self, new_object, server_id):
+        if isinstance(new_object.id, TemporaryID) and server_id:
+            self._temporary_ids[new_object.id] = server_id
+        new_object.setID(server_id)
+
     def _save_new_object(self, new_object, command_id):
         res = None
         try:
             res = self.mappers_manager.save(new_object, command_id)
         finally:
-            new_object.setID(res)
+            self._set_server_id(new_object, res)
         if res:
             notifier.addObject(new_object)
+        else:
+            new_object.id_future.set_exception(ObjectNotSaved('The server did not answer an id'))
         return res
 
     def _handle_conflict(self, old_obj, new_obj, command_id):
@@ -370,15 +556,18 @@ class ModelController(Thread):
         :param args:
         :return:
         """
+        if not self._resolve_temporary_parent(new_obj):
+            return False
         try:
             self._save_new_object(new_obj, command_id)
         except ConflictInDatabase as conflict:
             old_obj = new_obj.__class__(conflict.answer.json()['object'], new_obj._workspace_name)
-            new_obj.setID(old_obj.getID())
+            self._set_server_id(new_obj, old_obj.getID())
             return self._handle_conflict(old_obj, new_obj, command_id)
         except Exception as ex:
             logger.exception(ex)
             new_obj.setID(None)
+            new_obj.id_future.set_exception(ex)
             raise
 
     def __edit(self, obj, command_id=None, *args, **kwargs):
@@ -418,10 +607,10 @@ class ModelController(Thread):
         return res
 
     def addPluginStart(self, name):
-        self.__addPendingAction(Modelactions.PLUGINSTART, name)
+        self.__addPendingAction(Modelactions.PLUGINSTART, name, origin=FROM_PLUGIN, producer=name)
 
     def addPluginEnd(self, name):
-        self.__addPendingAction(Modelactions.PLUGINEND, name)
+        self.__addPendingAction(Modelactions.PLUGINEND, name, origin=FROM_PLUGIN, producer=name)
 
     def _pluginStart(self, name, command_id):
         self.active_plugins_count_lock.acquire()
@@ -443,6 +632,10 @@ class ModelController(Thread):
         self.active_plugins_count -= 1
         if self.active_plugins_count == 0:
             self.processing = False
+            # No more children can refer to the objects sent
+            self._batched_nodes = {}
+            self._temporary_ids = {}
+            self._bulk_commands = {}
         self.active_plugins_count_lock.release()
         return True
 
@@ -0,0 +1,106 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Ids of model objects which may not be saved in the server yet.
+"""
+import uuid
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TemporaryID(str):
+    """The id of an object queued to be saved. Its children refer to it
+    until the server creates them together or gives it its real id."""
+
+    @classmethod
+    def new(cls):
+        return cls('tmp-{0}'.format(uuid.uuid4().hex))
+
+
+class ObjectNotSaved(Exception):
+    """The object of an IDFuture couldn't be saved in the server."""
+
+
+class IDFuture:
+    """The id of an object, set once it is saved in the server. Only server
+    ids are accepted, never a TemporaryID. If the object can't be saved,
+    the future fails with set_exception.
+
+    Instead of waiting for it, callers can register callbacks with
+    add_done_callback, which run in the thread that sets the id (or right
+    away, if it was already set). They get None if the future failed.
+    """
+    __slots__ = ('_id', '_error', '_callbacks', '_event', '_lock')
+
+    def __init__(self, object_id=None):
+        self._id = None if isinstance(object_id, TemporaryID) else object_id
+        self._error = None
+        self._callbacks = None
+        self._event = None
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._id is not None or self._error is not None
+
+    def _finish(self, object_id, error):
+        with self._lock:
+            if self.done():
+                return
+            self._id = object_id
+            self._error = error
+            callbacks, self._callbacks = self._callbacks or [], None
+            if self._event is not None:
+                self._event.set()
+        for callback in callbacks:
+            try:
+                callback(object_id)
+            except Exception:
+                logger.exception('Error in a callback of the id %s', object_id)
+
+    def set(self, object_id):
+        if isinstance(object_id, TemporaryID):
+            raise ValueError('{0} is not an id given by the server'.format(object_id))
+        if object_id is not None:
+            self._finish(object_id, None)
+
+    def set_exception(self, error):
+        """Fail the future, the object couldn't be saved."""
+        self._finish(None, error)
+
+    def exception(self):
+        return self._error
+
+    def add_done_callback(self, callback):
+        with self._lock:
+            if not self.done():
+                if self._callbacks is None:
+                    self._callbacks = []
+                self._callbacks.append(callback)
+                return
+        callback(self._id)
+
+    def result(self, timeout=None):
+        """Return the id, waiting at most timeout seconds for it. None if it
+        wasn't set in time.
+
+        Raises the error the future failed with, usually ObjectNotSaved.
+        """
+        with self._lock:
+            if not self.done():
+                if self._event is None:
+                    self._event = threading.Event()
+                event = self._event
+            else:
+                event = None
+        if event is not None:
+            event.wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._id
+
+
+# I'm Py3
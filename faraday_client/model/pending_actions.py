@@ -0,0 +1,241 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+A replacement of the Queue of pending actions of the ModelController, so
+the actions of users don't wait behind the thousands of actions of a big
+plugin import.
+"""
+import time
+import threading
+from queue import Empty, Full
+from collections import OrderedDict, deque
+
+from faraday_client.model import Modelactions
+
+INTERACTIVE = 'interactive'
+PLUGIN_BULK = 'plugin_bulk'
+LOGGING = 'logging'
+LANES = (INTERACTIVE, PLUGIN_BULK, LOGGING)
+
+# Where the actions come from: the GUI and the REST API, or the plugins
+FROM_USER = 'user'
+FROM_PLUGIN = 'plugin'
+
+LANE_SIZES = {
+    INTERACTIVE: 1000,
+    PLUGIN_BULK: 10000,
+    LOGGING: 10000,
+}
+# When both have actions, one logging action is taken every LOGGING_SHARE
+# plugin actions, so logs aren't delayed forever
+LOGGING_SHARE = 8
+
+_LOGGING_ACTIONS = frozenset([Modelactions.LOG, Modelactions.DEVLOG])
+
+
+def lane_of(action, origin=FROM_USER):
+    """Return the lane of an action tuple: logs go to the logging lane,
+    the actions of plugins to the bulk one and those of users to the
+    interactive one."""
+    if action[0] in _LOGGING_ACTIONS:
+        return LOGGING
+    if origin == FROM_PLUGIN:
+        return PLUGIN_BULK
+    return INTERACTIVE
+
+
+def _action_keys(action):
+    """Return the ids of the objects an action is about: the object and its
+    parent for adds and edits, the id of the object for deletions."""
+    if action[0] in _LOGGING_ACTIONS or len(action) < 2:
+        return ()
+    target = action[1]
+    if hasattr(target, 'getID'):
+        keys = (target.getID(), target.getParent() if hasattr(target, 'getParent') else None)
+    else:
+        keys = (target,)
+    return tuple(key for key in keys if key is not None and isinstance(key, (str, int)))
+
+
+def put_action(pending_actions, action, origin, producer=None):
+    """Put action in pending_actions, which may be a plain Queue."""
+    if isinstance(pending_actions, PendingActionsScheduler):
+        pending_actions.put(action, origin=origin, producer=producer)
+    else:
+        pending_actions.put(action)
+
+
+class _Lane:
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        # producer -> deque of (enqueued at, action), served round robin
+        self.producers = OrderedDict()
+        self.depth = 0
+        self.enqueued = 0
+        self.dequeued = 0
+        self.blocked_puts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+
+    def full(self):
+        return 0 < self.maxsize <= self.depth
+
+    def append(self, producer, action, keys=()):
+        actions = self.producers.get(producer)
+        if actions is None:
+            actions = deque()
+            self.producers[producer] = actions
+        actions.append((time.monotonic(), action, keys))
+        self.depth += 1
+        self.enqueued += 1
+
+    def popleft(self):
+        """Return the next action and the ids of the objects it is about."""
+        producer, actions = next(iter(self.producers.items()))
+        enqueued_at, action, keys = actions.popleft()
+        if actions:
+            # Next time, the next producer
+            self.producers.move_to_end(producer)
+        else:
+            del self.producers[producer]
+        waited = time.monotonic() - enqueued_at
+        self.depth -= 1
+        self.dequeued += 1
+        self.wait_sum += waited
+        self.wait_max = max(self.wait_max, waited)
+        return action, keys
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'maxsize': self.maxsize,
+            'producers': len(self.producers),
+            'enqueued': self.enqueued,
+            'dequeued': self.dequeued,
+            'blocked_puts': self.blocked_puts,
+            'wait_avg': self.wait_sum / self.dequeued if self.dequeued else 0.0,
+            'wait_max': self.wait_max,
+        }
+
+
+class PendingActionsScheduler:
+    """A priority queue of model actions with the interface of Queue.
+
+    Actions are put in a lane by their origin (see lane_of). get returns
+    interactive actions first, then plugin actions, giving some turns to
+    logging ones. Inside a lane, producers (a plugin, or the users) are
+    served round robin, so a big import doesn't hold back a smaller one,
+    while the actions of each producer keep their order.
+
+    The actions about an object, or its parent, which still has an action
+    pending are queued right behind it, in its lane and producer, so an
+    edit never overtakes the add of the object it edits.
+
+    put blocks while the lane of the action is full, except for the thread
+    consuming the actions, which could never unblock itself.
+    """
+
+    def __init__(self, lane_sizes=None, logging_share=None):
+        lane_sizes = dict(LANE_SIZES, **(lane_sizes or {}))
+        self._lanes = OrderedDict((name, _Lane(name, lane_sizes[name])) for name in LANES)
+        self.logging_share = logging_share or LOGGING_SHARE
+        self._bulk_streak = 0
+        # object id -> [pending actions about it, lane, producer of the last one]
+        self._pending_objects = {}
+        self._consumer = None
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    def _follow_pending(self, keys, lane, producer):
+        for key in keys:
+            pending = self._pending_objects.get(key)
+            if pending is not None:
+                return self._lanes[pending[1]], pending[2]
+        return lane, producer
+
+    def _track(self, keys, lane, producer):
+        for key in keys:
+            pending = self._pending_objects.setdefault(key, [0, None, None])
+            pending[0] += 1
+            pending[1:] = [lane.name, producer]
+
+    def _untrack(self, keys):
+        for key in keys:
+            pending = self._pending_objects[key]
+            pending[0] -= 1
+            if not pending[0]:
+                del self._pending_objects[key]
+
+    def put(self, action, block=True, timeout=None, lane=None, producer=None, origin=FROM_USER):
+        keys = _action_keys(action)
+        with self._not_full:
+            lane = self._lanes[lane or lane_of(action, origin)]
+            if producer is None:
+                producer = origin
+            lane, producer = self._follow_pending(keys, lane, producer)
+            if lane.full() and threading.get_ident() != self._consumer:
+                if not block:
+                    raise Full
+                lane.blocked_puts += 1
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while lane.full():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Full
+                    self._not_full.wait(remaining)
+                # The pending action may have been taken meanwhile
+                lane, producer = self._follow_pending(keys, lane, producer)
+            self._track(keys, lane, producer)
+            lane.append(producer, action, keys)
+            self._not_empty.notify()
+
+    def put_nowait(self, action, lane=None, producer=None, origin=FROM_USER):
+        return self.put(action, block=False, lane=lane, producer=producer, origin=origin)
+
+    def _next_lane(self):
+        interactive, bulk, logging = self._lanes.values()
+        if interactive.depth:
+            return interactive
+        if bulk.depth and (not logging.depth or self._bulk_streak < self.logging_share):
+            self._bulk_streak += 1
+            return bulk
+        self._bulk_streak = 0
+        return logging if logging.depth else None
+
+    def get(self, block=True, timeout=None):
+        with self._not_empty:
+            self._consumer = threading.get_ident()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            lane = self._next_lane()
+            while lane is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise Empty
+                self._not_empty.wait(remaining)
+                lane = self._next_lane()
+            action, keys = lane.popleft()
+            self._untrack(keys)
+            self._not_full.notify_all()
+            return action
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self):
+        with self._mutex:
+            return sum(lane.depth for lane in self._lanes.values())
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def stats(self):
+        with self._mutex:
+            return {name: lane.stats() for name, lane in self._lanes.items()}
+
+
+# I'm Py3
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+An asyncio counterpart of faraday_client.persistence.server.models.
+The coroutines return the same Host, Service, Vuln, VulnWeb... objects than
+their synchronous versions and share the concurrency limit of async_server.
+"""
+from __future__ import absolute_import
+
+from faraday_client.persistence.server import models
+from faraday_client.persistence.server.async_server import _coroutine_of
+
+
+def _model_coroutine(function_name):
+    return _coroutine_of(function_name, module=models)
+
+
+get_hosts = _model_coroutine('get_hosts')
+get_host = _model_coroutine('get_host')
+get_all_vulns = _model_coroutine('get_all_vulns')
+get_vulns = _model_coroutine('get_vulns')
+get_vuln = _model_coroutine('get_vuln')
+get_web_vulns = _model_coroutine('get_web_vulns')
+get_web_vuln = _model_coroutine('get_web_vuln')
+get_services = _model_coroutine('get_services')
+get_service = _model_coroutine('get_service')
+get_credentials = _model_coroutine('get_credentials')
+get_credential = _model_coroutine('get_credential')
+get_notes = _model_coroutine('get_notes')
+get_note = _model_coroutine('get_note')
+get_commands = _model_coroutine('get_commands')
+get_command = _model_coroutine('get_command')
+get_object = _model_coroutine('get_object')
+get_workspace = _model_coroutine('get_workspace')
+get_workspace_summary = _model_coroutine('get_workspace_summary')
+get_workspace_numbers = _model_coroutine('get_workspace_numbers')
+get_workspaces_names = _model_coroutine('get_workspaces_names')
+
+create_host = _model_coroutine('create_host')
+create_service = _model_coroutine('create_service')
+create_vuln = _model_coroutine('create_vuln')
+create_vuln_web = _model_coroutine('create_vuln_web')
+create_note = _model_coroutine('create_note')
+create_credential = _model_coroutine('create_credential')
+create_command = _model_coroutine('create_command')
+create_object = _model_coroutine('create_object')
+create_workspace = _model_coroutine('create_workspace')
+
+update_host = _model_coroutine('update_host')
+update_service = _model_coroutine('update_service')
+update_vuln = _model_coroutine('update_vuln')
+update_vuln_web = _model_coroutine('update_vuln_web')
+update_note = _model_coroutine('update_note')
+update_credential = _model_coroutine('update_credential')
+update_command = _model_coroutine('update_command')
+update_object = _model_coroutine('update_object')
+
+delete_host = _model_coroutine('delete_host')
+delete_service = _model_coroutine('delete_service')
+delete_vuln = _model_coroutine('delete_vuln')
+delete_vuln_web = _model_coroutine('delete_vuln_web')
+delete_note = _model_coroutine('delete_note')
+delete_credential = _model_coroutine('delete_credential')
+delete_command = _model_coroutine('delete_command')
+delete_object = _model_coroutine('delete_object')
+
+# I'm Py3
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+An asyncio counterpart of faraday_client.persistence.server.server.
+
+Every coroutine here runs its synchronous counterpart from the server module
+on a thread of a shared executor, so URLs are built by the same
+_create_server_*_url functions, requests go through the same session pool
+and the same exceptions (ConflictInDatabase, Unauthorized,
+ResourceDoesNotExist, CantCommunicateWithServerError...) are raised to the
+awaiting code.
+
+At most MAX_CONCURRENT_REQUESTS requests are in flight at the same time,
+no matter how many coroutines are awaiting. Use gather to run a lot of
+them, for example:
+
+    hosts = await async_server.get_hosts('ws')
+    await async_server.gather(async_server.delete_host('ws', host['id'])
+                              for host in hosts)
+"""
+from __future__ import absolute_import
+
+import asyncio
+import functools
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server.connection_pool import POOL_MAXSIZE_PER_HOST
+
+logger = logging.getLogger(__name__)
+
+# Keep it lower or equal than the session pool size, otherwise requests
+# will just wait for a free connection.
+MAX_CONCURRENT_REQUESTS = POOL_MAXSIZE_PER_HOST
+
+# Python < 3.7 has no get_running_loop, get_event_loop is the same there
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS,
+                                           thread_name_prefix="AsyncServerIO")
+        return _executor
+
+
+def _get_semaphore(loop):
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+def set_max_concurrent_requests(max_concurrent_requests):
+    """Change the amount of requests in flight allowed. Must be called
+    before any coroutine of this module is awaited."""
+    global MAX_CONCURRENT_REQUESTS, _executor
+    with _executor_lock:
+        MAX_CONCURRENT_REQUESTS = max_concurrent_requests
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+    _semaphores.clear()
+
+
+async def run_in_executor(function, *args, **kwargs):
+    """Run the blocking function in the I/O executor, waiting for a free
+    slot if MAX_CONCURRENT_REQUESTS calls are already running. It runs
+    with the server client active in the thread of the event loop."""
+    loop = _get_running_loop()
+    client = server.get_current_client()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(_get_executor(),
+                                          functools.partial(client.call, function, *args, **kwargs))
+
+
+async def gather(coroutines, return_exceptions=False):
+    """Like asyncio.gather, but takes any iterable of coroutines."""
+    return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+
+def _coroutine_of(function_name, module=server):
+    """Create a coroutine function with the same signature and docstring
+    than module.function_name, which runs it in the I/O executor. The
+    function is looked up on every call, so patching the module works."""
+    @functools.wraps(getattr(module, function_name))
+    async def coroutine(*args, **kwargs):
+        return await run_in_executor(getattr(module, function_name), *args, **kwargs)
+    return coroutine
+
+
+get_hosts = _coroutine_of('get_hosts')
+get_all_vulns = _coroutine_of('get_all_vulns')
+get_vulns = _coroutine_of('get_vulns')
+get_web_vulns = _coroutine_of('get_web_vulns')
+get_services = _coroutine_of('get_services')
+get_credentials = _coroutine_of('get_credentials')
+get_notes = _coroutine_of('get_notes')
+get_commands = _coroutine_of('get_commands')
+get_objects = _coroutine_of('get_objects')
+get_object = _coroutine_of('get_object')
+get_host = _coroutine_of('get_host')
+get_vuln = _coroutine_of('get_vuln')
+get_web_vuln = _coroutine_of('get_web_vuln')
+get_service = _coroutine_of('get_service')
+get_credential = _coroutine_of('get_credential')
+get_command = _coroutine_of('get_command')
+get_workspace = _coroutine_of('get_workspace')
+get_workspace_summary = _coroutine_of('get_workspace_summary')
+get_workspace_numbers = _coroutine_of('get_workspace_numbers')
+get_workspaces_names = _coroutine_of('get_workspaces_names')
+
+create_host = _coroutine_of('create_host')
+create_service = _coroutine_of('create_service')
+create_vuln = _coroutine_of('create_vuln')
+create_vuln_web = _coroutine_of('create_vuln_web')
+create_note = _coroutine_of('create_note')
+create_credential = _coroutine_of('create_credential')
+create_command = _coroutine_of('create_command')
+create_workspace = _coroutine_of('create_workspace')
+bulk_create = _coroutine_of('bulk_create')
+
+update_host = _coroutine_of('update_host')
+update_service = _coroutine_of('update_service')
+update_vuln = _coroutine_of('update_vuln')
+update_vuln_web = _coroutine_of('update_vuln_web')
+update_note = _coroutine_of('update_note')
+update_credential = _coroutine_of('update_credential')
+update_command = _coroutine_of('update_command')
+
+delete_host = _coroutine_of('delete_host')
+delete_service = _coroutine_of('delete_service')
+delete_vuln = _coroutine_of('delete_vuln')
+delete_note = _coroutine_of('delete_note')
+delete_credential = _coroutine_of('delete_credential')
+delete_command = _coroutine_of('delete_command')
+delete_workspace = _coroutine_of('delete_workspace')
+
+# I'm Py3
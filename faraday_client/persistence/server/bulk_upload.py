@@ -0,0 +1,365 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Upload of big bulk_create payloads as several smaller requests made in
+parallel, which can be resumed if some of them fail.
+"""
+from __future__ import absolute_import
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from time import monotonic, time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from faraday_client.config.constant import CONST_FARADAY_HOME_PATH
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server.server_io_exceptions import (BulkUploadIncomplete,
+                                                                    CantCommunicateWithServerError,
+                                                                    ServerRequestException,
+                                                                    ServerUnavailable)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MAX_BYTES = 1024 * 1024
+UPLOAD_WORKERS = 4
+UPLOAD_STATE_PATH = os.path.join(CONST_FARADAY_HOME_PATH, 'bulk_uploads')
+
+HOST_CHILDREN = ('vulnerabilities', 'credentials', 'services')
+SERVICE_CHILDREN = ('vulnerabilities', 'credentials')
+
+
+def _timestamp(iso_date):
+    for date_format in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.strptime(iso_date, date_format).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+def _outcome_unknown(error):
+    # The request may have reached the server, but no answer came back
+    return (isinstance(error, CantCommunicateWithServerError)
+            and not isinstance(error, ServerUnavailable) and error.response is None)
+
+
+def _size(obj):
+    # The separator with the previous object included
+    return len(json.dumps(obj)) + 2
+
+
+def _child_objects(child):
+    """Return the amount of objects of a host child: 1 for vulns and
+    credentials, 1 plus its vulns and credentials for services."""
+    return 1 + sum(len(child.get(key, [])) for key in SERVICE_CHILDREN)
+
+
+def count_objects(data):
+    """Return the amount of hosts, services, vulns and credentials in a
+    bulk_create payload."""
+    return sum(1 + sum(_child_objects(child) for key in HOST_CHILDREN for child in host.get(key, []))
+               for host in data.get('hosts', []))
+
+
+class _ChunkBuilder:
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.chunks = []
+        # Objects of each chunk, hosts repeated in several chunks count once
+        self.objects = []
+        self._hosts = []
+        self._size = 0
+        self._objects = 0
+        self._open_host = None
+
+    def _flush(self):
+        if self._hosts:
+            self.chunks.append({'hosts': self._hosts})
+            self.objects.append(self._objects)
+        self._hosts = []
+        self._size = 0
+        self._objects = 0
+
+    def _add_host_piece(self, host):
+        base = {key: value for key, value in host.items() if key not in HOST_CHILDREN}
+        piece = dict(base)
+        for key in HOST_CHILDREN:
+            if key in host:
+                piece[key] = []
+        self._hosts.append(piece)
+        self._size += _size(piece)
+        return piece
+
+    def add_host(self, host):
+        base_size = _size({key: value for key, value in host.items() if key not in HOST_CHILDREN})
+        if self._hosts and self._size + base_size > self.max_bytes:
+            self._flush()
+        self._open_host = (host, self._add_host_piece(host))
+        self._objects += 1
+
+    def add_child(self, key, child):
+        """Add a vuln, credential or service (with its own vulns and
+        credentials) to the last host added. If it doesn't fit in the chunk,
+        the host is repeated in the next one, the server merges them."""
+        host, piece = self._open_host
+        child_size = _size(child)
+        piece_is_empty = not any(piece.get(child_key) for child_key in HOST_CHILDREN)
+        if self._size + child_size > self.max_bytes and (len(self._hosts) > 1 or not piece_is_empty):
+            self._flush()
+            piece = self._add_host_piece(host)
+            self._open_host = (host, piece)
+        piece[key].append(child)
+        self._size += child_size
+        self._objects += _child_objects(child)
+
+    def build(self):
+        self._flush()
+        return self.chunks
+
+
+def _split_bulk_data(data, max_bytes):
+    builder = _ChunkBuilder(max_bytes or CHUNK_MAX_BYTES)
+    for host in data.get('hosts', []):
+        builder.add_host(host)
+        for key in HOST_CHILDREN:
+            for child in host.get(key, []):
+                builder.add_child(key, child)
+    chunks = builder.build() or [{'hosts': []}]
+    for chunk in chunks:
+        chunk.update((key, value) for key, value in data.items() if key not in ('hosts', 'command'))
+    # The server creates the command of every request, only the first one
+    # has it
+    if 'command' in data:
+        chunks[0]['command'] = data['command']
+    return chunks, builder.objects or [0]
+
+
+def _command_run_data(command, end):
+    """Return the bulk_create command as CommandRunInformation.toDict
+    does, ending at end. None if it has no start date."""
+    start = _timestamp(command.get('start_date') or '')
+    if start is None:
+        return None
+    return {
+        'type': 'CommandRunInformation',
+        'command': command.get('command') or command.get('tool'),
+        'tool': command.get('tool'),
+        'params': command.get('params'),
+        'user': command.get('user'),
+        'hostname': command.get('hostname'),
+        'import_source': command.get('import_source'),
+        'itime': start,
+        'duration': end - start,
+    }
+
+
+def split_bulk_data(data, max_bytes=None):
+    """Split a bulk_create payload in chunks of about max_bytes.
+
+    Services are kept with their vulns and credentials, and hosts with their
+    children; a host with too many children is repeated in several chunks.
+    Only the first chunk has the command, as the server creates one for
+    every request with a command. Every chunk has the other keys of data.
+
+    Return a list of bulk_create payloads.
+    """
+    return _split_bulk_data(data, max_bytes)[0]
+
+
+class BulkUploadResult:
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.uploaded = 0
+        self.skipped = 0
+        self.failed = {}
+        self.objects = 0
+        self.seconds = 0.0
+        self.chunk_latencies = {}
+        self.command_id = None
+
+    @property
+    def objects_per_second(self):
+        return self.objects / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        return {
+            'chunks': self.chunks,
+            'uploaded': self.uploaded,
+            'skipped': self.skipped,
+            'failed': sorted(self.failed),
+            'objects': self.objects,
+            'seconds': self.seconds,
+            'objects_per_second': self.objects_per_second,
+            'chunk_latencies': self.chunk_latencies,
+            'command_id': self.command_id,
+        }
+
+
+class BulkUploader:
+    """Uploads a bulk_create payload to workspace_name in chunks of about
+    max_bytes, with workers parallel requests.
+
+    The chunks already uploaded are saved in a state file under state_path,
+    named after a hash of the payload, so uploading the same payload again
+    after a failure only sends the chunks which failed. If no answer came
+    back for the first chunk, it is only sent again if its command is not
+    on the server.
+
+    The command is only sent with the first chunk, once all the chunks are
+    uploaded it is updated to end with the last one.
+    """
+
+    def __init__(self, workspace_name, max_bytes=None, workers=None, state_path=None):
+        self.workspace_name = workspace_name
+        self.max_bytes = max_bytes or CHUNK_MAX_BYTES
+        self.workers = workers or UPLOAD_WORKERS
+        self.state_path = state_path or UPLOAD_STATE_PATH
+        self._lock = threading.Lock()
+
+    def _state_file(self, data):
+        digest = hashlib.sha256()
+        digest.update(self.workspace_name.encode('utf-8'))
+        digest.update(str(self.max_bytes).encode('utf-8'))
+        digest.update(json.dumps(data, sort_keys=True).encode('utf-8'))
+        return os.path.join(self.state_path, '{0}.json'.format(digest.hexdigest()))
+
+    def _load_state(self, state_file, chunks_count):
+        """Return the chunks uploaded, those which may have been and the id
+        of the command created by the first one."""
+        try:
+            with open(state_file) as state:
+                saved = json.load(state)
+        except (IOError, ValueError):
+            return set(), set(), None
+        if saved.get('chunks') != chunks_count:
+            return set(), set(), None
+        return set(saved.get('done', [])), set(saved.get('unconfirmed', [])), saved.get('command_id')
+
+    def _save_state(self, state_file, chunks_count, done, unconfirmed=(), command_id=None):
+        if not os.path.isdir(self.state_path):
+            os.makedirs(self.state_path)
+        temporary_file = state_file + '.tmp'
+        with open(temporary_file, 'w') as state:
+            json.dump({'workspace': self.workspace_name,
+                       'chunks': chunks_count,
+                       'done': sorted(done),
+                       'unconfirmed': sorted(unconfirmed),
+                       'command_id': command_id}, state)
+        os.replace(temporary_file, state_file)
+
+    def _find_command(self, chunk):
+        """Return the id of the command of chunk in the server, None if it
+        isn't there. bulk_create saves the command and the objects of a
+        request together, so if it's there the whole chunk was created."""
+        command = chunk.get('command') or {}
+        start = _timestamp(command.get('start_date') or '')
+        if start is None:
+            return None
+        for row in server.get_commands(self.workspace_name):
+            saved = row.get('value', row)
+            itime = saved.get('itime')
+            if (itime is not None and abs(itime / 1000.0 - start) < 1
+                    and all(saved.get(key) == command.get(key) for key in ('params', 'user', 'hostname'))):
+                return row.get('id', saved.get('_id'))
+        return None
+
+    def _update_command(self, command, command_id):
+        command_data = _command_run_data(command, time())
+        if command_data is None:
+            return
+        try:
+            server.update_command_run(self.workspace_name, command_id, command_data)
+        except ServerRequestException as ex:
+            # The objects are uploaded, only the duration is wrong
+            logger.warning('Could not update the command %s of the upload to %s: %s',
+                           command_id, self.workspace_name, ex)
+
+    def _upload_chunk(self, index, chunk, result):
+        start = monotonic()
+        answer = server.bulk_create(self.workspace_name, chunk)
+        if index == 0 and isinstance(answer, dict):
+            result.command_id = answer.get('command_id')
+        latency = monotonic() - start
+        logger.debug('Chunk %s/%s uploaded in %.2fs', index + 1, result.chunks, latency)
+        return latency
+
+    def upload(self, data):
+        """Upload data, a bulk_create payload.
+
+        Return a BulkUploadResult.
+
+        Raises:
+            BulkUploadIncomplete: if some chunks couldn't be uploaded. Calling
+                upload again with the same data retries only those.
+        """
+        chunks, chunks_objects = _split_bulk_data(data, self.max_bytes)
+        result = BulkUploadResult(len(chunks))
+        state_file = self._state_file(data)
+        done, unconfirmed, result.command_id = self._load_state(state_file, len(chunks))
+        if 0 in unconfirmed and 0 not in done:
+            command_id = self._find_command(chunks[0])
+            if command_id is not None:
+                logger.info('The first chunk of the upload to %s was created by a previous attempt',
+                            self.workspace_name)
+                done.add(0)
+                result.command_id = command_id
+        unconfirmed = set()
+        result.skipped = len(done)
+        start = monotonic()
+
+        def upload_chunk(index):
+            try:
+                latency = self._upload_chunk(index, chunks[index], result)
+            except ServerRequestException as ex:
+                logger.warning('Chunk %s/%s of the upload to %s failed: %s',
+                               index + 1, len(chunks), self.workspace_name, ex)
+                with self._lock:
+                    result.failed[index] = ex
+                    if index == 0 and _outcome_unknown(ex):
+                        unconfirmed.add(index)
+                return
+            with self._lock:
+                done.add(index)
+                result.uploaded += 1
+                result.objects += chunks_objects[index]
+                result.chunk_latencies[index] = latency
+                if len(chunks) > 1:
+                    self._save_state(state_file, len(chunks), done, command_id=result.command_id)
+
+        pending = [index for index in range(len(chunks)) if index not in done]
+        # If the server rejects the first chunk, it will most likely reject
+        # the others too
+        if 0 in pending:
+            upload_chunk(pending.pop(0))
+        if pending and 0 not in result.failed:
+            client = server.get_current_client()
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(client.wrap(upload_chunk), pending))
+        elif pending:
+            result.failed.update((index, None) for index in pending)
+        result.seconds = monotonic() - start
+
+        logger.info('Uploaded %s objects to %s in %s chunks in %.2fs (%.1f objects/s)',
+                    result.objects, self.workspace_name, result.uploaded,
+                    result.seconds, result.objects_per_second)
+        if result.failed:
+            if done or unconfirmed:
+                self._save_state(state_file, len(chunks), done, unconfirmed, result.command_id)
+            raise BulkUploadIncomplete(self.workspace_name, result, state_file)
+        if len(chunks) > 1 and 'command' in data and result.command_id is not None:
+            self._update_command(data['command'], result.command_id)
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        return result
+
+# I'm Py3
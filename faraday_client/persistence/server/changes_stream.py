@@ -16,6 +16,7 @@ from past.builtins import basestring
 import json
 import logging
 import threading
+import weakref
 from queue import Queue, Empty
 import requests
 import websocket
@@ -25,8 +26,50 @@ from urllib.parse import urlparse
 from faraday_client.persistence.server.server_io_exceptions import (
     ChangesStreamStoppedAbruptly
 )
+from faraday_client.persistence.server.metrics import get_server_metrics
 logger = logging.getLogger(__name__)
 
+# Actions of the websocket messages which change an object
+CHANGE_ACTIONS = frozenset(['CREATE', 'UPDATE', 'DELETE'])
+
+_change_listeners = []
+_change_listeners_lock = threading.Lock()
+
+
+def add_change_listener(listener):
+    """Call listener(workspace_name, change) with every change received by
+    a WebsocketsChangesStream, change being the decoded message, or None
+    when the connection is (re)opened or closed and changes may have been
+    missed. Bound methods are weakly referenced, so listening doesn't keep
+    their object alive."""
+    if hasattr(listener, '__self__'):
+        reference = weakref.WeakMethod(listener)
+    else:
+        reference = lambda: listener
+    with _change_listeners_lock:
+        _change_listeners.append(reference)
+
+
+def remove_change_listener(listener):
+    with _change_listeners_lock:
+        _change_listeners[:] = [reference for reference in _change_listeners
+                                if reference() not in (None, listener)]
+
+
+def notify_change_listeners(workspace_name, change):
+    with _change_listeners_lock:
+        listeners = [reference() for reference in _change_listeners]
+        if None in listeners:
+            _change_listeners[:] = [reference for reference in _change_listeners
+                                    if reference() is not None]
+    for listener in listeners:
+        if listener is None:
+            continue
+        try:
+            listener(workspace_name, change)
+        except Exception:
+            logger.exception('Error in change listener %r', listener)
+
 
 class ChangesStream:
 
@@ -137,6 +180,8 @@ class WebsocketsChangesStream(ChangesStream):
             '/ws/{}/websocket_token'.format(self.workspace_name),
             expected_response=200)
         token = response['token']
+        # Changes made while disconnected were missed
+        notify_change_listeners(self.workspace_name, None)
         self.ws.send(json.dumps({
             'action': 'JOIN_WORKSPACE',
             'workspace': self.workspace_name,
@@ -145,13 +190,21 @@ class WebsocketsChangesStream(ChangesStream):
 
     def on_message(self, message):
         logger.debug('New message {0}'.format(message))
+        get_server_metrics().observe_message('websocket', len(message))
+        try:
+            change = json.loads(message)
+        except ValueError:
+            change = None
+        if isinstance(change, dict) and change.get('action') in CHANGE_ACTIONS:
+            notify_change_listeners(self.workspace_name, change)
         self.changes_queue.put(message)
 
     def on_error(ws, error):
+        get_server_metrics().observe_error('websocket')
         logger.error('Websocket connection error: {0}'.format(error))
 
     def on_close(self):
-        pass
+        notify_change_listeners(self.workspace_name, None)
 
     def __enter__(self):
         return self
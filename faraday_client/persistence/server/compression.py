@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Compression of the bodies of the big requests made to the server, like the
+bulk_create uploads of the plugins.
+
+It is disabled by default because the faraday server doesn't decode the
+Content-Encoding of the requests. Enable it with
+configure_request_compression('gzip') for servers behind a proxy that does.
+"""
+from __future__ import absolute_import
+
+import gzip
+import zlib
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+# Smaller bodies are sent as they are, compressing them isn't worth it
+COMPRESSION_MIN_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 6
+# Status of a server which doesn't accept a compressed body. A 400 may be a
+# real validation error, sending the body again would just double the traffic
+REJECTION_STATUSES = frozenset([415])
+
+
+class RequestCompressor:
+    """Compresses request bodies with encoding when they are bigger than
+    min_size, remembering which servers rejected them so they get plain
+    bodies from then on."""
+
+    def __init__(self, encoding=None, min_size=None, level=None):
+        if encoding is not None and encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError('Unsupported encoding {0}'.format(encoding))
+        self.encoding = encoding
+        self.min_size = min_size if min_size is not None else COMPRESSION_MIN_SIZE
+        self.level = level if level is not None else COMPRESSION_LEVEL
+        self._unsupported = set()
+        self._lock = threading.Lock()
+        self._counters = {'uploads': 0, 'compressed_uploads': 0, 'fallbacks': 0,
+                          'bytes_uncompressed': 0, 'bytes_sent': 0, 'bytes_saved': 0,
+                          'transfer_seconds': 0.0}
+
+    def encoding_for(self, url, size):
+        """Return the encoding to use for a body of size bytes sent to url,
+        None to send it uncompressed."""
+        if self.encoding is None or size < self.min_size:
+            return None
+        with self._lock:
+            if (urlparse(url).netloc, self.encoding) in self._unsupported:
+                return None
+        return self.encoding
+
+    def compress(self, body, encoding):
+        if encoding == 'gzip':
+            return gzip.compress(body, compresslevel=self.level)
+        return zlib.compress(body, self.level)
+
+    def is_rejection(self, response):
+        return response is not None and response.status_code in REJECTION_STATUSES
+
+    def mark_unsupported(self, url, encoding):
+        server = urlparse(url).netloc
+        logger.info('Server %s does not accept %s request bodies, sending them uncompressed',
+                    server, encoding)
+        with self._lock:
+            self._unsupported.add((server, encoding))
+            self._counters['fallbacks'] += 1
+
+    def record(self, url, encoding, uncompressed_size, sent_size, seconds):
+        logger.info('Uploaded %s bytes to %s in %.2fs (%s bytes before %s compression)',
+                    sent_size, url, seconds, uncompressed_size, encoding or 'no')
+        with self._lock:
+            self._counters['uploads'] += 1
+            if encoding is not None:
+                self._counters['compressed_uploads'] += 1
+            self._counters['bytes_uncompressed'] += uncompressed_size
+            self._counters['bytes_sent'] += sent_size
+            self._counters['bytes_saved'] += uncompressed_size - sent_size
+            self._counters['transfer_seconds'] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['encoding'] = self.encoding
+            stats['unsupported_servers'] = sorted(server for server, _ in self._unsupported)
+            return stats
+
+
+_request_compressor = None
+_request_compressor_lock = threading.Lock()
+
+
+def get_request_compressor():
+    """Return the process wide request compressor, creating it on first use."""
+    global _request_compressor
+    with _request_compressor_lock:
+        if _request_compressor is None:
+            _request_compressor = RequestCompressor()
+        return _request_compressor
+
+
+def configure_request_compression(encoding=None, min_size=None, level=None):
+    """Replace the process wide request compressor. Pass one of
+    SUPPORTED_ENCODINGS to enable the compression, None disables it."""
+    global _request_compressor
+    with _request_compressor_lock:
+        _request_compressor = RequestCompressor(encoding, min_size, level)
+        return _request_compressor
+
+# I'm Py3
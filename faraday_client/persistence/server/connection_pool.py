@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+"""
+from __future__ import absolute_import
+
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from faraday_client import __version__ as f_version
+
+logger = logging.getLogger(__name__)
+
+# Amount of keep-alive connections kept open against each faraday server host.
+# Change it with configure_session_pool() before the first request is made.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE_PER_HOST = 10
+
+
+class _RejectAllCookiesPolicy(DefaultCookiePolicy):
+    """The session never stores cookies by itself, they are always sent
+    per request (see server._add_session_cookies), so logging in or
+    switching workspaces keeps working as it did before pooling."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class ServerSessionPool:
+    """A requests.Session shared between threads with a bounded pool of
+    keep-alive connections per faraday server host.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None):
+        self.pool_connections = pool_connections or POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or POOL_MAXSIZE_PER_HOST
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self):
+        session = requests.Session()
+        session.cookies.set_policy(_RejectAllCookiesPolicy())
+        session.headers.update({
+            'Connection': 'keep-alive',
+            'User-Agent': 'faraday-client/{0}'.format(f_version),
+        })
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        logger.debug("Created server session pool (%s connections per host)",
+                     self.pool_maxsize)
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.session.put(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.session.delete(url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def stats(self):
+        """Return a dictionary with the requests made through the pool, the
+        connections that had to be opened for them, the reuse ratio and the
+        connections currently kept open, per host and in total."""
+        hosts = {}
+        with self._lock:
+            session = self._session
+        if session is not None:
+            for adapter in set(session.adapters.values()):
+                for host, pool in self._connection_pools(adapter):
+                    requests_made = getattr(pool, 'num_requests', 0)
+                    connections_made = getattr(pool, 'num_connections', 0)
+                    idle = [conn for conn in list(pool.pool.queue) if conn is not None] if pool.pool else []
+                    hosts[host] = {
+                        'requests': requests_made,
+                        'new_connections': connections_made,
+                        'reuse_ratio': _reuse_ratio(requests_made, connections_made),
+                        'open_connections': len(idle),
+                    }
+        total_requests = sum(host['requests'] for host in hosts.values())
+        total_connections = sum(host['new_connections'] for host in hosts.values())
+        return {
+            'pool_maxsize_per_host': self.pool_maxsize,
+            'requests': total_requests,
+            'new_connections': total_connections,
+            'reuse_ratio': _reuse_ratio(total_requests, total_connections),
+            'open_connections': sum(host['open_connections'] for host in hosts.values()),
+            'hosts': hosts,
+        }
+
+    @staticmethod
+    def _connection_pools(adapter):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                yield "{0}://{1}:{2}".format(pool.scheme, pool.host, pool.port), pool
+
+
+def _reuse_ratio(requests_made, connections_made):
+    if not requests_made:
+        return 0.0
+    return max(0.0, 1 - float(connections_made) / requests_made)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Return the process wide session pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ServerSessionPool()
+        return _default_pool
+
+
+def configure_session_pool(pool_maxsize=None, pool_connections=None):
+    """Replace the process wide session pool with one of the given size.
+    Open connections of the previous pool are closed."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = ServerSessionPool(pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize)
+        return _default_pool
+
+
+def get_pool_stats():
+    return get_session_pool().stats()
+
+# I'm Py3
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+A conditional GET cache for the answers of the server which are read over
+and over (workspace summaries, workspaces names, hosts pages...).
+"""
+from __future__ import absolute_import
+
+import re
+import time
+import threading
+from collections import OrderedDict
+
+# Endpoints cached and for how many seconds their answers are used without
+# asking the server. Once expired, they are revalidated with
+# If-None-Match/If-Modified-Since, so a 0 TTL still saves the download of
+# unchanged answers.
+CACHE_TTLS = {
+    'workspace': 2,
+    'workspaces': 10,
+    'hosts': 0,
+}
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+_WORKSPACE_URL_RE = re.compile(r'^(.*/ws/[^/?]+)')
+
+
+class CacheEntry:
+
+    def __init__(self, body, size, ttl, etag=None, last_modified=None):
+        self.body = body
+        self.size = size
+        self.ttl = ttl
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = time.monotonic()
+
+    def is_fresh(self):
+        return time.monotonic() - self.validated_at < self.ttl
+
+    def can_revalidate(self):
+        return bool(self.etag or self.last_modified)
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def revalidated(self):
+        self.validated_at = time.monotonic()
+
+
+class ConditionalGetCache:
+    """An LRU of CacheEntry bounded by the size of the cached answers.
+
+    Keys are (url, params, cookies) tuples, as built by server._get.
+    """
+
+    def __init__(self, max_bytes=None, ttls=None):
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_MAX_BYTES
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0,
+                          'invalidations': 0}
+
+    def ttl_for(self, endpoint):
+        """Return the TTL of endpoint, None if it is not cached."""
+        return self.ttls.get(endpoint)
+
+    def count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters['evictions'] += 1
+
+    def invalidate(self, url):
+        """Forget the answers of the workspace modified by a request to url,
+        or all of them if the url isn't of a workspace."""
+        match = _WORKSPACE_URL_RE.match(url)
+        workspace_url = match.group(1) if match else None
+
+        def modified(cached_url):
+            return (workspace_url is None or cached_url == workspace_url
+                    or cached_url.startswith(workspace_url + '/'))
+
+        with self._lock:
+            for key in [key for key in self._entries if modified(key[0])]:
+                self._bytes -= self._entries.pop(key).size
+                self._counters['invalidations'] += 1
+            # The list of workspaces includes their numbers
+            for key in [key for key in self._entries if key[0].rstrip('/').endswith('/ws')]:
+                self._bytes -= self._entries.pop(key).size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+            return stats
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Return the process wide cache of GET answers, creating it on first use."""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = ConditionalGetCache()
+        return _http_cache
+
+
+def configure_http_cache(max_bytes=None, ttls=None):
+    """Replace the process wide cache of GET answers. Use ttls={} to
+    disable it."""
+    global _http_cache
+    with _http_cache_lock:
+        _http_cache = ConditionalGetCache(max_bytes, ttls)
+        return _http_cache
+
+# I'm Py3
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Incremental decoding of the big list responses of the server, for example
+{"count": 3, "rows": [{...}, {...}, {...}]}. The elements of the array are
+decoded and yielded while the response is being read from the socket, so
+the whole text of the response is never kept in memory.
+"""
+from __future__ import absolute_import
+
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+_COMPACT_THRESHOLD = 64 * 1024
+
+
+class JSONArrayStream:
+    """Iterate over the elements of the array found in the key array_key of
+    a json object, reading it from chunks, an iterable of bytes (like
+    requests' Response.iter_content).
+
+    The other keys of the object are decoded normally and stored in the
+    extra dictionary, which is complete once the iteration finished.
+    """
+
+    def __init__(self, chunks, array_key, encoding='utf-8'):
+        self.array_key = array_key
+        self.extra = {}
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self):
+        """Append the next chunk to the buffer. Return False if there was
+        nothing else to read."""
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                text = self._text_decoder.decode(b'', final=True)
+            else:
+                text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        return False
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _peek(self):
+        """Return the next non whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                raise self._error('Unexpected end of the response')
+
+    def _consume(self, *expected):
+        char = self._peek()
+        if char not in expected:
+            raise self._error('Expecting one of {0}'.format(', '.join(expected)))
+        self._pos += 1
+        return char
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            truncated_number = (end == len(self._buffer)
+                                and isinstance(value, (int, float))
+                                and not isinstance(value, bool))
+            if truncated_number and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._consume('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._consume(':')
+            if key == self.array_key and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._decode_value()
+                        if self._consume(',', ']') == ']':
+                            break
+            else:
+                self.extra[key] = self._decode_value()
+            if self._consume(',', '}') == '}':
+                break
+
+
+def iter_json_array(chunks, array_key):
+    """Return a generator of the elements of the array in key array_key
+    of the json object read from chunks."""
+    return iter(JSONArrayStream(chunks, array_key))
+
+# I'm Py3
@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Latency, size and status statistics of the requests made to the server,
+grouped by logical endpoint (hosts, vulns, bulk_create, commands...).
+"""
+from __future__ import absolute_import
+
+import time
+import threading
+from collections import Counter
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class EndpointMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status_codes = Counter()
+        self.messages = 0
+
+    def observe_latency(self, seconds):
+        self.latency_sum += seconds
+        for index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= upper_bound:
+                self.latency_buckets[index] += 1
+                break
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'in_flight': self.in_flight,
+            'latency_sum': self.latency_sum,
+            'latency_avg': self.latency_sum / self.requests if self.requests else 0.0,
+            'latency_histogram': dict(zip(LATENCY_BUCKETS, self.latency_buckets)),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'status_codes': {str(status): count for status, count in self.status_codes.items()},
+            'messages': self.messages,
+        }
+
+
+class RequestTracker:
+    """Returned by ServerMetrics.start, call finish once the request
+    is over, successful or not."""
+
+    def __init__(self, metrics, endpoint):
+        self._metrics = metrics
+        self.endpoint = endpoint
+        self._start = time.monotonic()
+
+    def finish(self, response=None, bytes_sent=None, bytes_received=None):
+        elapsed = time.monotonic() - self._start
+        status = 'error'
+        if response is not None:
+            status = response.status_code
+            if bytes_sent is None:
+                bytes_sent = _request_size(response)
+            if bytes_received is None:
+                bytes_received = _response_size(response)
+        self._metrics._finish(self.endpoint, elapsed, status,
+                              bytes_sent or 0, bytes_received or 0)
+
+
+def _request_size(response):
+    request = getattr(response, 'request', None)
+    body = getattr(request, 'body', None)
+    if not body:
+        return 0
+    if hasattr(body, '__len__'):
+        return len(body)
+    return 0
+
+
+def _response_size(response):
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        return int(content_length)
+    # Don't read streamed responses just to know their size
+    if getattr(response, '_content_consumed', False) and response._content:
+        return len(response._content)
+    return 0
+
+
+class ServerMetrics:
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = EndpointMetrics()
+            self._endpoints[endpoint] = metrics
+        return metrics
+
+    def start(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).in_flight += 1
+        return RequestTracker(self, endpoint)
+
+    def _finish(self, endpoint, elapsed, status, bytes_sent, bytes_received):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.in_flight -= 1
+            metrics.requests += 1
+            metrics.observe_latency(elapsed)
+            metrics.status_codes[status] += 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+
+    def observe_message(self, endpoint, size):
+        """Count a message received outside a request, like the ones of
+        the websockets changes stream."""
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.messages += 1
+            metrics.bytes_received += size
+
+    def observe_error(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).status_codes['error'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in self._endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+
+def _labels(**labels):
+    return ','.join('{0}="{1}"'.format(key, str(value).replace('"', '\\"'))
+                    for key, value in labels.items())
+
+
+def prometheus_text(endpoints, pool_stats=None, resilience_stats=None, coalesced_stats=None):
+    """Return the snapshot of ServerMetrics (and optionally the stats of the
+    session pool, the resilience layer and the coalesced requests) in the
+    Prometheus text format."""
+    lines = [
+        '# HELP faraday_client_requests_total Requests made to the faraday server.',
+        '# TYPE faraday_client_requests_total counter',
+    ]
+    for endpoint, metrics in sorted(endpoints.items()):
+        for status, count in sorted(metrics['status_codes'].items()):
+            lines.append('faraday_client_requests_total{{{0}}} {1}'.format(
+                _labels(endpoint=endpoint, status=status), count))
+    lines += [
+        '# HELP faraday_client_request_duration_seconds Latency of the requests made to the faraday server.',
+        '# TYPE faraday_client_request_duration_seconds histogram',
+    ]
+    for endpoint, metrics in sorted(endpoints.items()):
+        cumulative = 0
+        for upper_bound, count in sorted(metrics['latency_histogram'].items()):
+            cumulative += count
+            lines.append('faraday_client_request_duration_seconds_bucket{{{0}}} {1}'.format(
+                _labels(endpoint=endpoint, le=upper_bound), cumulative))
+        lines.append('faraday_client_request_duration_seconds_bucket{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint, le='+Inf'), metrics['requests']))
+        lines.append('faraday_client_request_duration_seconds_sum{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint), metrics['latency_sum']))
+        lines.append('faraday_client_request_duration_seconds_count{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint), metrics['requests']))
+    lines += [
+        '# HELP faraday_client_bytes_total Bytes sent to and received from the faraday server.',
+        '# TYPE faraday_client_bytes_total counter',
+    ]
+    for endpoint, metrics in sorted(endpoints.items()):
+        lines.append('faraday_client_bytes_total{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint, direction='sent'), metrics['bytes_sent']))
+        lines.append('faraday_client_bytes_total{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint, direction='received'), metrics['bytes_received']))
+    lines += [
+        '# HELP faraday_client_requests_in_flight Requests waiting for an answer of the faraday server.',
+        '# TYPE faraday_client_requests_in_flight gauge',
+    ]
+    for endpoint, metrics in sorted(endpoints.items()):
+        lines.append('faraday_client_requests_in_flight{{{0}}} {1}'.format(
+            _labels(endpoint=endpoint), metrics['in_flight']))
+    lines += [
+        '# HELP faraday_client_messages_total Messages received from the faraday server.',
+        '# TYPE faraday_client_messages_total counter',
+    ]
+    for endpoint, metrics in sorted(endpoints.items()):
+        if metrics['messages']:
+            lines.append('faraday_client_messages_total{{{0}}} {1}'.format(
+                _labels(endpoint=endpoint), metrics['messages']))
+    if pool_stats is not None:
+        lines += [
+            '# TYPE faraday_client_pool_open_connections gauge',
+            'faraday_client_pool_open_connections {0}'.format(pool_stats['open_connections']),
+            '# TYPE faraday_client_pool_reuse_ratio gauge',
+            'faraday_client_pool_reuse_ratio {0}'.format(pool_stats['reuse_ratio']),
+        ]
+    if resilience_stats is not None:
+        lines += [
+            '# TYPE faraday_client_retries_total counter',
+            'faraday_client_retries_total {0}'.format(resilience_stats['retries']),
+            '# TYPE faraday_client_circuit_open gauge',
+        ]
+        for name, breaker in sorted(resilience_stats['breakers'].items()):
+            lines.append('faraday_client_circuit_open{{{0}}} {1}'.format(
+                _labels(circuit=name), int(breaker['state'] != 'closed')))
+    if coalesced_stats is not None:
+        lines += [
+            '# HELP faraday_client_coalesced_requests_total Requests saved by sharing the answer of an identical one.',
+            '# TYPE faraday_client_coalesced_requests_total counter',
+            'faraday_client_coalesced_requests_total {0}'.format(coalesced_stats['saved']),
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+_server_metrics = ServerMetrics()
+
+
+def get_server_metrics():
+    return _server_metrics
+
+# I'm Py3
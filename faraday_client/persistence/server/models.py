@@ -8,10 +8,12 @@ See the file 'doc/LICENSE' for the license information
 """
 from __future__ import absolute_import
 
+import sys
 import logging
 from time import time
 import traceback
-from threading import Lock, Condition, RLock, Event
+from collections import defaultdict
+from threading import Lock, Condition, RLock
 from faraday_client.persistence.server import server
 from faraday_client.persistence.server.server_io_exceptions import (WrongObjectSignature,
                                                      CantAccessConfigurationWithoutTheClient)
@@ -28,6 +30,7 @@ from faraday_client.persistence.server.utils import (force_unique,
 
 from faraday_client.model.diff import ModelObjectDiff, MergeSolver
 from faraday_client.model.conflict import ConflictUpdate
+from faraday_client.model.id_future import IDFuture, TemporaryID
 from functools import wraps
 from difflib import Differ
 
@@ -95,6 +98,42 @@ def _flatten_dictionary(dictionary):
             flattened_dict[k] = v
     return flattened_dict
 
+
+_NUMERIC_SEVERITIES = {'0': 'info',
+                       '1': 'low',
+                       '2': 'med',
+                       '3': 'high',
+                       '4': 'critical'}
+# raw severity -> standarized one, there are only a handful of them
+_STANDARIZED_SEVERITIES = {}
+
+
+def _standarize_severity(severity):
+    """Return severity as one of info, low, med, high, critical or
+    unclassified. The returned strings are interned, so all the vulns with
+    the same severity share it."""
+    standarized = _STANDARIZED_SEVERITIES.get(severity) if type(severity) is str else None
+    if standarized is not None:
+        return standarized
+    # Transform all severities into lower strings
+    standarized = str(severity).lower()
+    # If it has info, med, high, critical in it, standarized to it
+    for known_severity in ('info', 'low', 'med', 'high', 'critical'):
+        if standarized[0:3] in known_severity:
+            standarized = known_severity
+            break
+    # Transform numeric severity into desc severity
+    if standarized not in _NUMERIC_SEVERITIES.values():
+        standarized = _NUMERIC_SEVERITIES.get(standarized, 'unclassified')
+    standarized = sys.intern(standarized)
+    if type(severity) is str:
+        _STANDARIZED_SEVERITIES[severity] = standarized
+    return standarized
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
 # NOTE: what is a faraday_ready object?
 # it's an instance of the classes defined on this module
 # created from a dictionary of faraday_ready_dictionaries
@@ -108,14 +147,17 @@ def _flatten_dictionary(dictionary):
 
 
 def _get_faraday_ready_objects(workspace_name, faraday_ready_object_dictionaries,
-                               faraday_object_name):
+                               faraday_object_name, compact=False, lazy=False):
     """Takes a workspace name, a faraday object ('hosts', 'vulns',
     or 'services') a row_name (the name of the row where
     the information about the objects live) and an arbitray number
     of params to customize to request.
 
     Return a list of faraday objects: either
-    Host, Service, Vuln, VulnWeb, Credential or Command.
+    Host, Service, Vuln, VulnWeb, Credential or Command. If compact is True,
+    hosts, services and vulns are their read-only Compact variants, if lazy
+    is True they are their Lazy variants, which keep the dictionaries
+    without flattening them.
     """
     object_to_class = {'hosts': Host,
                        'vulns': Vuln,
@@ -124,8 +166,15 @@ def _get_faraday_ready_objects(workspace_name, faraday_ready_object_dictionaries
                        'notes': Note,
                        'credentials': Credential,
                        'commands': Command}
+    if lazy:
+        object_to_class.update(_LAZY_CLASSES)
+    elif compact:
+        object_to_class.update(_COMPACT_CLASSES)
 
     appropiate_class = object_to_class[faraday_object_name]
+    if issubclass(appropiate_class, _LazyModel):
+        return [appropiate_class(object_dictionary, workspace_name)
+                for object_dictionary in faraday_ready_object_dictionaries or []]
     faraday_objects = []
     if faraday_ready_object_dictionaries:
         for object_dictionary in faraday_ready_object_dictionaries:
@@ -134,12 +183,13 @@ def _get_faraday_ready_objects(workspace_name, faraday_ready_object_dictionaries
     return faraday_objects
 
 
-def _get_faraday_ready_hosts(workspace_name, hosts_dictionaries):
+def _get_faraday_ready_hosts(workspace_name, hosts_dictionaries, compact=False, lazy=False):
     """Return a list of Hosts created with the information found on hosts_dictionaries"""
-    return _get_faraday_ready_objects(workspace_name, hosts_dictionaries, 'hosts')
+    return _get_faraday_ready_objects(workspace_name, hosts_dictionaries, 'hosts', compact, lazy)
 
 
-def _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, vulns_type=None):
+def _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, vulns_type=None, compact=False,
+                             lazy=False):
     """Return a list of Vuln or VulnWeb objects created with the information found on
     vulns_dictionaries.
 
@@ -147,18 +197,24 @@ def _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, vulns_type=None
     Otherwise, vuln_type will be inferred for every vuln_dictionary.
     """
     if vulns_type:
-        return _get_faraday_ready_objects(workspace_name, vulns_dictionaries, vulns_type)
-
-    vulns = [vuln for vuln in vulns_dictionaries if vuln['value']['type'] == 'Vulnerability']
-    web_vulns = [w_vuln for w_vuln in vulns_dictionaries if w_vuln['value']['type'] == 'VulnerabilityWeb']
-    faraday_ready_vulns = _get_faraday_ready_objects(workspace_name, vulns, 'vulns')
-    faraday_ready_web_vulns = _get_faraday_ready_objects(workspace_name, web_vulns, 'vulns_web')
+        return _get_faraday_ready_objects(workspace_name, vulns_dictionaries, vulns_type, compact, lazy)
+
+    # Split them in one pass, the Vulnerabilities go before the VulnerabilityWebs
+    vulns_by_type = {'Vulnerability': [], 'VulnerabilityWeb': []}
+    for vuln in vulns_dictionaries:
+        same_type_vulns = vulns_by_type.get(vuln.get('value', vuln)['type'])
+        if same_type_vulns is not None:
+            same_type_vulns.append(vuln)
+    faraday_ready_vulns = _get_faraday_ready_objects(workspace_name, vulns_by_type['Vulnerability'],
+                                                     'vulns', compact, lazy)
+    faraday_ready_web_vulns = _get_faraday_ready_objects(workspace_name, vulns_by_type['VulnerabilityWeb'],
+                                                         'vulns_web', compact, lazy)
     return faraday_ready_vulns + faraday_ready_web_vulns
 
 
-def _get_faraday_ready_services(workspace_name, services_dictionaries):
+def _get_faraday_ready_services(workspace_name, services_dictionaries, compact=False, lazy=False):
     """Return a list of Services created with the information found on services_dictionaries"""
-    return _get_faraday_ready_objects(workspace_name, services_dictionaries, 'services')
+    return _get_faraday_ready_objects(workspace_name, services_dictionaries, 'services', compact, lazy)
 
 
 def _get_faraday_ready_credentials(workspace_name, credentials_dictionaries):
@@ -186,14 +242,15 @@ def get_changes_stream(workspace_name):
                                      heartbeat='1000')
 
 
-def get_hosts(workspace_name, **params):
+def get_hosts(workspace_name, compact=False, lazy=False, **params):
     """Take a workspace name and a arbitrary number of params to customize the
     request.
 
-    Return a list of Host objects.
+    Return a list of Host objects, or CompactHost if compact is True, or
+    LazyHost if lazy is True.
     """
     host_dictionaries = server.get_hosts(workspace_name, **params)
-    return _get_faraday_ready_hosts(workspace_name, host_dictionaries)
+    return _get_faraday_ready_hosts(workspace_name, host_dictionaries, compact, lazy)
 
 
 def get_host(workspace_name, host_id=None, **params):
@@ -207,24 +264,27 @@ def get_host(workspace_name, host_id=None, **params):
         return hosts.pop()
 
 
-def get_all_vulns(workspace_name, **params):
+def get_all_vulns(workspace_name, compact=False, lazy=False, **params):
     """Take a workspace name and a arbitrary number of params to customize the
     request.
 
-    Return a list with Vuln and VulnWeb objects.
+    Return a list with Vuln and VulnWeb objects, or their Compact variants
+    if compact is True, or their Lazy ones if lazy is True.
     """
     vulns_dictionaries = server.get_all_vulns(workspace_name, **params)
-    return _get_faraday_ready_vulns(workspace_name, vulns_dictionaries)
+    return _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, compact=compact, lazy=lazy)
 
 
-def get_vulns(workspace_name, **params):
+def get_vulns(workspace_name, compact=False, lazy=False, **params):
     """Take a workspace name and a arbitrary number of params to customize the
     request.
 
-    Return a list of Vuln objects.
+    Return a list of Vuln objects, or CompactVuln if compact is True, or
+    LazyVuln if lazy is True.
     """
     vulns_dictionaries = server.get_vulns(workspace_name, **params)
-    return _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, vulns_type='vulns')
+    return _get_faraday_ready_vulns(workspace_name, vulns_dictionaries, vulns_type='vulns',
+                                    compact=compact, lazy=lazy)
 
 
 def get_vuln(workspace_name, vuln_id=None, **params):
@@ -232,14 +292,16 @@ def get_vuln(workspace_name, vuln_id=None, **params):
     return force_unique(get_vulns(workspace_name, object_id=vuln_id, **params))
 
 
-def get_web_vulns(workspace_name, **params):
+def get_web_vulns(workspace_name, compact=False, lazy=False, **params):
     """Take a workspace name and a arbitrary number of params to customize the
     request.
 
-    Return a list of VulnWeb objects.
+    Return a list of VulnWeb objects, or CompactVulnWeb if compact is True,
+    or LazyVulnWeb if lazy is True.
     """
     vulns_web_dictionaries = server.get_web_vulns(workspace_name, **params)
-    return _get_faraday_ready_vulns(workspace_name, vulns_web_dictionaries, vulns_type='vulns_web')
+    return _get_faraday_ready_vulns(workspace_name, vulns_web_dictionaries, vulns_type='vulns_web',
+                                    compact=compact, lazy=lazy)
 
 
 def get_web_vuln(workspace_name, vuln_id=None, **params):
@@ -247,17 +309,18 @@ def get_web_vuln(workspace_name, vuln_id=None, **params):
     return force_unique(get_web_vulns(workspace_name, object_id=vuln_id, **params))
 
 
-def get_services(workspace_name, **params):
+def get_services(workspace_name, compact=False, lazy=False, **params):
     """Take a workspace name and a arbitrary number of params to customize the
     request.
 
-    Return a list of Services objects
+    Return a list of Services objects, or CompactService if compact is True,
+    or LazyService if lazy is True.
     """
     services_dictionary = server.get_services(workspace_name, **params)
     # List inside of list, use the inside list...
     if len(services_dictionary) > 0 and type(services_dictionary[0]) == list:
         services_dictionary = services_dictionary[0]
-    return _get_faraday_ready_services(workspace_name, services_dictionary)
+    return _get_faraday_ready_services(workspace_name, services_dictionary, compact, lazy)
 
 
 def get_service(workspace_name, service_id=None, **params):
@@ -316,6 +379,151 @@ def get_command(workspace_name, command_id):
     return force_unique(get_commands(workspace_name, id=command_id))
 
 
+def iter_hosts(workspace_name, page_size=None, compact=False, lazy=False, **params):
+    """Take a workspace name, the amount of hosts to request per page and
+    an arbitrary number of params to customize the request.
+
+    Return a generator of Host objects (CompactHost if compact is True,
+    LazyHost if lazy is True), which requests the hosts from the server one
+    page at a time.
+    """
+    host_class = LazyHost if lazy else CompactHost if compact else Host
+    for host_dictionary in server.iter_hosts(workspace_name, page_size=page_size, **params):
+        if not lazy:
+            host_dictionary = _flatten_dictionary(host_dictionary)
+        yield host_class(host_dictionary, workspace_name)
+
+
+def iter_vulns(workspace_name, page_size=None, compact=False, lazy=False, **params):
+    """Take a workspace name, the amount of vulns to request per page and
+    an arbitrary number of params to customize the request.
+
+    Return a generator of Vuln and VulnWeb objects (their Compact variants
+    if compact is True, their Lazy ones if lazy is True), which requests the
+    vulns from the server one page at a time.
+    """
+    vuln_class, vuln_web_class = ((LazyVuln, LazyVulnWeb) if lazy else
+                                  (CompactVuln, CompactVulnWeb) if compact else
+                                  (Vuln, VulnWeb))
+    for vuln_dictionary in server.iter_vulns(workspace_name, page_size=page_size, **params):
+        if not lazy:
+            vuln_dictionary = _flatten_dictionary(vuln_dictionary)
+        if vuln_dictionary.get('value', vuln_dictionary)['type'] == 'VulnerabilityWeb':
+            yield vuln_web_class(vuln_dictionary, workspace_name)
+        else:
+            yield vuln_class(vuln_dictionary, workspace_name)
+
+
+def iter_services(workspace_name, page_size=None, compact=False, lazy=False, **params):
+    """Take a workspace name, the amount of services to request per page and
+    an arbitrary number of params to customize the request.
+
+    Return a generator of Service objects (CompactService if compact is
+    True, LazyService if lazy is True), which requests the services from
+    the server one page at a time.
+    """
+    service_class = LazyService if lazy else CompactService if compact else Service
+    for service_dictionary in server.iter_services(workspace_name, page_size=page_size, **params):
+        if not lazy:
+            service_dictionary = _flatten_dictionary(service_dictionary)
+        yield service_class(service_dictionary, workspace_name)
+
+
+def iter_credentials(workspace_name, page_size=None, **params):
+    """Take a workspace name, the amount of credentials to request per page
+    and an arbitrary number of params to customize the request.
+
+    Return a generator of Credential objects, which requests the credentials
+    from the server one page at a time.
+    """
+    for credential_dictionary in server.iter_credentials(workspace_name, page_size=page_size, **params):
+        yield Credential(_flatten_dictionary(credential_dictionary), workspace_name)
+
+
+PREFETCHABLE_RELATIONS = ('services', 'vulns')
+
+
+def prefetch(objects, *relations, page_size=None):
+    """Take hosts and services of a workspace and the relations to
+    prefetch: 'services' (of the hosts) and/or 'vulns' (of the hosts and
+    services, including the services just prefetched).
+
+    Request the related objects of all of them at once, walking the pages
+    of the workspace's services and vulns (or with the filters of the
+    object if there's only one host), and index them by parent, so
+    getServices, getService and getVulns answer from memory from then on.
+    The prefetched objects are of the same kind (regular, compact or lazy)
+    as the first of objects.
+
+    Return objects as a list.
+    """
+    objects = list(objects)
+    unknown_relations = set(relations) - set(PREFETCHABLE_RELATIONS)
+    if unknown_relations:
+        raise ValueError('Can not prefetch {0}, only {1}'.format(
+            ', '.join(sorted(unknown_relations)), ', '.join(PREFETCHABLE_RELATIONS)))
+    if not objects:
+        return objects
+    workspace_name = objects[0]._workspace_name
+    kind = {'compact': isinstance(objects[0], CompactModelBase),
+            'lazy': isinstance(objects[0], _LazyModel)}
+    hosts = [obj for obj in objects if obj.class_signature == Host.class_signature]
+    services = [obj for obj in objects if obj.class_signature == Service.class_signature]
+    # With only one host, the filters of getServices and getVulns get all
+    # that's needed in one request
+    only_one_host = len(hosts) == 1 and not services
+
+    if 'services' in relations and hosts:
+        if only_one_host:
+            host = hosts[0]
+            services_by_host = {host._server_id: get_services(workspace_name, host_id=host._server_id,
+                                                              **kind)}
+        else:
+            host_ids = {host._server_id for host in hosts}
+            rows = [row for row in server.iter_services(workspace_name, page_size=page_size)
+                    if _service_parent(_flatten_dictionary(row)) in host_ids]
+            services_by_host = defaultdict(list)
+            for service in _get_faraday_ready_services(workspace_name, rows, **kind):
+                services_by_host[service.parent_id].append(service)
+        for host in hosts:
+            host._prefetch('services', services_by_host[host._server_id])
+            services.extend(services_by_host[host._server_id])
+
+    if 'vulns' in relations and (hosts or services):
+        targets = {host.ip for host in hosts}
+        service_ids = {service._server_id for service in services}
+        if only_one_host:
+            rows = server.get_all_vulns(workspace_name, target=hosts[0].ip)
+        else:
+            rows = server.iter_vulns(workspace_name, page_size=page_size)
+        vulns_by_target = defaultdict(list)
+        vulns_by_service = defaultdict(list)
+        for row in rows:
+            vuln = _flatten_dictionary(row)
+            in_host = vuln.get('target') in targets
+            in_service = vuln.get('parent_type') == 'Service' and vuln.get('parent') in service_ids
+            if in_host or in_service:
+                # Build only the vulns of the objects, and only once
+                vuln_objects = _get_faraday_ready_vulns(workspace_name, [row], **kind)
+                if not vuln_objects:
+                    continue
+                vuln_object = vuln_objects[0]
+                if in_host:
+                    vulns_by_target[vuln['target']].append(vuln_object)
+                if in_service:
+                    vulns_by_service[vuln['parent']].append(vuln_object)
+        for host in hosts:
+            host._prefetch('vulns', vulns_by_target[host.ip])
+        for service in services:
+            service._prefetch('vulns', vulns_by_service[service._server_id])
+    return objects
+
+
+def _service_parent(service_dictionary):
+    return (service_dictionary.get('parent') or service_dictionary.get('host_id') or
+            service_dictionary.get('service_id'))
+
+
 def get_object(workspace_name, object_signature, object_id):
     """Given a workspace name, an object_signature as string  and an arbitrary
     number of query params, return a list a dictionaries containg information
@@ -721,6 +929,9 @@ class ModelBase:
     given to us and indeed raise an exception if it wasn't. We can provide
     a default argument for 'description': if nothing came, assume empty string,
     """
+    # relation -> objects, filled by prefetch
+    _prefetched = None
+
     def __init__(self, obj, workspace_name):
         self._workspace_name = workspace_name
         self._server_id = obj.get('_id', None)
@@ -731,12 +942,11 @@ class ModelBase:
         self.description = obj.get('description', "")
         self.owned = obj.get('owned', False)
         self.owner = obj.get('owner', '')
-        self._metadata = obj.get('metadata', Metadata(self.owner))
+        # Metadata walks the stack, don't create it if it came in obj
+        self._metadata = obj['metadata'] if 'metadata' in obj else Metadata(self.owner)
         self.parent_id = obj.get('parent')
         self.updates = []
-        self.id_available = Event()
-        if self.id is not None:
-            self.id_available.set()
+        self.id_future = IDFuture(self.id)
         self.parent_type = obj.get('parent_type', None)
 
     def getParentType(self):
@@ -755,19 +965,12 @@ class ModelBase:
         if id:
             self.id = id
             self._server_id = id
-            self.id_available.set()
+            if not isinstance(id, TemporaryID):
+                self.id_future.set(id)
 
     def getID(self):
-        # getId will wait until the id is not None
-        timeout = 1
-        retries = 1
-        max_retries = 4
-        while retries <= max_retries and self.id is None:
-            if timeout >= 8:
-                logger.info('Retrying getID timeout {0}'.format(timeout))
-            self.id_available.wait(timeout=timeout)
-            timeout = timeout << retries - 1
-            retries += 1
+        """Return the id of the object, a TemporaryID while it is waiting
+        to be saved. Use id_future to be notified of the server id."""
         return self.id
 
     @staticmethod
@@ -857,6 +1060,18 @@ class ModelBase:
     def getDescription(self):
         return self.description
 
+    def _prefetch(self, relation, objects):
+        if self._prefetched is None:
+            self._prefetched = {}
+        self._prefetched[relation] = objects
+
+    def _get_prefetched(self, relation):
+        """Return a copy of the objects prefetched for relation, None if it
+        wasn't prefetched."""
+        if self._prefetched is None or relation not in self._prefetched:
+            return None
+        return list(self._prefetched[relation])
+
 
 class Host(ModelBase):
     """A simple Host class. Should implement all the methods of the
@@ -923,18 +1138,28 @@ class Host(ModelBase):
         """
         Get all vulns of this host.
         """
+        prefetched = self._get_prefetched('vulns')
+        if prefetched is not None:
+            return prefetched
         return get_all_vulns(self._workspace_name, target=self.ip)
 
     def getServices(self):
         """
         Get all services of this host.
         """
+        prefetched = self._get_prefetched('services')
+        if prefetched is not None:
+            return prefetched
         return get_services(self._workspace_name, host_id=self._server_id)
 
     def getService(self, service_id):
         """
         Get a specific service id of this host.
         """
+        prefetched = self._get_prefetched('services')
+        if prefetched is not None:
+            return force_unique([service for service in prefetched
+                                 if str(service.getID()) == str(service_id)])
         return get_service(self._workspace_name, hostid=self._server_id, service_id=service_id)
 
 class Service(ModelBase):
@@ -1014,6 +1239,9 @@ class Service(ModelBase):
         """
         Get all vulns of this service.
         """
+        prefetched = self._get_prefetched('vulns')
+        if prefetched is not None:
+            return prefetched
         return get_all_vulns(self._workspace_name, service_id=self._server_id)
 
 
@@ -1084,32 +1312,7 @@ class Vuln(ModelBase):
         return (prop1, prop2)
 
     def standarize(self, severity):
-        # Transform all severities into lower strings
-        severity = str(severity).lower()
-        # If it has info, med, high, critical in it, standarized to it:
-
-
-        def align_string_based_vulns(severity):
-            severities = ['info','low', 'med', 'high', 'critical']
-            for sev in severities:
-                if severity[0:3] in sev:
-                    return sev
-            return severity
-
-        severity = align_string_based_vulns(severity)
-
-        # Transform numeric severity into desc severity
-        numeric_severities = { '0' : 'info',
-                                 '1' : 'low',
-                                 '2' : 'med',
-                                 '3' : 'high',
-                                 "4" : 'critical' }
-
-
-        if not severity in numeric_severities.values():
-            severity = numeric_severities.get(severity, 'unclassified')
-
-        return severity
+        return _standarize_severity(severity)
 
     def updateAttributes(self, name=None, desc=None, data=None,
                          severity=None, resolution=None, refs=None, status=None, policyviolations=None, external_id=None):
@@ -1356,6 +1559,351 @@ class VulnWeb(Vuln):
         else:
             return None
 
+_EMPTY = ()
+
+
+def _or_empty(value):
+    """Empty lists and dicts take ~60 bytes each, share a tuple instead."""
+    return value if value else _EMPTY
+
+
+class CompactModelBase:
+    """The base of the read-only variants of Host, Service, Vuln and VulnWeb,
+    selected with compact=True in get_hosts, get_all_vulns, iter_vulns and
+    the like. They are meant for scripts reading big workspaces:
+
+    * they have __slots__ instead of a __dict__
+    * their id_future and Metadata are created the first time they're used
+    * severity, status and os are interned strings, and empty lists are
+      replaced by a shared empty tuple
+
+    They have the getters of the regular models but can't be updated nor
+    merged, and they aren't instances of them.
+    """
+    __slots__ = ('_workspace_name', '_server_id', 'id', 'name', 'description',
+                 'owned', 'owner', 'parent_id', 'parent_type', '_metadata', '_id_future',
+                 '_prefetched')
+
+    def __init__(self, obj, workspace_name):
+        self._workspace_name = workspace_name
+        self._server_id = obj.get('_id', None)
+        self.id = obj.get('id', self._server_id)
+        if not self._server_id:
+            self._server_id = self.id
+        self.name = obj.get('name')
+        self.description = obj.get('description', "")
+        self.owned = obj.get('owned', False)
+        self.owner = obj.get('owner', '')
+        self._metadata = obj.get('metadata')
+        self.parent_id = obj.get('parent')
+        self.parent_type = obj.get('parent_type', None)
+        self._id_future = None
+        self._prefetched = None
+
+    @property
+    def id_future(self):
+        if self._id_future is None:
+            self._id_future = IDFuture(self.id)
+        return self._id_future
+
+    def getMetadata(self):
+        if self._metadata is None:
+            self._metadata = Metadata(self.owner)
+        return self._metadata
+
+    def getUpdates(self):
+        return []
+
+    getParentType = ModelBase.getParentType
+    getParent = ModelBase.getParent
+    getID = ModelBase.getID
+    publicattrsrefs = staticmethod(ModelBase.publicattrsrefs)
+    getOwner = ModelBase.getOwner
+    isOwned = ModelBase.isOwned
+    getName = ModelBase.getName
+    getDescription = ModelBase.getDescription
+    _prefetch = ModelBase._prefetch
+    _get_prefetched = ModelBase._get_prefetched
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.id)
+
+
+class CompactHost(CompactModelBase):
+    """Read-only Host, see CompactModelBase."""
+    __slots__ = ('default_gateway', 'os', 'vuln_amount', 'ip', 'hostnames', 'mac')
+    class_signature = Host.class_signature
+
+    def __init__(self, host, workspace_name):
+        CompactModelBase.__init__(self, host, workspace_name)
+        self.default_gateway = host.get('default_gateway')
+        self.os = _intern(host.get('os')) if host.get('os') else 'unknown'
+        self.vuln_amount = int(host.get('vulns', 0))
+        self.ip = host.get('ip', self.name)
+        self.hostnames = _or_empty(host.get('hostnames'))
+        self.mac = host.get('mac', '') if host.get('mac') else ''
+
+    getName = Host.getName
+    publicattrsrefs = staticmethod(Host.publicattrsrefs)
+    __str__ = Host.__str__
+    getOS = Host.getOS
+    getVulnsAmount = Host.getVulnsAmount
+    getDefaultGateway = Host.getDefaultGateway
+    getHostnames = Host.getHostnames
+    getMac = Host.getMac
+    getVulns = Host.getVulns
+    getServices = Host.getServices
+    getService = Host.getService
+
+
+class CompactService(CompactModelBase):
+    """Read-only Service, see CompactModelBase."""
+    __slots__ = ('protocol', 'ports', 'version', 'status', 'vuln_amount')
+    class_signature = Service.class_signature
+
+    def __init__(self, service, workspace_name):
+        CompactModelBase.__init__(self, service, workspace_name)
+        self.protocol = _intern(service['protocol'])
+        self.parent_id = service.get('parent') or service.get('host_id') or service.get('service_id')
+        if type(service['ports']) == int:
+            self.ports = [service['ports']]
+        else:
+            self.ports = list(map(int, service['ports']))
+        self.version = service['version']
+        self.status = _intern(service['status'])
+        self.vuln_amount = int(service.get('vulns', 0))
+
+    publicattrsrefs = staticmethod(Service.publicattrsrefs)
+    __str__ = Service.__str__
+    getStatus = Service.getStatus
+    getPorts = Service.getPorts
+    getVersion = Service.getVersion
+    getProtocol = Service.getProtocol
+    getVulnsAmount = Service.getVulnsAmount
+    getVulns = Service.getVulns
+
+
+class CompactVuln(CompactModelBase):
+    """Read-only Vuln, see CompactModelBase."""
+    __slots__ = ('data', 'severity', 'refs', 'confirmed', 'resolution', 'status',
+                 'policyviolations', 'external_id')
+    class_signature = Vuln.class_signature
+
+    def __init__(self, vuln, workspace_name):
+        CompactModelBase.__init__(self, vuln, workspace_name)
+        # desc and description are the same thing, keep only one of them
+        self.description = vuln['desc']
+        self.data = vuln.get('data')
+        self.severity = _standarize_severity(vuln['severity'])
+        self.refs = _or_empty(vuln.get('refs'))
+        self.confirmed = vuln.get('confirmed', False)
+        self.resolution = vuln.get('resolution')
+        self.status = _intern(vuln.get('status', "opened"))
+        self.policyviolations = _or_empty(vuln.get('policyviolations'))
+        self.external_id = vuln.get('external_id')
+
+    @property
+    def desc(self):
+        return self.description
+
+    publicattrsrefs = staticmethod(Vuln.publicattrsrefs)
+    getDesc = Vuln.getDesc
+    getData = Vuln.getData
+    getSeverity = Vuln.getSeverity
+    getRefs = Vuln.getRefs
+    getConfirmed = Vuln.getConfirmed
+    getResolution = Vuln.getResolution
+    getStatus = Vuln.getStatus
+    getPolicyViolations = Vuln.getPolicyViolations
+    getExternalID = Vuln.getExternalID
+
+
+class CompactVulnWeb(CompactVuln):
+    """Read-only VulnWeb, see CompactModelBase."""
+    __slots__ = ('path', 'website', 'request', 'response', 'method', 'pname', 'params',
+                 'query', 'attachments', 'hostnames', 'impact', 'service', 'tags', 'target')
+    class_signature = VulnWeb.class_signature
+
+    def __init__(self, vuln_web, workspace_name):
+        CompactVuln.__init__(self, vuln_web, workspace_name)
+        self.path = vuln_web.get('path')
+        self.website = vuln_web.get('website')
+        self.request = vuln_web.get('request')
+        self.response = vuln_web.get('response')
+        self.method = vuln_web.get('method') or ''
+        self.pname = vuln_web.get('pname')
+        self.params = vuln_web.get('params') or ''
+        self.query = vuln_web.get('query')
+        self.attachments = vuln_web.get('_attachments')
+        self.hostnames = _or_empty(vuln_web.get('hostnames'))
+        self.impact = vuln_web.get('impact')
+        self.service = vuln_web.get('service')
+        self.tags = _or_empty(vuln_web.get('tags'))
+        self.target = vuln_web.get('target')
+        self.parent_type = 'Service'
+
+    publicattrsrefs = staticmethod(VulnWeb.publicattrsrefs)
+    getPath = VulnWeb.getPath
+    getWebsite = VulnWeb.getWebsite
+    getRequest = VulnWeb.getRequest
+    getResponse = VulnWeb.getResponse
+    getMethod = VulnWeb.getMethod
+    getPname = VulnWeb.getPname
+    getParams = VulnWeb.getParams
+    getQuery = VulnWeb.getQuery
+    getAttachments = VulnWeb.getAttachments
+    getHostnames = VulnWeb.getHostnames
+    getImpact = VulnWeb.getImpact
+    getService = VulnWeb.getService
+    getTags = VulnWeb.getTags
+    getTarget = VulnWeb.getTarget
+
+
+_COMPACT_CLASSES = {'hosts': CompactHost,
+                    'vulns': CompactVuln,
+                    'vulns_web': CompactVulnWeb,
+                    'services': CompactService}
+
+
+def _lazy_id(obj):
+    return obj._get('id', obj._get('_id'))
+
+
+def _lazy_server_id(obj):
+    return obj._get('_id') or obj.id
+
+
+def _lazy_metadata(obj):
+    metadata = obj._get('metadata', _MISSING)
+    return Metadata(obj.owner) if metadata is _MISSING else metadata
+
+
+def _lazy_ports(obj):
+    ports = obj._get('ports')
+    return [ports] if type(ports) == int else list(map(int, ports))
+
+
+_MISSING = object()
+
+_LAZY_MODEL_FIELDS = {
+    '_server_id': _lazy_server_id,
+    'id': _lazy_id,
+    'name': lambda obj: obj._get('name'),
+    'description': lambda obj: obj._get('description', ""),
+    'owned': lambda obj: obj._get('owned', False),
+    'owner': lambda obj: obj._get('owner', ''),
+    '_metadata': _lazy_metadata,
+    'parent_id': lambda obj: obj._get('parent'),
+    'updates': lambda obj: [],
+    'id_future': lambda obj: IDFuture(obj.id),
+    'parent_type': lambda obj: obj._get('parent_type'),
+}
+
+
+class _LazyModel:
+    """Mixin of the lazy variants of Host, Service, Vuln and VulnWeb,
+    selected with lazy=True in get_hosts, get_all_vulns, iter_vulns and the
+    like.
+
+    They keep the dictionary of the server as is (without flattening it)
+    and decode every attribute the first time it is read, with the function
+    of the same name in _lazy_fields. After that, it is a regular attribute.
+    Reading a couple of fields of many objects costs almost nothing, and
+    they are still instances of the regular models, which can be updated.
+    """
+    _lazy_fields = _LAZY_MODEL_FIELDS
+
+    def __init__(self, obj, workspace_name):
+        self._workspace_name = workspace_name
+        self._row = obj
+
+    def _get(self, key, default=None):
+        """Return key like _flatten_dictionary(self._row).get(key, default)"""
+        row = self._row
+        value = row.get('value', row)
+        if key == '_id':
+            return row['_id'] if row.get('_id') else default
+        if key in value:
+            return value[key]
+        if key == 'id' and row.get('id'):
+            return row['id']
+        return default
+
+    def __getattr__(self, name):
+        decode = self._lazy_fields.get(name)
+        if decode is None or '_row' not in self.__dict__:
+            raise AttributeError("'{0}' object has no attribute '{1}'".format(type(self).__name__, name))
+        decoded = decode(self)
+        setattr(self, name, decoded)
+        return decoded
+
+
+class LazyHost(_LazyModel, Host):
+    _lazy_fields = dict(_LAZY_MODEL_FIELDS, **{
+        'default_gateway': lambda obj: obj._get('default_gateway'),
+        'os': lambda obj: _intern(obj._get('os')) if obj._get('os') else 'unknown',
+        'vuln_amount': lambda obj: int(obj._get('vulns', 0)),
+        'ip': lambda obj: obj._get('ip', obj.name),
+        'hostnames': lambda obj: obj._get('hostnames') or [],
+        'mac': lambda obj: obj._get('mac') or '',
+    })
+
+
+class LazyService(_LazyModel, Service):
+    _lazy_fields = dict(_LAZY_MODEL_FIELDS, **{
+        'protocol': lambda obj: obj._get('protocol'),
+        'parent_id': lambda obj: obj._get('parent') or obj._get('host_id') or obj._get('service_id'),
+        'ports': _lazy_ports,
+        'version': lambda obj: obj._get('version'),
+        'status': lambda obj: _intern(obj._get('status')),
+        'vuln_amount': lambda obj: int(obj._get('vulns', 0)),
+    })
+
+
+_LAZY_VULN_FIELDS = dict(_LAZY_MODEL_FIELDS, **{
+    'description': lambda obj: obj._get('desc'),
+    'desc': lambda obj: obj._get('desc'),
+    'data': lambda obj: obj._get('data'),
+    'severity': lambda obj: _standarize_severity(obj._get('severity')),
+    'refs': lambda obj: obj._get('refs') or [],
+    'confirmed': lambda obj: obj._get('confirmed', False),
+    'resolution': lambda obj: obj._get('resolution'),
+    'status': lambda obj: _intern(obj._get('status', "opened")),
+    'policyviolations': lambda obj: obj._get('policyviolations', list()),
+    'external_id': lambda obj: obj._get('external_id'),
+})
+
+
+class LazyVuln(_LazyModel, Vuln):
+    _lazy_fields = _LAZY_VULN_FIELDS
+
+
+class LazyVulnWeb(_LazyModel, VulnWeb):
+    _lazy_fields = dict(_LAZY_VULN_FIELDS, **{
+        'path': lambda obj: obj._get('path'),
+        'website': lambda obj: obj._get('website'),
+        'request': lambda obj: obj._get('request'),
+        'response': lambda obj: obj._get('response'),
+        'method': lambda obj: obj._get('method') or '',
+        'pname': lambda obj: obj._get('pname'),
+        'params': lambda obj: obj._get('params') or '',
+        'query': lambda obj: obj._get('query'),
+        'attachments': lambda obj: obj._get('_attachments'),
+        'hostnames': lambda obj: obj._get('hostnames'),
+        'impact': lambda obj: obj._get('impact'),
+        'service': lambda obj: obj._get('service'),
+        'tags': lambda obj: obj._get('tags', list()),
+        'target': lambda obj: obj._get('target'),
+        'parent_type': lambda obj: 'Service',
+    })
+
+
+_LAZY_CLASSES = {'hosts': LazyHost,
+                 'vulns': LazyVuln,
+                 'vulns_web': LazyVulnWeb,
+                 'services': LazyService}
+
+
 class Note(ModelBase):
     class_signature = 'Note'
 
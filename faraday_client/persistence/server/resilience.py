@@ -0,0 +1,322 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Retries, backoff and circuit breaking for the requests made to the server
+by server._unsafe_io_with_server.
+"""
+from __future__ import absolute_import
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from faraday_client.persistence.server.utils import get_logical_endpoint
+from faraday_client.persistence.server.server_io_exceptions import ServerUnavailable
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+# Statuses which mean the server did not process the request, so any method
+# can be retried after them.
+NOT_PROCESSED_STATUSES = frozenset([429, 503])
+RETRYABLE_STATUSES = frozenset([429, 502, 503, 504])
+
+
+class RetryPolicy:
+    """Decides which requests are retried and how long to wait before.
+
+    Requests with idempotent methods are retried on connection errors,
+    timeouts and RETRYABLE_STATUSES. Other methods (POST) are only retried
+    when the server did not process them: connection timeouts and
+    NOT_PROCESSED_STATUSES.
+
+    The wait is an exponential backoff with full jitter, unless the server
+    sent a Retry-After header.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, backoff_max=30.0):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+    def is_retryable(self, method, response=None, exception=None):
+        idempotent = method in IDEMPOTENT_METHODS
+        if exception is not None:
+            if isinstance(exception, requests.exceptions.ConnectTimeout):
+                return True
+            return idempotent and isinstance(exception, (requests.exceptions.ConnectionError,
+                                                         requests.exceptions.Timeout))
+        if response.status_code in NOT_PROCESSED_STATUSES:
+            return True
+        return idempotent and response.status_code in RETRYABLE_STATUSES
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def retry_after(self, response):
+        """Return the seconds to wait asked by the server in the Retry-After
+        header, None if there isn't one."""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(self.backoff_max, max(0.0, seconds))
+
+    def delay(self, attempt, response=None):
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """Stops sending requests to an endpoint after failure_threshold
+    consecutive failures (connection errors or 5xx responses).
+
+    After reset_timeout seconds one trial request is let through: if it
+    succeeds the circuit is closed again, otherwise it stays open for
+    another reset_timeout.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_in(self):
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info('Circuit of %s closed, server answering again', self.name)
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning('Circuit of %s opened after %s consecutive failures',
+                                   self.name, self.consecutive_failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': self.retry_in(),
+        }
+
+
+class RetryBudget:
+    """Limits retries to a ratio of the requests made in the last window
+    seconds (with a floor of min_retries_per_second), so retries can't
+    multiply the load of an already overloaded server."""
+
+    def __init__(self, ratio=0.2, min_retries_per_second=1.0, window=10.0):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        for timestamps in (self._requests, self._retries):
+            while timestamps and now - timestamps[0] > self.window:
+                timestamps.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            allowed = max(self.min_retries_per_second * self.window,
+                          self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return {'requests_in_window': len(self._requests),
+                    'retries_in_window': len(self._retries)}
+
+
+class ServerIOResilience:
+    """Runs the requests to the server applying a RetryPolicy, a
+    CircuitBreaker per server and logical endpoint and a shared
+    RetryBudget."""
+
+    def __init__(self, policy=None, budget=None, failure_threshold=5, reset_timeout=30.0):
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._counters = {'retries': 0, 'retries_exhausted': 0,
+                          'budget_denied': 0, 'breaker_rejections': 0}
+        self._lock = threading.Lock()
+
+    def breaker_for(self, server_url):
+        name = '{0}/{1}'.format(urlparse(server_url).netloc, get_logical_endpoint(server_url))
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+                self._breakers[name] = breaker
+            return breaker
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _can_retry(self, method, attempt, response=None, exception=None):
+        if not self.policy.is_retryable(method, response=response, exception=exception):
+            return False
+        if attempt >= self.policy.max_retries:
+            self._count('retries_exhausted')
+            return False
+        if not self.budget.try_acquire():
+            self._count('budget_denied')
+            return False
+        return True
+
+    def call(self, server_io_function, server_url, **payload):
+        """Call server_io_function(server_url, **payload), retrying it while
+        the policy allows it.
+
+        Return the last response, which may still have a failure status.
+
+        Raises:
+            ServerUnavailable: if the circuit of the endpoint is open.
+            requests.exceptions.RequestException: the last exception raised
+                by server_io_function, if retries didn't help.
+        """
+        method = getattr(server_io_function, '__name__', '').upper()
+        breaker = self.breaker_for(server_url)
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                self._count('breaker_rejections')
+                raise ServerUnavailable(server_url, breaker.name, breaker.retry_in())
+            try:
+                response = server_io_function(server_url, **payload)
+            except requests.exceptions.RequestException as ex:
+                breaker.record_failure()
+                if not self._can_retry(method, attempt, exception=ex):
+                    raise
+                delay = self.policy.delay(attempt)
+                logger.info('Retrying %s %s in %.2fs after error: %s',
+                            method, server_url, delay, ex)
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not self._can_retry(method, attempt, response=response):
+                    return response
+                delay = self.policy.delay(attempt, response)
+                logger.info('Retrying %s %s in %.2fs after status %s',
+                            method, server_url, delay, response.status_code)
+                response.close()
+            self._count('retries')
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            breakers = list(self._breakers.values())
+        counters['budget'] = self.budget.stats()
+        counters['breakers'] = {breaker.name: breaker.stats() for breaker in breakers}
+        return counters
+
+
+_default_resilience = None
+_default_resilience_lock = threading.Lock()
+
+
+def get_server_io_resilience():
+    """Return the process wide resilience layer, creating it on first use."""
+    global _default_resilience
+    with _default_resilience_lock:
+        if _default_resilience is None:
+            _default_resilience = ServerIOResilience()
+        return _default_resilience
+
+
+def configure_server_io_resilience(max_retries=3, backoff_factor=0.5, backoff_max=30.0,
+                                   budget_ratio=0.2, min_retries_per_second=1.0,
+                                   failure_threshold=5, reset_timeout=30.0):
+    """Replace the process wide resilience layer with a new configuration.
+    Use max_retries=0 to disable retries."""
+    global _default_resilience
+    with _default_resilience_lock:
+        _default_resilience = ServerIOResilience(
+            policy=RetryPolicy(max_retries, backoff_factor, backoff_max),
+            budget=RetryBudget(budget_ratio, min_retries_per_second),
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout)
+        return _default_resilience
+
+
+def get_resilience_stats():
+    return get_server_io_resilience().stats()
+
+# I'm Py3
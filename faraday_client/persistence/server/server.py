@@ -16,6 +16,10 @@ Note:
     FARADAY_UP should be set to False in the copy of the file, and SERVER_URL
     must be a valid server url.
 
+    Instead, you can create a ServerClient with the url and cookies of the
+    server and make it the default one with set_default_client, or
+    activate it only in the threads which use it.
+
 Warning:
     This module was though of primarly as a way of querying and removing
     information from the Faraday Server. Adding objects is supported, but should
@@ -26,7 +30,12 @@ from __future__ import absolute_import
 import sys
 import json
 import logging
-from time import sleep
+import copy
+import functools
+import threading
+from time import sleep, monotonic
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 import urllib.parse as urlparse
 from urllib.parse import urlencode
@@ -37,7 +46,14 @@ init(autoreset=True)
 import requests
 
 from faraday_client import __version__ as f_version
-from faraday_client.persistence.server.utils import force_unique
+from faraday_client.persistence.server.utils import force_unique, get_logical_endpoint
+from faraday_client.persistence.server.metrics import get_server_metrics, prometheus_text
+from faraday_client.persistence.server.json_stream import JSONArrayStream
+from faraday_client.persistence.server.single_flight import SingleFlight
+from faraday_client.persistence.server.http_cache import CacheEntry, get_http_cache
+from faraday_client.persistence.server.compression import get_request_compressor
+from faraday_client.persistence.server.resilience import get_server_io_resilience, get_resilience_stats  # pylint:disable=unused-import
+from faraday_client.persistence.server.connection_pool import ServerSessionPool, get_session_pool
 from faraday_client.persistence.server.server_io_exceptions import (WrongObjectSignature,
                                                      CantCommunicateWithServerError,
                                                      ConflictInDatabase,
@@ -69,6 +85,16 @@ OBJECT_TYPE_END_POINT_MAPPER = {
     'Note': 'comment',
     'Cred': 'credential',
 }
+# Amount of objects requested per page by the iter_* functions
+PAGE_SIZE = 500
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAMABLE_END_POINTS = {
+    'hosts': 'hosts',
+    'vulns': 'vulns',
+    'services': 'services',
+    'credentials': 'credential',
+    'commands': 'commands',
+}
 
 
 
@@ -78,8 +104,7 @@ def _conf():
     return CONF
 
 
-def _get_base_server_url():
-
+def _legacy_base_server_url():
     # Faraday server is running, and this module is used by upload_reports...
     if FARADAY_UPLOAD_REPORTS_OVERWRITE_SERVER_URL:
         server_url = FARADAY_UPLOAD_REPORTS_OVERWRITE_SERVER_URL
@@ -89,9 +114,182 @@ def _get_base_server_url():
         server_url = SERVER_URL
     return server_url.rstrip('/')
 
+
+def _legacy_session_cookies():
+    if FARADAY_UPLOAD_REPORTS_WEB_COOKIE:
+        return FARADAY_UPLOAD_REPORTS_WEB_COOKIE
+    return _conf().getFaradaySessionCookies()
+
+
+class ServerClient:
+    """The connection to one faraday server: its base url, the auth
+    cookies and the session pool used to talk to it.
+
+    Every function of this module uses the client active in the current
+    thread (see activate), or the default client if there is none. The
+    default client is built from the module globals (SERVER_URL,
+    FARADAY_UP...) and the client configuration, as before.
+
+    Several clients can be used at the same time from different threads,
+    for example to upload the same report to two servers:
+
+        staging = ServerClient('https://staging:5985', cookies=staging_cookies)
+        with staging.activate():
+            models.create_host(...)
+
+    Args:
+        server_url (str): the base url of the server. If None, it is read
+            from the module globals and the configuration on every call.
+        cookies (dict): the session cookies to send. If None, they are read
+            from the configuration on every call.
+        username (str), password (str): credentials, for the scripts which
+            need to login by themselves.
+        session_pool (ServerSessionPool): the pool of connections to use.
+            Clients with their own server_url get their own pool.
+    """
+
+    def __init__(self, server_url=None, cookies=None, username=None, password=None,
+                 session_pool=None):
+        self._server_url = server_url.rstrip('/') if server_url else None
+        self._cookies = cookies
+        self._username = username
+        self._password = password
+        if session_pool is None and self._server_url:
+            session_pool = ServerSessionPool()
+        self._session_pool = session_pool
+        self._api_urls = {}
+
+    def __repr__(self):
+        return '<ServerClient {0}>'.format(self._server_url or 'default')
+
+    @property
+    def base_url(self):
+        if self._server_url:
+            return self._server_url
+        return _legacy_base_server_url()
+
+    @property
+    def api_url(self):
+        base_url = self.base_url
+        api_url = self._api_urls.get(base_url)
+        if api_url is None:
+            api_url = "{0}/_api/v3".format(base_url)
+            self._api_urls[base_url] = api_url
+        return api_url
+
+    @property
+    def cookies(self):
+        if self._cookies is not None:
+            return self._cookies
+        return _legacy_session_cookies()
+
+    @cookies.setter
+    def cookies(self, cookies):
+        self._cookies = cookies
+
+    @property
+    def username(self):
+        return self._username if self._username is not None else AUTH_USER
+
+    @property
+    def password(self):
+        return self._password if self._password is not None else AUTH_PASS
+
+    @property
+    def session_pool(self):
+        return self._session_pool or get_session_pool()
+
+    @contextmanager
+    def activate(self):
+        """Make this client the one used by the functions of this module
+        (and of models) in the current thread, inside the with block."""
+        stack = _active_clients_stack()
+        stack.append(self)
+        try:
+            yield self
+        finally:
+            stack.pop()
+
+    def call(self, function, *args, **kwargs):
+        """Call function, any function of this module or of models,
+        with this client active."""
+        with self.activate():
+            return function(*args, **kwargs)
+
+    def wrap(self, function):
+        """Return function bound to this client, to run it in another
+        thread (thread pools, prefetchers...)."""
+        return functools.partial(self.call, function)
+
+    def get(self, request_url, **params):
+        return self.call(_get, request_url, **params)
+
+    def put(self, put_url, expected_response=201, **params):
+        return self.call(_put, put_url, expected_response, **params)
+
+    def post(self, post_url, expected_response=201, **params):
+        return self.call(_post, post_url, expected_response=expected_response, **params)
+
+    def delete(self, delete_url, database=False):
+        return self.call(_delete, delete_url, database)
+
+    def get_hosts(self, workspace_name, **params):
+        return self.call(get_hosts, workspace_name, **params)
+
+    def get_all_vulns(self, workspace_name, **params):
+        return self.call(get_all_vulns, workspace_name, **params)
+
+    def get_services(self, workspace_name, **params):
+        return self.call(get_services, workspace_name, **params)
+
+    def get_workspaces_names(self):
+        return self.call(get_workspaces_names)
+
+    def bulk_create(self, workspace_name, data):
+        return self.call(bulk_create, workspace_name, data)
+
+    def server_info(self):
+        return self.call(server_info)
+
+
+_client_context = threading.local()
+_default_client = ServerClient()
+_single_flight = SingleFlight()
+
+
+def _active_clients_stack():
+    stack = getattr(_client_context, 'stack', None)
+    if stack is None:
+        stack = []
+        _client_context.stack = stack
+    return stack
+
+
+def get_default_client():
+    return _default_client
+
+
+def set_default_client(client):
+    """Make client the one used by every thread without an active client.
+    Return the previous default client."""
+    global _default_client
+    previous_client = _default_client
+    _default_client = client
+    return previous_client
+
+
+def get_current_client():
+    """Return the client active in this thread, or the default one."""
+    stack = _active_clients_stack()
+    return stack[-1] if stack else _default_client
+
+
+def _get_base_server_url():
+    return get_current_client().base_url
+
 def _create_server_api_url():
     """Return the server's api url."""
-    return "{0}/_api/v3".format(_get_base_server_url())
+    return get_current_client().api_url
 
 def _create_server_get_url(workspace_name, object_name=None, object_id=None, **params):
     """Creates a url to get from the server. Takes the workspace name
@@ -162,13 +360,10 @@ def _create_server_db_url(workspace_name):
 
 def _add_session_cookies(func):
     """A decorator which wrapps a function dealing with I/O with the server and
-    adds authentication to the parameters.
+    adds authentication, the cookies of the current client, to the parameters.
     """
     def wrapper(*args, **kwargs):
-        if FARADAY_UPLOAD_REPORTS_WEB_COOKIE:
-            kwargs['cookies'] = FARADAY_UPLOAD_REPORTS_WEB_COOKIE
-        else:
-            kwargs['cookies'] = _conf().getFaradaySessionCookies()
+        kwargs['cookies'] = get_current_client().cookies
         response = func(*args, **kwargs)
         return response
     return wrapper if FARADAY_UP else func
@@ -185,8 +380,9 @@ def _unsafe_io_with_server(server_io_function, server_expected_responses,
     Return the response from the server.
     """
     answer = None
+    tracker = get_server_metrics().start(get_logical_endpoint(server_url))
     try:
-        answer = server_io_function(server_url, **payload)
+        answer = get_server_io_resilience().call(server_io_function, server_url, **payload)
         if answer.status_code == 409:
             raise ConflictInDatabase(answer)
         if answer.status_code == 404:
@@ -203,6 +399,8 @@ def _unsafe_io_with_server(server_io_function, server_expected_responses,
         except ValueError:
             logger.debug('Could not decode json from server')
         raise CantCommunicateWithServerError(server_io_function, server_url, payload, answer)
+    finally:
+        tracker.finish(answer)
     return answer
 
 def _parse_json(response_object):
@@ -220,12 +418,55 @@ def _get(request_url, **params):
     Will raise a CantCommunicateWithServerError if requests cant stablish
     connection to server or if response is not equal to 200.
 
+    Identical requests made at the same time from other threads share the
+    answer of the first one (see SingleFlight). Answers of the endpoints in
+    the http cache are reused while fresh and revalidated with
+    If-None-Match/If-Modified-Since once they expire.
+
     Return a dictionary with the information in the json.
     """
-    return _parse_json(_unsafe_io_with_server(requests.get,
-                                              [200],
-                                              request_url,
-                                              params=params))
+    client = get_current_client()
+    request_key = (request_url,
+                   json.dumps(params, sort_keys=True, default=str),
+                   json.dumps(client.cookies, sort_keys=True, default=str))
+
+    def get_from_server():
+        return _parse_json(_unsafe_io_with_server(client.session_pool.get,
+                                                  [200],
+                                                  request_url,
+                                                  params=params))
+
+    def get_cached_or_from_server(cache, ttl):
+        entry = cache.get(request_key)
+        if entry is not None and entry.is_fresh():
+            cache.count('hits')
+            return copy.deepcopy(entry.body)
+        headers = {}
+        if entry is not None and entry.can_revalidate():
+            headers = entry.validators()
+        answer = _unsafe_io_with_server(client.session_pool.get,
+                                        [200, 304],
+                                        request_url,
+                                        params=params,
+                                        headers=headers)
+        if answer.status_code == 304 and headers:
+            cache.count('revalidated')
+            entry.revalidated()
+            return copy.deepcopy(entry.body)
+        cache.count('misses')
+        body = _parse_json(answer)
+        etag = answer.headers.get('ETag')
+        last_modified = answer.headers.get('Last-Modified')
+        if ttl > 0 or etag or last_modified:
+            cache.put(request_key, CacheEntry(copy.deepcopy(body), len(answer.content), ttl,
+                                              etag, last_modified))
+        return body
+
+    cache = get_http_cache()
+    ttl = cache.ttl_for(get_logical_endpoint(request_url))
+    if ttl is None:
+        return _single_flight.do(request_key, get_from_server)
+    return _single_flight.do(request_key, lambda: get_cached_or_from_server(cache, ttl))
 
 def _put(post_url, expected_response=201, **params):
     """Put to the post_url. If update is True, try to get the object
@@ -240,17 +481,69 @@ def _put(post_url, expected_response=201, **params):
     Return a dictionary with the response from couchdb, which looks like this:
     {u'id': u'61', u'ok': True, u'rev': u'1-967a00dff5e02add41819138abb3284d'}
     """
-    return _parse_json(_unsafe_io_with_server(requests.put,
-                                              [expected_response],
-                                              post_url,
-                                              json=params))
+    answer = _unsafe_io_with_server(get_current_client().session_pool.put,
+                                    [expected_response],
+                                    post_url,
+                                    json=params)
+    get_http_cache().invalidate(post_url)
+    return _parse_json(answer)
 
 
 def _post(post_url, update=False, expected_response=201, **params):
-    return _parse_json(_unsafe_io_with_server(requests.post,
-                                              [expected_response],
-                                              post_url,
-                                              json=params))
+    answer = _unsafe_io_with_server(get_current_client().session_pool.post,
+                                    [expected_response],
+                                    post_url,
+                                    json=params)
+    get_http_cache().invalidate(post_url)
+    return _parse_json(answer)
+
+
+def _post_body(post_url, body, expected_response=201, content_encoding=None):
+    """Post an already serialized json body to post_url, with the
+    Content-Encoding it was compressed with, if any.
+
+    Return the response from the server.
+    """
+    headers = {'Content-Type': 'application/json'}
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    answer = _unsafe_io_with_server(get_current_client().session_pool.post,
+                                    [expected_response],
+                                    post_url,
+                                    data=body,
+                                    headers=headers)
+    get_http_cache().invalidate(post_url)
+    return answer
+
+
+def _post_compressed(post_url, expected_response=201, **params):
+    """Like _post, but compressing the body when it is big enough and the
+    server accepts compressed bodies (see RequestCompressor).
+
+    If the server rejects the compressed body, it is sent again uncompressed
+    and, if that works, the server won't get compressed bodies anymore.
+    """
+    compressor = get_request_compressor()
+    body = json.dumps(params).encode('utf-8')
+    encoding = compressor.encoding_for(post_url, len(body))
+    start = monotonic()
+    if encoding is not None:
+        compressed_body = compressor.compress(body, encoding)
+        try:
+            answer = _post_body(post_url, compressed_body, expected_response, encoding)
+        except CantCommunicateWithServerError as ex:
+            if not compressor.is_rejection(ex.response):
+                raise
+            logger.debug('Compressed body rejected by the server, retrying without compression')
+        else:
+            compressor.record(post_url, encoding, len(body), len(compressed_body),
+                              monotonic() - start)
+            return _parse_json(answer)
+    answer = _post_body(post_url, body, expected_response)
+    if encoding is not None:
+        compressor.mark_unsupported(post_url, encoding)
+    compressor.record(post_url, None, len(body), len(body), monotonic() - start)
+    return _parse_json(answer)
 
 
 def _delete(delete_url, database=False):
@@ -260,10 +553,12 @@ def _delete(delete_url, database=False):
     if not database:
         last_rev = _get(delete_url)['_rev']
         params = {'rev': last_rev}
-    return _parse_json(_unsafe_io_with_server(requests.delete,
-                                              [200,204],
-                                              delete_url,
-                                              params=params))
+    answer = _unsafe_io_with_server(get_current_client().session_pool.delete,
+                                    [200,204],
+                                    delete_url,
+                                    params=params)
+    get_http_cache().invalidate(delete_url)
+    return _parse_json(answer)
 
 
 def _get_raw_hosts(workspace_name, **params):
@@ -341,6 +636,16 @@ def _delete_from_server(workspace_name, faraday_object_type, faraday_object_id):
     return _delete(delete_url)
 
 
+def _get_raw_function(faraday_object_name):
+    object_to_func = {'hosts': _get_raw_hosts,
+                      'vulns': _get_raw_vulns,
+                      'services': _get_raw_services,
+                      'notes': _get_raw_notes,
+                      'credentials': _get_raw_credentials,
+                      'commands': _get_raw_commands}
+    return object_to_func[faraday_object_name]
+
+
 def _get_faraday_ready_dictionaries(workspace_name, faraday_object_name,
                                     faraday_object_row_name, full_table=True,
                                     **params):
@@ -360,14 +665,7 @@ def _get_faraday_ready_dictionaries(workspace_name, faraday_object_name,
     faraday_object_row_name must be the key to the dictionary which holds
     the information of the object per se in the table. most times this is 'rows'
     """
-    object_to_func = {'hosts': _get_raw_hosts,
-                      'vulns': _get_raw_vulns,
-                      'services': _get_raw_services,
-                      'notes': _get_raw_notes,
-                      'credentials': _get_raw_credentials,
-                      'commands': _get_raw_commands}
-
-    appropiate_function = object_to_func[faraday_object_name]
+    appropiate_function = _get_raw_function(faraday_object_name)
     appropiate_dictionary = appropiate_function(workspace_name, **params)
     faraday_ready_dictionaries = [appropiate_dictionary]
     if faraday_object_row_name in appropiate_dictionary:
@@ -380,6 +678,98 @@ def _get_faraday_ready_dictionaries(workspace_name, faraday_object_name,
     return faraday_ready_dictionaries
 
 
+def _open_stream(workspace_name, faraday_object_name, **params):
+    """Request the table faraday_object_name without reading the body of
+    the response, which must be read with _iter_json_rows and closed."""
+    request_url = _create_server_get_url(workspace_name,
+                                         STREAMABLE_END_POINTS[faraday_object_name])
+    return _unsafe_io_with_server(get_current_client().session_pool.get,
+                                  [200],
+                                  request_url,
+                                  params=params,
+                                  stream=True)
+
+
+def _iter_json_rows(answer, faraday_object_row_name):
+    return JSONArrayStream(answer.iter_content(STREAM_CHUNK_SIZE), faraday_object_row_name)
+
+
+def _get_page(workspace_name, faraday_object_name, faraday_object_row_name,
+              page, page_size, **params):
+    """Return the rows of the page number page and the total amount of
+    objects reported by the server (None if it doesn't report it)."""
+    answer = _open_stream(workspace_name, faraday_object_name, page=page,
+                          page_size=page_size, **params)
+    try:
+        rows_stream = _iter_json_rows(answer, faraday_object_row_name)
+        rows = list(rows_stream)
+    finally:
+        answer.close()
+    return rows, rows_stream.extra.get('count')
+
+
+def _stream_faraday_ready_dictionaries(workspace_name, faraday_object_name,
+                                       faraday_object_row_name, full_table=True,
+                                       **params):
+    """Request the whole table in a single response and yield its objects
+    while they are decoded from the socket."""
+    answer = _open_stream(workspace_name, faraday_object_name, **params)
+    try:
+        for raw_dictionary in _iter_json_rows(answer, faraday_object_row_name):
+            yield raw_dictionary if full_table else raw_dictionary['value']
+    finally:
+        answer.close()
+
+
+def _iter_faraday_ready_dictionaries(workspace_name, faraday_object_name,
+                                     faraday_object_row_name, page_size=None,
+                                     full_table=True, **params):
+    """Like _get_faraday_ready_dictionaries, but return a generator which
+    walks the pages of the table, page_size objects at a time.
+
+    While the objects of a page are being consumed, the next page is
+    requested in the background, so at most two pages are kept in memory.
+    Endpoints which ignore the pagination parameters are detected and
+    yielded as a single page.
+
+    Pages are decoded while they are read from the socket. With a page_size
+    of 0 the whole table is requested at once and every object is yielded
+    as soon as it is decoded.
+    """
+    if page_size == 0:
+        yield from _stream_faraday_ready_dictionaries(workspace_name, faraday_object_name,
+                                                      faraday_object_row_name,
+                                                      full_table=full_table, **params)
+        return
+    page_size = page_size or PAGE_SIZE
+    # The prefetcher thread must use the client of this one
+    fetch_page = functools.partial(get_current_client().wrap(_get_page),
+                                   workspace_name, faraday_object_name,
+                                   faraday_object_row_name, page_size=page_size,
+                                   **params)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="PagePrefetch") as prefetcher:
+        page = 1
+        next_page = prefetcher.submit(fetch_page, page)
+        yielded = 0
+        previous_first_row = None
+        while next_page is not None:
+            rows, count = next_page.result()
+            next_page = None
+            if not rows or rows[0] == previous_first_row:
+                # Empty page or the server is not paginating this endpoint
+                break
+            yielded += len(rows)
+            last_page = (len(rows) != page_size
+                         or (count is not None and yielded >= count))
+            if not last_page:
+                page += 1
+                next_page = prefetcher.submit(fetch_page, page)
+            previous_first_row = rows[0]
+            for raw_dictionary in rows:
+                yield raw_dictionary if full_table else raw_dictionary['value']
+            del rows
+
+
 def get_hosts(workspace_name, **params):
     """Get hosts from the server.
 
@@ -499,6 +889,70 @@ def get_commands(workspace_name, **params):
                                            'commands', **params)
 
 
+def iter_hosts(workspace_name, page_size=None, **params):
+    """Iterate over the hosts of the server, page by page.
+
+    Args:
+        workspace_name (str): the workspace from which to get the hosts.
+        page_size (int): amount of hosts per request, PAGE_SIZE by default.
+            0 to stream all of them in a single response.
+        **params: any of valid request parameters for the server.
+
+    Returns:
+        A generator of dictionaries, one per host matching the query.
+    """
+    return _iter_faraday_ready_dictionaries(workspace_name, 'hosts', 'rows',
+                                            page_size=page_size, **params)
+
+
+def iter_vulns(workspace_name, page_size=None, **params):
+    """Iterate over the vulns, both normal and web, of the server, page by page.
+
+    Args:
+        workspace_name (str): the workspace from which to get the vulns.
+        page_size (int): amount of vulns per request, PAGE_SIZE by default.
+            0 to stream all of them in a single response.
+        **params: any of valid request parameters for the server.
+
+    Returns:
+        A generator of dictionaries, one per vuln matching the query.
+    """
+    return _iter_faraday_ready_dictionaries(workspace_name, 'vulns', 'vulnerabilities',
+                                            page_size=page_size, **params)
+
+
+def iter_services(workspace_name, page_size=None, **params):
+    """Iterate over the services of the server, page by page.
+
+    Args:
+        workspace_name (str): the workspace from which to get the services.
+        page_size (int): amount of services per request, PAGE_SIZE by default.
+            0 to stream all of them in a single response.
+        **params: any of valid request parameters for the server.
+
+    Returns:
+        A generator of dictionaries, one per service matching the query.
+    """
+    return _iter_faraday_ready_dictionaries(workspace_name, 'services', 'services',
+                                            page_size=page_size, **params)
+
+
+def iter_credentials(workspace_name, page_size=None, **params):
+    """Iterate over the credentials of the server, page by page.
+
+    Args:
+        workspace_name (str): the workspace from which to get the credentials.
+        page_size (int): amount of credentials per request, PAGE_SIZE by default.
+            0 to stream all of them in a single response.
+        **params: any of valid request parameters for the server.
+
+    Returns:
+        A generator of dictionaries, one per credential matching the query.
+    """
+    return _iter_faraday_ready_dictionaries(workspace_name, 'credentials', 'rows',
+                                            page_size=page_size, **params)
+
+
 def get_report(workspace_name, object_id):
     """Get an unique report.
 
@@ -1573,6 +2027,34 @@ def create_workspace(workspace_name, description, start_date, finish_date,
                               type="Workspace")
 
 
+def bulk_create(workspace_name, data):
+    """Upload hosts, with their services and vulns, and the command which
+    found them in one request.
+
+    Args:
+        workspace_name (str): the workspace where the objects will be created.
+        data (dict): the bulk_create payload, as generated by the plugins.
+
+    The payload is compressed if it is big and the server accepts it.
+
+    Returns:
+        A dictionary with the server's response.
+    """
+    post_url = _create_server_get_url(workspace_name, 'bulk_create')
+    return _post_compressed(post_url, expected_response=201, **data)
+
+
+def update_command_run(workspace_name, command_id, command_data):
+    """Update the command of id command_id with the dictionary command_data,
+    as given by CommandRunInformation.toDict.
+
+    Returns:
+        A dictionary with the server's response.
+    """
+    put_url = _create_server_put_url(workspace_name, 'CommandRunInformation', command_id, None)
+    return _put(put_url, expected_response=200, **command_data)
+
+
 def delete_host(workspace_name, host_id):
     """Delete host of id host_id from the database."""
     return _delete_from_server(workspace_name, 'Host', host_id)
@@ -1617,6 +2099,29 @@ def server_info():
     except:
         return None
 
+def get_client_metrics():
+    """Return a dictionary with the statistics of the requests made to the
+    server by logical endpoint, the session pool, the retries/breakers, the
+    http cache and the compression of the uploads."""
+    return {
+        'endpoints': get_server_metrics().snapshot(),
+        'connection_pool': get_current_client().session_pool.stats(),
+        'resilience': get_resilience_stats(),
+        'coalesced_requests': _single_flight.stats(),
+        'http_cache': get_http_cache().stats(),
+        'compression': get_request_compressor().stats(),
+    }
+
+
+def get_client_metrics_prometheus():
+    """Return the same information than get_client_metrics as text in the
+    Prometheus exposition format."""
+    return prometheus_text(get_server_metrics().snapshot(),
+                           pool_stats=get_current_client().session_pool.stats(),
+                           resilience_stats=get_resilience_stats(),
+                           coalesced_stats=_single_flight.stats())
+
+
 def login_user(uri, uname, upass, u2fa_token=None):
     auth = {"email": uname, "password": upass}
     headers = {'User-Agent': f'faraday-client/{f_version}'}
@@ -36,6 +36,30 @@ class CantCommunicateWithServerError(ServerRequestException):
                 "to URL {0} and function {1}. Response was {2}".format(self.server_url,
                                                       self.function, response_text))
 
+class ServerUnavailable(CantCommunicateWithServerError):
+    def __init__(self, server_url, endpoint, retry_in):
+        super(ServerUnavailable, self).__init__(None, server_url, None)
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+    def __str__(self):
+        return ("Not requesting URL {0}: the server failed too many times on {1}. "
+                "It will be tried again in {2:.0f} seconds".format(self.server_url,
+                                                                 self.endpoint,
+                                                                 self.retry_in))
+
+class BulkUploadIncomplete(ServerRequestException):
+    def __init__(self, workspace_name, result, state_file):
+        self.workspace_name = workspace_name
+        self.result = result
+        self.state_file = state_file
+
+    def __str__(self):
+        return ("{0} of {1} chunks could not be uploaded to workspace {2}. "
+                "Uploading the same data again will only send them".format(len(self.result.failed),
+                                                                           self.result.chunks,
+                                                                           self.workspace_name))
+
 class ConflictInDatabase(ServerRequestException):
     def __init__(self, answer):
         self.answer = answer
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Coalescing of identical requests made at the same time from several threads.
+"""
+from __future__ import absolute_import
+
+import copy
+import threading
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs only one call per key at a time. Threads asking for a key
+    which is already being requested wait for that request and get a copy
+    of its result (or the same exception) instead of making their own."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.saved = 0
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.saved += 1
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            # Callers may modify what they get, don't share it
+            return copy.deepcopy(call.result)
+        try:
+            result = function()
+        except BaseException as ex:
+            call.exception = ex
+            self._forget(key)
+            call.done.set()
+            raise
+        if self._forget(key):
+            # A private copy for the waiters, the caller may modify result
+            call.result = copy.deepcopy(result)
+        call.done.set()
+        return result
+
+    def _forget(self, key):
+        """Remove the call of key, so the next ones make a new request.
+        Return the amount of threads waiting for its result."""
+        with self._lock:
+            return self._calls.pop(key).waiters
+
+    def stats(self):
+        with self._lock:
+            return {'executed': self.executed,
+                    'saved': self.saved,
+                    'in_flight': len(self._calls)}
+
+# I'm Py3
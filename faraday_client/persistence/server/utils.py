@@ -11,6 +11,7 @@ from __future__ import absolute_import
 import re
 import logging
 import socket
+from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,30 @@ def force_unique(lst):
         raise MoreThanOneObjectFoundByID(lst)
 
 
+def get_logical_endpoint(url):
+    """Return the name of the server endpoint requested by url, without
+    the workspace or object ids, e.g. 'hosts' for
+    http://127.0.0.1:5985/_api/v3/ws/a_ws/hosts/5.
+
+    Used to group statistics and state of the requests made to the server.
+    """
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    if '_api' not in segments:
+        return 'other'
+    segments = segments[segments.index('_api') + 1:]
+    if segments and re.match(r'^v\d+$', segments[0]):
+        segments = segments[1:]
+    if not segments:
+        return 'api'
+    if segments[0] != 'ws':
+        return segments[0]
+    if len(segments) == 1:
+        return 'workspaces'
+    if len(segments) == 2:
+        return 'workspace'
+    return segments[2]
+
+
 def get_object_properties(obj):
     # this sometimes is the metadata object and sometimes its a dictionary
     # a better fix awaits in a brighter future
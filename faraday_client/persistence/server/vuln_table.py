@@ -0,0 +1,291 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+A columnar table of the vulns of a workspace, for scripts which filter or
+count a lot of them. Every filter is done over whole columns by C loops
+(bytes.translate, map and itertools.compress) instead of one Python
+object at a time.
+
+    table = VulnTable.from_workspace('ws')
+    old_info = table.severity_in({'info'}) & table.created_before(time() - 90 * 86400)
+    table.ids(old_info & ~table.status_in({'closed'}))
+    table.group_by('severity', old_info)
+
+To update the selected vulns, iter_vulns_by_id streams them again as Vuln
+and VulnWeb objects.
+"""
+from array import array
+from datetime import datetime, timezone
+from itertools import compress
+from collections import Counter
+import re
+
+from dateutil import parser as date_parser
+
+from faraday_client.persistence.server import models, server
+from faraday_client.persistence.server.models import _standarize_severity
+
+SEVERITIES = ('critical', 'high', 'med', 'low', 'info', 'unclassified')
+VULN_TYPES = ('Vulnerability', 'VulnerabilityWeb')
+
+# Mask flags are 0 and 1, ~ swaps them
+_INVERT = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+def _timestamp(create_time):
+    """Return create_time, a timestamp or an ISO 8601 date (naive ones are
+    UTC), as a timestamp. NaN if it's missing."""
+    if create_time is None or create_time == '':
+        return float('nan')
+    if isinstance(create_time, (int, float)):
+        return float(create_time)
+    try:
+        # Much faster than dateutil, but only on python >= 3.7
+        date = datetime.fromisoformat(create_time)
+    except (AttributeError, ValueError):
+        date = date_parser.parse(create_time)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def _row_id(row):
+    vuln = row.get('value', row)
+    vuln_id = vuln.get('id')
+    return row.get('id', vuln.get('_id')) if vuln_id is None else vuln_id
+
+
+def iter_vulns_by_id(workspace_name, ids, page_size=None, **params):
+    """Return a generator of the Vuln and VulnWeb objects of ids, walking
+    the vulns of the workspace again page by page. Only the selected ones
+    are turned into objects."""
+    ids = set(ids)
+    for row in server.iter_vulns(workspace_name, page_size=page_size, **params):
+        if _row_id(row) not in ids:
+            continue
+        vuln = models._flatten_dictionary(row)
+        if vuln.get('value', vuln)['type'] == 'VulnerabilityWeb':
+            yield models.VulnWeb(vuln, workspace_name)
+        else:
+            yield models.Vuln(vuln, workspace_name)
+
+
+class Categories:
+    """The distinct values of a column, each one stored once and
+    identified by its code, the position in values."""
+
+    def __init__(self, values=(), max_codes=None):
+        self.values = []
+        self._codes = {}
+        self.max_codes = max_codes
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """Return the code of value, adding it if it's new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            if self.max_codes is not None and code >= self.max_codes:
+                raise ValueError('More than {0} different values in a column: {1}'.format(
+                    self.max_codes, value))
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup_table(self, predicate):
+        """Return a bytes with 1 in the codes of the values where predicate
+        is true and 0 in the rest, padded to 256 for bytes.translate."""
+        table = bytearray(max(256, len(self.values)))
+        for code, value in enumerate(self.values):
+            if predicate(value):
+                table[code] = 1
+        return bytes(table)
+
+
+class Mask:
+    """The rows of a VulnTable selected by a filter, one byte per row (0 or
+    1). Combine them with &, | and ~."""
+    __slots__ = ('flags',)
+
+    def __init__(self, flags):
+        self.flags = bytes(flags)
+
+    @classmethod
+    def all(cls, size):
+        return cls(b'\x01' * size)
+
+    def __len__(self):
+        return len(self.flags)
+
+    def _combine(self, other, operation):
+        if len(self) != len(other):
+            raise ValueError('Masks of different tables')
+        # Bitwise operations on big ints combine all the bytes at once
+        return Mask(operation(int.from_bytes(self.flags, 'little'),
+                              int.from_bytes(other.flags, 'little')).to_bytes(len(self), 'little'))
+
+    def __and__(self, other):
+        return self._combine(other, int.__and__)
+
+    def __or__(self, other):
+        return self._combine(other, int.__or__)
+
+    def __invert__(self):
+        return Mask(self.flags.translate(_INVERT))
+
+    def count(self):
+        """Return the amount of selected rows."""
+        return self.flags.count(1)
+
+    def indexes(self):
+        return list(compress(range(len(self)), self.flags))
+
+
+class VulnTable:
+    """The vulns of a workspace stored by column: their ids, names, targets,
+    severities, statuses, types and creation times.
+
+    Names and targets are stored once and referred by code, severities,
+    statuses and types are stored as one byte codes. A row takes ~27 bytes.
+    Filters (name_matches, severity_in, status_in, type_in, created_before)
+    return a Mask, which can be passed to ids, values and group_by.
+    """
+
+    def __init__(self):
+        self._ids = array('q')
+        self._names = Categories()
+        self._name_codes = array('L')
+        self._targets = Categories()
+        self._target_codes = array('L')
+        self._severities = Categories(SEVERITIES, max_codes=256)
+        self._severity_codes = bytearray()
+        self._statuses = Categories(max_codes=256)
+        self._status_codes = bytearray()
+        self._types = Categories(VULN_TYPES, max_codes=256)
+        self._type_codes = bytearray()
+        self._create_times = array('d')
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Return a table with the vulns of rows, dictionaries as the server
+        sends them, with or without the 'value' key."""
+        table = cls()
+        for row in rows:
+            table.append(row)
+        return table
+
+    @classmethod
+    def from_workspace(cls, workspace_name, page_size=None, **params):
+        """Return a table with the vulns of the workspace matching params,
+        requested one page at a time. Only the table is kept in memory."""
+        return cls.from_rows(server.iter_vulns(workspace_name, page_size=page_size, **params))
+
+    def append(self, row):
+        vuln = row.get('value', row)
+        self._ids.append(_row_id(row))
+        self._name_codes.append(self._names.code(vuln.get('name')))
+        self._target_codes.append(self._targets.code(vuln.get('target')))
+        self._severity_codes.append(self._severities.code(_standarize_severity(vuln.get('severity'))))
+        self._status_codes.append(self._statuses.code(vuln.get('status', 'opened')))
+        self._type_codes.append(self._types.code(vuln.get('type', 'Vulnerability')))
+        self._create_times.append(_timestamp((vuln.get('metadata') or {}).get('create_time')))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _columns(self):
+        return {
+            'name': (self._names, self._name_codes),
+            'target': (self._targets, self._target_codes),
+            'severity': (self._severities, self._severity_codes),
+            'status': (self._statuses, self._status_codes),
+            'type': (self._types, self._type_codes),
+        }
+
+    def _column(self, column):
+        try:
+            return self._columns()[column]
+        except KeyError:
+            raise ValueError('Unknown column {0}, use one of {1}'.format(
+                column, ', '.join(sorted(self._columns()))))
+
+    def where(self, column, predicate):
+        """Return the Mask of the rows whose value in column satisfies
+        predicate, which is called once per distinct value."""
+        categories, codes = self._column(column)
+        table = categories.lookup_table(predicate)
+        if isinstance(codes, bytearray):
+            return Mask(codes.translate(table))
+        return Mask(map(table.__getitem__, codes))
+
+    def _in(self, column, values):
+        values = frozenset(values)
+        return self.where(column, values.__contains__)
+
+    def name_matches(self, pattern, flags=0):
+        """Return the Mask of the vulns whose name contains pattern."""
+        search = re.compile(pattern, flags).search
+        return self.where('name', lambda name: name is not None and search(name) is not None)
+
+    def severity_in(self, severities):
+        return self._in('severity', map(_standarize_severity, severities))
+
+    def status_in(self, statuses):
+        return self._in('status', statuses)
+
+    def type_in(self, vuln_types):
+        return self._in('type', vuln_types)
+
+    def target_in(self, targets):
+        return self._in('target', targets)
+
+    def created_before(self, timestamp):
+        """Return the Mask of the vulns created before timestamp. Vulns
+        without a creation time are never selected."""
+        return Mask(map(float(timestamp).__gt__, self._create_times))
+
+    def all(self):
+        return Mask.all(len(self))
+
+    def ids(self, mask=None):
+        """Return the ids of the vulns in mask, all of them by default."""
+        if mask is None:
+            return list(self._ids)
+        return list(compress(self._ids, mask.flags))
+
+    def values(self, column, mask=None):
+        """Return the values of column for the vulns in mask."""
+        categories, codes = self._column(column)
+        if mask is not None:
+            codes = compress(codes, mask.flags)
+        return list(map(categories.values.__getitem__, codes))
+
+    def create_times(self, mask=None):
+        if mask is None:
+            return list(self._create_times)
+        return list(compress(self._create_times, mask.flags))
+
+    def group_by(self, column, mask=None):
+        """Return a Counter of the values of column for the vulns in mask."""
+        categories, codes = self._column(column)
+        if mask is not None:
+            codes = compress(codes, mask.flags)
+        if isinstance(codes, bytearray) or (mask is not None and len(categories) <= 256):
+            # Few values, bytes.count is much faster than counting one by one
+            codes = bytes(codes)
+            counts = Counter()
+            for code, value in enumerate(categories.values):
+                count = codes.count(code)
+                if count:
+                    counts[value] = count
+            return counts
+        return Counter({categories.values[code]: count for code, count in Counter(codes).items()})
+
+
+# I'm Py3
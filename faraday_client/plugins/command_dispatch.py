@@ -0,0 +1,185 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Dispatch of the commands typed in the shell to the plugins which may parse
+them, by the name of the program run, instead of creating every plugin and
+matching its regex with every command.
+"""
+import os
+import logging
+import threading
+
+from faraday_plugins.plugins import plugin as plugins_base
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+# Programs which run the program named after them
+WRAPPERS = frozenset(['sudo', 'env', 'sh', 'bash', 'perl', 'ruby', 'python', 'python2', 'python3'])
+# Above this many strings a regex prefix is not expanded
+MAX_EXPANSIONS = 1024
+
+_ANY = None
+
+
+def program_name(command):
+    """Return the name of the program run by command, skipping wrappers
+    like sudo and interpreters, lowercased. None if there isn't one."""
+    for token in command.split():
+        name = os.path.basename(token).lower()
+        if name not in WRAPPERS and not name.startswith('python'):
+            return name
+    return None
+
+
+class _NotLiteral(Exception):
+    pass
+
+
+def _expand(ops):
+    """Return the strings matched by ops, which can only be literals,
+    groups, alternatives or optional parts."""
+    strings = {''}
+    for op, value in ops:
+        if op is sre_constants.LITERAL:
+            options = {chr(value)}
+        elif op is sre_constants.SUBPATTERN:
+            options = _expand(value[-1])
+        elif op is sre_constants.BRANCH:
+            options = set()
+            for branch in value[1]:
+                options |= _expand(branch)
+        elif op is sre_constants.IN:
+            options = set()
+            for item_op, item in value:
+                if item_op is sre_constants.LITERAL:
+                    options.add(chr(item))
+                elif item_op is sre_constants.RANGE and item[1] - item[0] < 16:
+                    options.update(chr(char) for char in range(item[0], item[1] + 1))
+                else:
+                    raise _NotLiteral()
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and value[1] == 1:
+            options = _expand(value[2])
+            if value[0] == 0:
+                options.add('')
+        else:
+            raise _NotLiteral()
+        strings = {string + option for string in strings for option in options}
+        if len(strings) > MAX_EXPANSIONS:
+            raise _NotLiteral()
+    return strings
+
+
+def _is_space(op, value):
+    if op is sre_constants.LITERAL:
+        return chr(value).isspace()
+    if op is sre_constants.IN:
+        return all(item_op is sre_constants.CATEGORY and item is sre_constants.CATEGORY_SPACE
+                   for item_op, item in value)
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        return value[0] >= 1 and len(value[2]) == 1 and _is_space(*value[2][0])
+    return False
+
+
+def regex_program_names(pattern, flags=0):
+    """Return the names (see program_name) of the programs of the commands
+    pattern can match, or None if they can't be known: pattern has to start
+    with a literal part, which may have alternatives, followed by spaces."""
+    try:
+        ops = list(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+    while ops and ops[0][0] is sre_constants.AT and ops[0][1] is sre_constants.AT_BEGINNING:
+        ops.pop(0)
+    for position, (op, value) in enumerate(ops):
+        try:
+            _expand([(op, value)])
+        except _NotLiteral:
+            break
+    else:
+        # Nothing separates the program from what follows it
+        return None
+    if not position or not _is_space(op, value):
+        return None
+    try:
+        prefixes = _expand(ops[:position])
+    except _NotLiteral:
+        return None
+    names = set(map(program_name, prefixes))
+    if None in names:
+        return None
+    return names
+
+
+def _uses_command_regex(plugin):
+    # Plugins with their own check may accept any command
+    return getattr(type(plugin), 'canParseCommandString', None) is plugins_base.PluginBase.canParseCommandString
+
+
+class CommandDispatchIndex:
+    """The ids of the plugins of a faraday_plugins PluginsManager by the
+    names of the programs whose commands they parse. It has the interface
+    of faraday_plugins' CommandAnalyzer and the same answers: the last
+    plugin whose canParseCommandString accepts the command.
+
+    Only the plugins indexed under the program of a command, and those
+    whose regex can't be indexed, are created and asked.
+    """
+
+    def __init__(self, plugins_manager):
+        self.plugins_manager = plugins_manager
+        self._lock = threading.Lock()
+        self.build()
+
+    def build(self):
+        # program name -> [(order, plugin id)], _ANY for any program
+        index = {}
+        for order, (plugin_id, plugin) in enumerate(self.plugins_manager.get_plugins()):
+            command_regex = getattr(plugin, '_command_regex', None)
+            if _uses_command_regex(plugin):
+                if command_regex is None:
+                    continue
+                names = regex_program_names(command_regex.pattern, command_regex.flags)
+            else:
+                names = None
+            for name in names or [_ANY]:
+                index.setdefault(name, []).append((order, plugin_id))
+        with self._lock:
+            self._index = index
+        logger.debug('Commands of %s programs indexed, %s plugins asked about any command',
+                     len(index) - (_ANY in index), len(index.get(_ANY, ())))
+
+    def candidates(self, command_string):
+        """Return the ids of the plugins which may parse command_string, in
+        the order of the plugins manager."""
+        with self._lock:
+            index = self._index
+        candidates = list(index.get(_ANY, ()))
+        name = program_name(command_string)
+        if name is not None:
+            candidates.extend(index.get(name, ()))
+        candidates.sort()
+        return [plugin_id for _, plugin_id in candidates]
+
+    def get_plugin(self, command_string):
+        plugin = None
+        for plugin_id in self.candidates(command_string):
+            candidate = self.plugins_manager.get_plugin(plugin_id)
+            if candidate is None:
+                continue
+            try:
+                if candidate.canParseCommandString(command_string):
+                    plugin = candidate
+            except Exception as e:
+                logger.error("Error in plugin analysis: (%s) %s", plugin_id, e)
+        return plugin
+
+
+# I'm Py3
@@ -6,7 +6,6 @@ See the file 'doc/LICENSE' for the license information
 """
 import json
 
-import requests
 from past.builtins import basestring
 from builtins import range
 
@@ -18,8 +17,13 @@ from threading import Thread
 from multiprocessing import JoinableQueue, Process
 
 from faraday_client.config.configuration import getInstanceConfiguration
-from faraday_client.persistence.server.server import _conf, _get_base_server_url
+from faraday_client.persistence.server.server import update_command_run
+from faraday_client.persistence.server.bulk_upload import BulkUploader
+from faraday_client.managers.outbox_manager import enqueue_bulk_create, enqueue_command_update
+from faraday_client.managers import parse_cache
+from faraday_client.persistence.server.server_io_exceptions import ServerRequestException
 from faraday_client.plugins.plugin import PluginProcess
+from faraday_client.plugins.report_stream import parse_report
 import faraday_client.model.api
 from faraday_client.model.commands_history import CommandRunInformation
 from faraday_client.model import Modelactions
@@ -122,31 +126,42 @@ class PluginController(Thread):
         :param isReport: Report or output from shell
         :return: None
         """
-        plugin.processOutput(output.decode('utf8'))
-        base_url = _get_base_server_url()
-        cookies = _conf().getFaradaySessionCookies()
+        self._sendPluginResults(plugin, command, self._parsePluginOutput(plugin, output))
+
+    def _parsePluginOutput(self, plugin, output):
+        """Make plugin parse output, bytes or str, and return its results."""
+        if isinstance(output, bytes):
+            output = output.decode('utf8')
+        plugin.processOutput(output)
+        return plugin.get_json()
+
+    def _sendPluginResults(self, plugin, command, plugin_result=None):
+        """Send the results of plugin and the duration of command. Return
+        False if the results were queued in the outbox to be sent later."""
         command.duration = time.time() - command.itime
-        plugin_result = plugin.get_json()
-        self.send_data(command.workspace, plugin_result)
+        if plugin_result is None:
+            plugin_result = plugin.get_json()
+        sent = self.send_data(command.workspace, plugin_result)
         command_id = command.getID()
-        data = command.toDict()
+        data = dict(command.toDict())
         data['tool'] = data['command']
-        data.pop('id_available')
-        res = requests.put(
-            f'{base_url}/_api/v3/ws/{command.workspace}/commands/{command_id}',
-            json=data,
-            cookies=cookies)
-        logger.info(f'Sent command duration {res.status_code}')
+        data.pop('id_future', None)
+        try:
+            update_command_run(command.workspace, command_id, data)
+            logger.info('Sent command duration')
+        except ServerRequestException as ex:
+            logger.error('Could not send command duration, it will be sent later: %s', ex)
+            enqueue_command_update(command.workspace, command_id, data)
+        return sent
 
     def send_data(self, workspace, data):
-        cookies = _conf().getFaradaySessionCookies()
-        base_url = _get_base_server_url()
-        res = requests.post(
-            f'{base_url}/_api/v3/ws/{workspace}/bulk_create',
-            cookies=cookies,
-            json=json.loads(data))
-        if res.status_code != 201:
-            logger.error('Server responded with status code {0}. API response was {1}'.format(res.status_code, res.text))
+        data = json.loads(data)
+        try:
+            BulkUploader(workspace).upload(data)
+        except ServerRequestException as ex:
+            logger.error('Server could not create the objects sent, they will be sent later. '
+                         'API response was {0}'.format(ex))
+            enqueue_bulk_create(workspace, data)
             return False
         return True
 
@@ -234,12 +249,25 @@ class PluginController(Thread):
         del self._active_plugins[pid]
         return True
 
-    def processReport(self, plugin_id, filepath, ws_name=None):
+    def processReport(self, plugin_id, filepath, ws_name=None, skip_imported=None):
+        """Parse the report in filepath with plugin_id and send the results
+        to ws_name. Return the id of the command created, False if the
+        plugin doesn't exist, or None if skip_imported (by default
+        parse_cache.SKIP_IMPORTED_REPORTS) and the report was already
+        imported in the workspace."""
         if plugin_id not in [plugin[0] for plugin in self._plugins]:
             logger.warning("Unknown Plugin ID: %s", plugin_id)
             return False
         if not ws_name:
             ws_name = faraday_client.model.api.getActiveWorkspace().name
+        if skip_imported is None:
+            skip_imported = parse_cache.SKIP_IMPORTED_REPORTS
+
+        cache = parse_cache.get_parse_cache()
+        content_hash = parse_cache.hash_report(filepath)
+        if skip_imported and cache.was_imported(ws_name, content_hash):
+            logger.info('Report %s was already imported in %s, skipping it', filepath, ws_name)
+            return None
 
         cmd_info = CommandRunInformation(
             **{'workspace': ws_name,
@@ -254,9 +282,20 @@ class PluginController(Thread):
         cmd_info.setID(command_id)
 
         logger.info('Processing report with plugin {0}'.format(plugin_id))
-        with open(filepath, 'rb') as output:
-            plugin = [plugin[1] for plugin in self._plugins if plugin[0] == plugin_id].pop()
-            self.processOutput(plugin, output.read(), cmd_info, True)
+        plugin = [plugin[1] for plugin in self._plugins if plugin[0] == plugin_id].pop()
+        cache_key = parse_cache.plugin_cache_key(content_hash, plugin)
+        plugin_result = cache.get(cache_key)
+        if plugin_result is None:
+            # Huge reports aren't read in memory by the plugins with
+            # stream_tags, see report_stream
+            parse_report(plugin, filepath)
+            plugin_result = plugin.get_json()
+            cache.put(cache_key, plugin_result)
+        else:
+            logger.info('Using the results of a previous import of %s', filepath)
+        if self._sendPluginResults(plugin, cmd_info, plugin_result):
+            # Not when queued, the outbox may never manage to send them
+            cache.mark_imported(ws_name, content_hash)
         return command_id
 
         # Plugin to process this report not found, update duration of plugin process
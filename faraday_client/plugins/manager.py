@@ -9,9 +9,11 @@ from __future__ import absolute_import
 import logging
 
 
-from faraday_plugins.plugins.manager import PluginsManager, CommandAnalyzer, ReportAnalyzer
+from faraday_plugins.plugins.manager import PluginsManager
 
 from faraday_client.config.configuration import getInstanceConfiguration
+from faraday_client.plugins.report_detection import ReportDetectionIndex
+from faraday_client.plugins.command_dispatch import CommandDispatchIndex
 
 CONF = getInstanceConfiguration()
 
@@ -26,8 +28,12 @@ class PluginManager:
         self._plugin_settings = {}
         self.pending_actions = pending_actions
         self._plugins_manager = PluginsManager(CONF.getCustomPluginsPath())
-        self.commands_analyzer = CommandAnalyzer(self._plugins_manager)
-        self.report_analyzer = ReportAnalyzer(self._plugins_manager)
+        # Same answers as faraday_plugins' CommandAnalyzer, without creating
+        # every plugin for every command
+        self.commands_analyzer = CommandDispatchIndex(self._plugins_manager)
+        # Same answers as faraday_plugins' ReportAnalyzer, without asking
+        # every plugin about every report
+        self.report_analyzer = ReportDetectionIndex(self._plugins_manager)
         self._loadSettings()
 
     def addController(self, controller, id):
@@ -72,6 +78,7 @@ class PluginManager:
             new_settings = params["settings"]
             for c_id, c_instance in self._controllers.items():
                 c_instance.updatePluginSettings(plugin_id, new_settings)
+        self.commands_analyzer.build()
 
     def plugins(self):
         plugins = list(self._plugins_manager.get_plugins())
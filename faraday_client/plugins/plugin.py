@@ -26,6 +26,9 @@ from faraday_client.persistence.server.models import (
     Note
 )
 from faraday_client.model import Modelactions
+from faraday_client.model.batching import BATCHABLE_ACTIONS
+from faraday_client.model.id_future import TemporaryID
+from faraday_client.model.pending_actions import FROM_PLUGIN, put_action
 
 from faraday_client.config.configuration import getInstanceConfiguration
 
@@ -166,8 +169,12 @@ class PluginBase:
             args = args + (self.command_id, )
         else:
             logger.warning('Warning command id not set for action {%s}', args)
+        if args[0] in BATCHABLE_ACTIONS and args[1].id is None:
+            # So createAndAdd* return an id for the children, the model
+            # controller resolves it to the server id when saving them
+            args[1].setID(TemporaryID.new())
         logger.debug('AddPendingAction %s', args)
-        self._pending_actions.put(args)
+        put_action(self._pending_actions, args, FROM_PLUGIN, producer=self.id)
 
     def createAndAddHost(self, name, os="unknown", hostnames=None, mac=None):
         host_obj = factory.createModelObject(
@@ -412,6 +419,17 @@ class PluginXMLFormat(PluginByExtension):
         super().__init__()
         self.identifier_tag = []
         self.extension = ".xml"
+        # Plugins which set the tags of the elements with the results of
+        # a report (say ReportHost) get them one by one in parseElement,
+        # instead of the whole report in parseOutputString
+        self.stream_tags = []
+
+    def parseElement(self, element):
+        """
+        Create the objects of one of the elements of stream_tags. It is
+        cleared afterwards, so don't keep references to it.
+        """
+        raise NotImplementedError('This method must be implemented.')
 
     def report_belongs_to(self, main_tag="", **kwargs):
         match = False
@@ -0,0 +1,251 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Detection of the plugin of a report without asking every plugin. The
+plugins are indexed once by the extensions and XML root tags they accept,
+a report is classified by reading its first SNIFF_SIZE bytes and only the
+plugins indexed under its extension and root tag are asked with
+report_belongs_to, in the same order as faraday_plugins' ReportAnalyzer.
+"""
+import os
+import io
+import re
+import csv
+import json
+import codecs
+import logging
+import zipfile
+import threading
+from collections import OrderedDict
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from faraday_plugins.plugins import plugin as plugins_base
+
+logger = logging.getLogger(__name__)
+
+SNIFF_SIZE = 16 * 1024
+DETECTION_CACHE_SIZE = 10000
+
+ZIP_MAGIC = b'PK\x03\x04'
+_PLUGIN_NAME_RE = re.compile(r".*_faraday_(?P<plugin_name>.+)\..*$")
+
+# report_belongs_to of these classes only match reports with one of the
+# plugin extensions, and XML ones with one of its identifier tags
+_EXTENSION_CHECKS = frozenset(
+    getattr(getattr(plugins_base, name), 'report_belongs_to')
+    for name in ('PluginByExtension', 'PluginXMLFormat', 'PluginJsonFormat', 'PluginMultiLineJsonFormat',
+                 'PluginCSVFormat', 'PluginZipFormat')
+    if hasattr(plugins_base, name))
+_TAG_CHECK = getattr(getattr(plugins_base, 'PluginXMLFormat', None), 'report_belongs_to', None)
+# It never matches
+_NO_CHECK = plugins_base.PluginBase.report_belongs_to
+
+_ANY = None
+
+
+def _as_list(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+def _xml_main_tag(report, head):
+    """Return the tag and attributes of the root element, or raise
+    ValueError if it isn't XML. Only reads until the root starts."""
+    parser = ET.XMLPullParser(events=('start',))
+    chunk = head
+    while chunk:
+        try:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                _, has_namespace, postfix = element.tag.partition('}')
+                if has_namespace:
+                    return postfix, {}
+                return element.tag, element.attrib
+        except ET.ParseError as e:
+            raise ValueError(e)
+        chunk = report.read(SNIFF_SIZE)
+    raise ValueError('No XML element')
+
+
+def _json_keys(report, head, size):
+    """Return the keys of the top level object of the JSON document, or of
+    its first element if it's a list, as faraday_plugins does."""
+    if size <= len(head):
+        data = json.loads(head.decode('utf-8-sig'))
+        if isinstance(data, list):
+            return set(data[0].keys()) if data else set()
+        return set(data.keys())
+    # Without a multibyte character cut in half at the end
+    text = codecs.getincrementaldecoder('utf-8-sig')().decode(head)
+    decoder = json.JSONDecoder()
+    position = _skip_spaces(text, 0)
+    if text.startswith('[', position):
+        position = _skip_spaces(text, position + 1)
+    if not text.startswith('{', position):
+        raise ValueError('Not a JSON object')
+    keys = set()
+    position = _skip_spaces(text, position + 1)
+    try:
+        while not text.startswith('}', position):
+            key, position = decoder.raw_decode(text, position)
+            position = _skip_spaces(text, position)
+            if not text.startswith(':', position):
+                raise ValueError('Invalid JSON object')
+            _, position = decoder.raw_decode(text, _skip_spaces(text, position + 1))
+            keys.add(key)
+            position = _skip_spaces(text, position)
+            if text.startswith(',', position):
+                position = _skip_spaces(text, position + 1)
+    except (ValueError, IndexError):
+        # A value longer than the head, parse it all
+        report.seek(0)
+        return _json_keys(report, report.read(), size)
+    return keys
+
+
+def _skip_spaces(text, position):
+    while position < len(text) and text[position] in ' \t\r\n':
+        position += 1
+    return position
+
+
+def _csv_headers(head, size):
+    if size > len(head):
+        # The first line, without a multibyte character cut in half
+        head = head[:head.rfind(b'\n') + 1] or head
+        text = codecs.getincrementaldecoder('utf-8')().decode(head)
+    else:
+        text = head.decode('utf-8')
+    return set(csv.DictReader(io.StringIO(text)).fieldnames)
+
+
+def sniff_report(report_path):
+    """Return the arguments for report_belongs_to of report_path, as
+    faraday_plugins' ReportAnalyzer builds them, reading as little of it as
+    possible."""
+    extension = os.path.splitext(os.path.basename(report_path))[1].lower()
+    signature = {
+        'report_path': report_path,
+        'extension': extension,
+        'main_tag': None,
+        'main_tag_attributes': {},
+        'file_json_keys': set(),
+        'file_csv_headers': set(),
+        'files_in_zip': set(),
+    }
+    size = os.path.getsize(report_path)
+    with open(report_path, 'rb') as report:
+        head = report.read(SNIFF_SIZE)
+        if head.startswith(ZIP_MAGIC):
+            try:
+                with zipfile.ZipFile(report_path) as zip_file:
+                    signature['files_in_zip'] = set(zip_file.namelist())
+            except (zipfile.BadZipFile, OSError):
+                pass
+            return signature
+        try:
+            signature['main_tag'], signature['main_tag_attributes'] = _xml_main_tag(report, head)
+            return signature
+        except ValueError:
+            pass
+        try:
+            report.seek(len(head))
+            signature['file_json_keys'] = _json_keys(report, head, size)
+            return signature
+        except (ValueError, AttributeError, TypeError):
+            pass
+        try:
+            signature['file_csv_headers'] = _csv_headers(head, size)
+        except (ValueError, TypeError, csv.Error):
+            pass
+    return signature
+
+
+class ReportDetectionIndex:
+    """The plugins of a faraday_plugins PluginsManager indexed by the
+    extensions and XML tags of the reports they accept.
+
+    Plugins with their own report_belongs_to are asked about every report.
+    """
+
+    def __init__(self, plugins_manager, cache_size=None):
+        self.plugins_manager = plugins_manager
+        self.cache_size = cache_size if cache_size is not None else DETECTION_CACHE_SIZE
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.build()
+
+    def build(self):
+        # (extension, tag) -> [(order, plugin)], _ANY matches everything
+        index = {}
+        for order, (plugin_id, plugin) in enumerate(self.plugins_manager.get_plugins()):
+            check = getattr(type(plugin), 'report_belongs_to', None)
+            if check is _NO_CHECK:
+                continue
+            if check in _EXTENSION_CHECKS and getattr(plugin, 'extension', None):
+                extensions = [extension.lower() for extension in _as_list(plugin.extension)]
+            else:
+                extensions = [_ANY]
+            tags = [_ANY]
+            if check is _TAG_CHECK and not getattr(plugin, 'identifier_tag_attributes', None):
+                tags = _as_list(plugin.identifier_tag)
+            for extension in extensions:
+                for tag in tags:
+                    index.setdefault((extension, tag), []).append((order, plugin))
+        with self._lock:
+            self._index = index
+            self._cache.clear()
+
+    def candidates(self, extension, main_tag):
+        """Return the plugins which may accept a report, in order."""
+        candidates = []
+        for key in ((extension, main_tag), (extension, _ANY), (_ANY, main_tag), (_ANY, _ANY)):
+            candidates.extend(self._index.get(key, ()))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [plugin for _, plugin in candidates]
+
+    def _detect(self, report_path):
+        signature = sniff_report(report_path)
+        for plugin in self.candidates(signature['extension'], signature['main_tag']):
+            try:
+                if plugin.report_belongs_to(**signature):
+                    return plugin
+            except Exception as e:
+                logger.error("Error in plugin analysis: (%s) %s", plugin.id, e)
+        return None
+
+    def get_plugin(self, report_path):
+        """Return the plugin of report_path, None if there isn't one. The
+        answer is cached by path, size and modification time."""
+        if not os.path.isfile(report_path):
+            logger.error("Report [%s] don't exists", report_path)
+            return None
+        match = _PLUGIN_NAME_RE.match(os.path.basename(report_path))
+        if match:
+            plugin = self.plugins_manager.get_plugin(match.group('plugin_name').lower())
+            if plugin:
+                return plugin
+        stat = os.stat(report_path)
+        key = (report_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        plugin = self._detect(report_path)
+        if plugin is None:
+            logger.debug("Plugin for file (%s) not found", report_path)
+        with self._lock:
+            self._cache[key] = plugin
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return plugin
+
+
+# I'm Py3
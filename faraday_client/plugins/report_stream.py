@@ -0,0 +1,85 @@
+"""
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+Reading of reports without holding them in memory more than once. XML
+plugins which set stream_tags get the elements of the report one by one,
+so the memory used doesn't depend on its size. The rest get the report
+decoded from a memory map of the file, the only copy made of it.
+"""
+import io
+import mmap
+import contextlib
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+@contextlib.contextmanager
+def mapped_report(filepath):
+    """Yield the content of filepath as a read only memory map, b'' if it
+    is empty (empty files can't be mapped). Its pages are read from the
+    file on demand and belong to the page cache, not to the process."""
+    with open(filepath, 'rb') as report:
+        if not report.seek(0, io.SEEK_END):
+            yield b''
+            return
+        with mmap.mmap(report.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def decode_report(filepath, encoding='utf8'):
+    """Return the content of filepath as a str, the only copy of the
+    report made."""
+    with mapped_report(filepath) as mapped:
+        return str(mapped, encoding)
+
+
+def iter_xml_elements(stream, tags):
+    """Yield the elements of the XML document in stream whose tag is in
+    tags, once they are complete.
+
+    Each element is cleared after the caller is done with it, and removed
+    from the tree, so the memory used doesn't depend on the size of the
+    document but on the size of an element. Keep what you need from an
+    element before asking for the next one.
+    """
+    tags = frozenset([tags] if isinstance(tags, str) else tags)
+    ancestors = []
+    # How many of the ancestors are in tags
+    depth = 0
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            ancestors.append(element)
+            depth += element.tag in tags
+            continue
+        ancestors.pop()
+        if element.tag not in tags:
+            continue
+        depth -= 1
+        if depth:
+            # Nested in another element yielded later, it keeps its children
+            continue
+        yield element
+        element.clear()
+        if ancestors:
+            ancestors[-1].remove(element)
+
+
+def parse_report(plugin, filepath):
+    """Make plugin parse the report in filepath. Plugins with stream_tags
+    get its elements with those tags in parseElement, the rest get the
+    whole report in processOutput."""
+    stream_tags = getattr(plugin, 'stream_tags', None)
+    if not stream_tags:
+        plugin.processOutput(decode_report(filepath))
+        return
+    with open(filepath, 'rb') as stream:
+        for element in iter_xml_elements(stream, stream_tags):
+            plugin.parseElement(element)
+
+
+# I'm Py3
@@ -0,0 +1,186 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import gc
+import json
+import unittest
+from unittest import mock
+
+from faraday_client.managers import mapper_manager
+from faraday_client.managers.mapper_manager import IdentityMap, MapperManager
+from faraday_client.persistence.server import changes_stream
+from faraday_client.persistence.server.models import Host
+
+
+def _host(host_id, name='10.0.0.1'):
+    host = Host({'_id': host_id, 'id': host_id, 'name': name}, 'a_ws')
+    host.id = host_id
+    return host
+
+
+class IdentityMapTests(unittest.TestCase):
+
+    def test_get_returns_the_stored_object(self):
+        identity_map = IdentityMap()
+        host = _host(1)
+        identity_map.put('Host', 1, host)
+        self.assertIs(identity_map.get('Host', '1'), host)
+        self.assertIsNone(identity_map.get('Service', 1))
+        stats = identity_map.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        identity_map = IdentityMap(max_objects=2)
+        identity_map.put('Host', 1, _host(1))
+        identity_map.put('Host', 2, _host(2))
+        identity_map.get('Host', 1)
+        identity_map.put('Host', 3, _host(3))
+        self.assertIsNotNone(identity_map.get('Host', 1))
+        self.assertIsNone(identity_map.get('Host', 2))
+        self.assertEqual(identity_map.stats()['evictions'], 1)
+
+    def test_expired_objects_are_not_returned(self):
+        identity_map = IdentityMap(ttl=10)
+        with mock.patch.object(mapper_manager.time, 'monotonic', return_value=100):
+            identity_map.put('Host', 1, _host(1))
+        with mock.patch.object(mapper_manager.time, 'monotonic', return_value=105):
+            self.assertIsNotNone(identity_map.get('Host', 1))
+        with mock.patch.object(mapper_manager.time, 'monotonic', return_value=110):
+            self.assertIsNone(identity_map.get('Host', 1))
+        self.assertEqual(identity_map.stats()['expired'], 1)
+        self.assertEqual(len(identity_map), 0)
+
+    def test_invalidate_drops_the_id_in_every_class(self):
+        identity_map = IdentityMap()
+        identity_map.put('Vulnerability', 7, object())
+        identity_map.put('VulnerabilityWeb', 7, object())
+        identity_map.put('Host', 8, _host(8))
+        identity_map.invalidate('7')
+        self.assertIsNone(identity_map.get('Vulnerability', 7))
+        self.assertIsNone(identity_map.get('VulnerabilityWeb', 7))
+        self.assertIsNotNone(identity_map.get('Host', 8))
+        self.assertEqual(identity_map.stats()['invalidations'], 2)
+
+    def test_temporary_ids_are_not_stored(self):
+        identity_map = IdentityMap()
+        host = Host({'name': '10.0.0.1'}, 'a_ws')
+        identity_map.put('Host', host.getID(), host)
+        self.assertEqual(len(identity_map), 0)
+
+
+@mock.patch.object(mapper_manager, 'get_object')
+class MapperManagerIdentityMapTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mappers_manager = MapperManager()
+        self.mappers_manager.createMappers('a_ws')
+
+    def test_find_asks_the_server_once(self, get_object):
+        host = _host(1)
+        get_object.return_value = host
+        self.assertIs(self.mappers_manager.find('Host', 1), host)
+        self.assertIs(self.mappers_manager.find('Host', 1), host)
+        get_object.assert_called_once_with('a_ws', 'Host', 1)
+        self.assertEqual(self.mappers_manager.getIdentityMapStats()['hits'], 1)
+
+    def test_objects_not_found_are_not_cached(self, get_object):
+        get_object.return_value = None
+        self.assertIsNone(self.mappers_manager.find('Host', 1))
+        self.assertIsNone(self.mappers_manager.find('Host', 1))
+        self.assertEqual(get_object.call_count, 2)
+
+    def test_saved_objects_are_found_without_the_server(self, get_object):
+        host = Host({'name': '10.0.0.1'}, 'a_ws')
+        with mock.patch.object(mapper_manager, 'create_object', return_value={'id': 5}):
+            self.assertEqual(self.mappers_manager.save(host), 5)
+        self.assertIs(self.mappers_manager.find('Host', 5), host)
+        get_object.assert_not_called()
+
+    def test_updated_objects_replace_the_cached_ones(self, get_object):
+        get_object.return_value = _host(1, 'old')
+        self.mappers_manager.find('Host', 1)
+        updated = _host(1, 'new')
+        with mock.patch.object(mapper_manager, 'update_object', return_value=True):
+            self.assertTrue(self.mappers_manager.update(updated))
+        self.assertIs(self.mappers_manager.find('Host', 1), updated)
+
+    def test_failed_updates_invalidate_the_cached_object(self, get_object):
+        get_object.return_value = _host(1, 'old')
+        self.mappers_manager.find('Host', 1)
+        with mock.patch.object(mapper_manager, 'update_object', return_value=False):
+            self.assertFalse(self.mappers_manager.update(_host(1, 'new')))
+        self.mappers_manager.find('Host', 1)
+        self.assertEqual(get_object.call_count, 2)
+
+    def test_removed_objects_are_not_found(self, get_object):
+        get_object.return_value = _host(1)
+        self.mappers_manager.find('Host', 1)
+        with mock.patch.object(mapper_manager, 'delete_object', return_value=True):
+            self.mappers_manager.remove(1, 'Host')
+        get_object.return_value = None
+        self.assertIsNone(self.mappers_manager.find('Host', 1))
+
+    def test_changing_workspace_clears_the_cache(self, get_object):
+        get_object.return_value = _host(1)
+        self.mappers_manager.find('Host', 1)
+        self.mappers_manager.createMappers('other_ws')
+        self.mappers_manager.find('Host', 1)
+        self.assertEqual(get_object.call_count, 2)
+
+
+@mock.patch.object(mapper_manager, 'get_object')
+class ChangesStreamInvalidationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mappers_manager = MapperManager()
+        self.mappers_manager.createMappers('a_ws')
+        # A stream without the websocket connection
+        self.stream = changes_stream.WebsocketsChangesStream.__new__(
+            changes_stream.WebsocketsChangesStream)
+        self.stream.workspace_name = 'a_ws'
+        self.stream.changes_queue = mock.Mock()
+
+    def _receive(self, **change):
+        self.stream.on_message(json.dumps(change))
+
+    def test_changes_of_other_clients_invalidate(self, get_object):
+        for action in ('CREATE', 'UPDATE', 'DELETE'):
+            self.mappers_manager.identity_map.clear()
+            get_object.reset_mock()
+            get_object.return_value = _host(1)
+            self.mappers_manager.find('Host', 1)
+            self._receive(action=action, id=1, type='Host', name='10.0.0.1')
+            self.mappers_manager.find('Host', 1)
+            self.assertEqual(get_object.call_count, 2, action)
+
+    def test_changes_of_other_workspaces_are_ignored(self, get_object):
+        get_object.return_value = _host(1)
+        self.mappers_manager.find('Host', 1)
+        self.stream.workspace_name = 'other_ws'
+        self._receive(action='UPDATE', id=1, type='Host', name='10.0.0.1')
+        self.mappers_manager.find('Host', 1)
+        get_object.assert_called_once_with('a_ws', 'Host', 1)
+
+    def test_closed_stream_clears_the_cache(self, get_object):
+        get_object.return_value = _host(1)
+        self.mappers_manager.find('Host', 1)
+        self.stream.on_close()
+        self.mappers_manager.find('Host', 1)
+        self.assertEqual(get_object.call_count, 2)
+
+    def test_listeners_dont_keep_mappers_managers_alive(self, get_object):
+        listeners = len(changes_stream._change_listeners)
+        MapperManager()
+        gc.collect()
+        self._receive(action='UPDATE', id=1, type='Host', name='10.0.0.1')
+        self.assertLessEqual(len(changes_stream._change_listeners), listeners)
+
+
+# I'm Py3
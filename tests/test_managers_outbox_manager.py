@@ -0,0 +1,118 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import bulk_upload
+from faraday_client.persistence.server import resilience
+from faraday_client.managers import outbox_manager
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+class OutboxTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.outbox = outbox_manager.Outbox(os.path.join(self.directory, 'outbox.sqlite'))
+        self.flusher = outbox_manager.OutboxFlusher(self.outbox, interval=1, batch_size=2)
+        self.bulk_url = server._create_server_get_url('a_ws', 'bulk_create')
+        self.state_path = bulk_upload.UPLOAD_STATE_PATH
+        bulk_upload.UPLOAD_STATE_PATH = os.path.join(self.directory, 'bulk_uploads')
+        resilience.configure_server_io_resilience(max_retries=0)
+
+    def tearDown(self):
+        bulk_upload.UPLOAD_STATE_PATH = self.state_path
+        resilience.configure_server_io_resilience()
+        shutil.rmtree(self.directory)
+
+    def test_same_payload_is_queued_once(self):
+        self.assertTrue(self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': []}))
+        self.assertFalse(self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': []}))
+        self.assertTrue(self.outbox.put(outbox_manager.BULK_CREATE, 'other_ws', {'hosts': []}))
+        self.assertEqual(self.outbox.stats()['by_kind'], {'bulk_create': 2})
+
+    @responses.activate
+    def test_flush_in_batches(self):
+        for index in range(3):
+            self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': [{'ip': str(index)}]})
+        responses.add(responses.POST, self.bulk_url, status=201, json={})
+        self.assertEqual(self.flusher.flush(), 2)
+        self.assertEqual(self.outbox.depth(), 1)
+        self.assertEqual(self.flusher.flush(), 1)
+        self.assertEqual(self.outbox.depth(), 0)
+        self.assertEqual([json.loads(call.request.body)['hosts'][0]['ip'] for call in responses.calls],
+                         ['0', '1', '2'])
+
+    @responses.activate
+    def test_failures_back_off(self):
+        self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': []})
+        self.outbox.put(outbox_manager.COMMAND_UPDATE, 'a_ws', {'id': 1, 'data': {}})
+        responses.add(responses.POST, self.bulk_url, status=500)
+        self.assertEqual(self.flusher.flush(), 0)
+        self.assertEqual(len(responses.calls), 1)
+        stats = self.outbox.stats()
+        self.assertEqual(stats['depth'], 2)
+        self.assertEqual(stats['max_attempts'], 1)
+        self.assertIsNotNone(stats['last_error'])
+        # The failed entry waits for the backoff, the next one is sent
+        self.assertEqual(self.flusher._backoff, 1)
+        responses.add(responses.PUT, server._create_server_get_url('a_ws', 'commands', 1),
+                      status=200, json={})
+        self.assertEqual(self.flusher.flush(), 1)
+        self.assertEqual(self.outbox.stats()['by_kind'], {'bulk_create': 1})
+
+    @responses.activate
+    def test_rejected_entries_are_dead_letters(self):
+        self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': [{'ip': 'bad'}]})
+        self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': [{'ip': '10.0.0.1'}]})
+        responses.add(responses.POST, self.bulk_url, status=400)
+        responses.add(responses.POST, self.bulk_url, status=201, json={})
+        self.assertEqual(self.flusher.flush(), 1)
+        self.assertEqual(self.flusher._backoff, 0)
+        stats = self.outbox.stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['dead_letters'], 1)
+        self.assertIsNotNone(stats['last_dead_letter_error'])
+
+        self.assertEqual(self.outbox.retry_dead_letters(), 1)
+        self.assertEqual(self.outbox.stats()['dead_letters'], 0)
+        self.assertEqual(self.flusher.flush(), 1)
+
+    @responses.activate
+    def test_too_many_requests_are_retried(self):
+        self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': []})
+        responses.add(responses.POST, self.bulk_url, status=429)
+        self.assertEqual(self.flusher.flush(), 0)
+        self.assertEqual(self.outbox.stats()['dead_letters'], 0)
+        self.assertEqual(self.flusher._backoff, 1)
+
+    @responses.activate
+    def test_entries_are_dead_letters_after_max_attempts(self):
+        flusher = outbox_manager.OutboxFlusher(self.outbox, interval=1, max_attempts=2)
+        self.outbox.put(outbox_manager.BULK_CREATE, 'a_ws', {'hosts': []})
+        responses.add(responses.POST, self.bulk_url, status=500)
+        flusher.flush()
+        self.assertEqual(self.outbox.stats()['dead_letters'], 0)
+        with self.outbox._transaction() as connection:
+            connection.execute('UPDATE outbox SET next_attempt = 0')
+        flusher.flush()
+        stats = self.outbox.stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['dead_letters'], 1)
+
+
+# I'm Py3
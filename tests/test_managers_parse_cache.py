@@ -0,0 +1,128 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import unittest
+from queue import Queue
+from unittest import mock
+
+from faraday_client.managers import parse_cache
+from faraday_client.managers.parse_cache import ParseCache, hash_report, plugin_cache_key
+from faraday_client.plugins.controller import PluginController
+
+
+class ParseCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ParseCache(os.path.join(self.directory, 'parse_cache.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_results_are_stored_compressed(self):
+        result = json.dumps({'hosts': [{'ip': '10.0.0.1'}] * 1000})
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.put('key', result))
+        self.assertEqual(self.cache.get('key'), result)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['results']), (1, 1, 1))
+        self.assertLess(stats['bytes'], len(result) / 10)
+
+    def test_least_recently_used_results_are_evicted(self):
+        results = {key: os.urandom(1000).hex() for key in ('a', 'b', 'c')}
+        self.cache.max_bytes = 2500
+        with mock.patch.object(parse_cache.time, 'time', side_effect=range(100, 200)):
+            self.cache.put('a', results['a'])
+            self.cache.put('b', results['b'])
+            self.cache.get('a')
+            self.cache.put('c', results['c'])
+            self.assertIsNone(self.cache.get('b'))
+            self.assertEqual(self.cache.get('a'), results['a'])
+            self.assertEqual(self.cache.get('c'), results['c'])
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_imports_are_by_workspace(self):
+        self.cache.mark_imported('ws', 'hash')
+        self.assertTrue(self.cache.was_imported('ws', 'hash'))
+        self.assertFalse(self.cache.was_imported('other_ws', 'hash'))
+
+    def test_results_survive_a_restart(self):
+        self.cache.put('key', '{}')
+        self.cache.mark_imported('ws', 'hash')
+        cache = ParseCache(self.cache.path)
+        self.assertEqual(cache.get('key'), '{}')
+        self.assertTrue(cache.was_imported('ws', 'hash'))
+
+    def test_hash_report_and_key(self):
+        path = os.path.join(self.directory, 'report.xml')
+        with open(path, 'wb') as report:
+            report.write(b'<report/>')
+        content_hash = hash_report(path)
+        self.assertEqual(content_hash, hashlib.sha256(b'<report/>').hexdigest())
+        plugin = mock.Mock(id='Nmap', plugin_version='1.0.1')
+        self.assertEqual(plugin_cache_key(content_hash, plugin), content_hash + ':Nmap:1.0.1')
+
+
+class ProcessReportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.report = os.path.join(self.directory, 'nmap.xml')
+        with open(self.report, 'wb') as report:
+            report.write(b'<nmaprun/>')
+        cache = ParseCache(os.path.join(self.directory, 'parse_cache.sqlite'))
+        patcher = mock.patch.object(parse_cache, 'get_parse_cache', return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # It parses the whole report, as the plugins of faraday_plugins
+        self.plugin = mock.Mock(id='Nmap', plugin_version='1.0.1', stream_tags=[])
+        self.plugin.get_json.return_value = '{"hosts": []}'
+        plugin_manager = mock.Mock()
+        plugin_manager.plugins.return_value = [('Nmap', self.plugin)]
+        mapper_manager = mock.Mock()
+        mapper_manager.save.side_effect = range(1, 10)
+        self.controller = PluginController('PluginController', plugin_manager, mapper_manager, Queue())
+        self.controller._sendPluginResults = mock.Mock(return_value=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_a_report_is_parsed_once(self):
+        self.assertEqual(self.controller.processReport('Nmap', self.report, 'ws'), 1)
+        self.assertEqual(self.controller.processReport('Nmap', self.report, 'other_ws'), 2)
+        # Through processOutput, which handles the custom outputs of the plugin
+        self.plugin.processOutput.assert_called_once_with('<nmaprun/>')
+        sent = [call[0][2] for call in self.controller._sendPluginResults.call_args_list]
+        self.assertEqual(sent, ['{"hosts": []}', '{"hosts": []}'])
+
+    def test_new_plugin_versions_parse_again(self):
+        self.controller.processReport('Nmap', self.report, 'ws')
+        self.plugin.plugin_version = '1.0.2'
+        self.controller.processReport('Nmap', self.report, 'ws')
+        self.assertEqual(self.plugin.processOutput.call_count, 2)
+
+    def test_imported_reports_can_be_skipped(self):
+        self.controller.processReport('Nmap', self.report, 'ws')
+        self.assertIsNone(self.controller.processReport('Nmap', self.report, 'ws', skip_imported=True))
+        self.assertEqual(self.controller.processReport('Nmap', self.report, 'other_ws', skip_imported=True), 2)
+        self.assertEqual(self.controller._sendPluginResults.call_count, 2)
+
+    def test_reports_are_imported_once_their_results_are_sent(self):
+        # Queued in the outbox
+        self.controller._sendPluginResults.return_value = False
+        self.controller.processReport('Nmap', self.report, 'ws')
+        self.assertEqual(self.controller.processReport('Nmap', self.report, 'ws', skip_imported=True), 2)
+        self.assertEqual(self.controller._sendPluginResults.call_count, 2)
+
+
+# I'm Py3
@@ -0,0 +1,210 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from faraday_client.managers import report_watcher
+from faraday_client.managers.report_watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    ReadyReports,
+    ReportWatcher,
+)
+
+
+class ReadyReportsTests(unittest.TestCase):
+
+    @mock.patch.object(report_watcher.time, 'monotonic')
+    def test_reports_are_ready_after_the_debounce(self, monotonic):
+        monotonic.return_value = 100
+        ready_reports = ReadyReports(debounce=1)
+        ready_reports.add('a.xml')
+        monotonic.return_value = 100.5
+        ready_reports.add('b.xml')
+        self.assertEqual(ready_reports.pop_ready(), [])
+        self.assertEqual(ready_reports.next_ready_in(), 0.5)
+        monotonic.return_value = 101
+        self.assertEqual(ready_reports.pop_ready(), ['a.xml'])
+        monotonic.return_value = 102
+        self.assertEqual(ready_reports.pop_ready(), ['b.xml'])
+        self.assertIsNone(ready_reports.next_ready_in())
+
+    @mock.patch.object(report_watcher.time, 'monotonic')
+    def test_written_again_goes_to_the_end(self, monotonic):
+        monotonic.return_value = 100
+        ready_reports = ReadyReports(debounce=1)
+        ready_reports.add('a.xml')
+        ready_reports.add('b.xml')
+        ready_reports.add('a.xml')
+        monotonic.return_value = 101
+        self.assertEqual(ready_reports.pop_ready(), ['b.xml', 'a.xml'])
+
+    @mock.patch.object(report_watcher.time, 'monotonic')
+    def test_retried_reports_dont_hold_back_new_ones(self, monotonic):
+        monotonic.return_value = 100
+        ready_reports = ReadyReports(debounce=1)
+        ready_reports.add('failed.xml', delay=10)
+        ready_reports.add('new.xml')
+        self.assertEqual(ready_reports.next_ready_in(), 1)
+        monotonic.return_value = 101
+        self.assertEqual(ready_reports.pop_ready(), ['new.xml'])
+        monotonic.return_value = 110
+        self.assertEqual(ready_reports.pop_ready(), ['failed.xml'])
+
+
+class WatcherTestsMixin:
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'process'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, content='<report/>'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as report:
+            report.write(content)
+        return path
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+class InotifyWatcherTests(WatcherTestsMixin, unittest.TestCase):
+
+    def test_closed_and_moved_files_are_reported(self):
+        watcher = InotifyWatcher(self.directory)
+        try:
+            self._write('nmap.xml')
+            outside = tempfile.NamedTemporaryFile(dir=os.path.join(self.directory, 'process'), delete=False)
+            outside.close()
+            os.rename(outside.name, os.path.join(self.directory, 'nessus.xml'))
+            self.assertEqual(watcher.wait(1), ['nmap.xml', 'nessus.xml'])
+        finally:
+            watcher.close()
+
+    def test_files_being_written_are_not_reported(self):
+        watcher = InotifyWatcher(self.directory)
+        try:
+            with open(os.path.join(self.directory, 'nmap.xml'), 'w') as report:
+                report.write('<nmaprun>')
+                report.flush()
+                self.assertEqual(watcher.wait(0.1), [])
+            self.assertEqual(watcher.wait(1), ['nmap.xml'])
+        finally:
+            watcher.close()
+
+    def test_subdirectories_are_not_reported(self):
+        watcher = InotifyWatcher(self.directory)
+        try:
+            with open(os.path.join(self.directory, 'process', 'nmap.xml'), 'w') as report:
+                report.write('<nmaprun/>')
+            self.assertEqual(watcher.wait(0.1), [])
+        finally:
+            watcher.close()
+
+
+class PollingWatcherTests(WatcherTestsMixin, unittest.TestCase):
+
+    def test_files_are_reported_once_they_stop_changing(self):
+        watcher = PollingWatcher(self.directory, interval=0)
+        self._write('nmap.xml', '<nmaprun>')
+        self.assertEqual(watcher.wait(0), [])
+        self.assertEqual(watcher.wait(0), ['nmap.xml'])
+        self.assertEqual(watcher.wait(0), [])
+
+    def test_files_still_growing_are_not_reported(self):
+        watcher = PollingWatcher(self.directory, interval=0)
+        self._write('nmap.xml', '<nmaprun>')
+        self.assertEqual(watcher.wait(0), [])
+        self._write('nmap.xml', '<nmaprun><host/>')
+        self.assertEqual(watcher.wait(0), [])
+        self.assertEqual(watcher.wait(0), ['nmap.xml'])
+
+
+class ReportWatcherTests(WatcherTestsMixin, unittest.TestCase):
+
+    def _watcher(self, **kwargs):
+        watcher = ReportWatcher(self.directory, debounce=0, poll_interval=0, **kwargs)
+        self.addCleanup(watcher.close)
+        return watcher
+
+    def test_existing_reports_come_first(self):
+        old = self._write('old.xml')
+        os.utime(old, (1, 1))
+        existing = self._write('existing.xml')
+        watcher = self._watcher()
+        self.assertEqual(watcher.wait_reports(1), [old, existing])
+
+    def test_new_reports_are_returned(self):
+        for use_inotify in (True, False):
+            watcher = self._watcher(use_inotify=use_inotify)
+            path = self._write('nmap{0}.xml'.format(use_inotify))
+            reports = []
+            for _ in range(5):
+                reports += watcher.wait_reports(0.5)
+                if reports:
+                    break
+            self.assertEqual(reports, [path])
+            os.remove(path)
+
+    def test_removed_reports_are_skipped(self):
+        path = self._write('nmap.xml')
+        watcher = self._watcher()
+        os.remove(path)
+        self.assertEqual(watcher.wait_reports(0.1), [])
+
+    def test_lost_events_scan_the_directory_again(self):
+        watcher = self._watcher(use_inotify=False)
+        path = self._write('nmap.xml')
+        with mock.patch.object(watcher._watcher, 'wait', return_value=None):
+            self.assertEqual(watcher.wait_reports(0), [])
+            self.assertEqual(watcher.wait_reports(0.1), [path])
+
+    def test_removed_directory_is_watched_again(self):
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        for use_inotify in (True, False):
+            self.directory = os.path.join(self.directory, 'reports')
+            os.mkdir(self.directory)
+            watcher = self._watcher(use_inotify=use_inotify)
+            shutil.rmtree(self.directory)
+            self.assertEqual(watcher.wait_reports(0.2), [])
+            os.mkdir(self.directory)
+            path = self._write('nmap.xml')
+            reports = []
+            for _ in range(10):
+                reports += watcher.wait_reports(0.2)
+                if reports:
+                    break
+            self.assertEqual(reports, [path])
+
+    def test_reports_removed_while_scanning_are_skipped(self):
+        path = self._write('nmap.xml')
+        removed = mock.Mock(path=os.path.join(self.directory, 'removed.xml'))
+        removed.stat.side_effect = FileNotFoundError
+        entries = [removed] + list(os.scandir(self.directory))
+        watcher = self._watcher(use_inotify=False)
+        with mock.patch.object(report_watcher.os, 'scandir') as scandir:
+            scandir.return_value.__enter__.return_value = entries
+            watcher._add_all()
+        self.assertEqual(watcher.wait_reports(0.1), [path])
+
+    @mock.patch.object(report_watcher, 'RETRY_DELAY', 0)
+    def test_failed_reports_are_tried_again(self):
+        path = self._write('nmap.xml')
+        watcher = self._watcher(use_inotify=False)
+        self.assertEqual(watcher.wait_reports(0.1), [path])
+        watcher.retry(path)
+        self.assertEqual(watcher.wait_reports(0.1), [path])
+
+
+# I'm Py3
@@ -0,0 +1,249 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+from queue import Queue
+from unittest import mock
+
+from faraday_client.model import Modelactions
+from faraday_client.model.batching import TemporaryID
+from faraday_client.model.commands_history import CommandRunInformation
+from faraday_client.model.controller import ModelController
+from faraday_client.persistence.server import models
+from faraday_client.persistence.server.server_io_exceptions import CantCommunicateWithServerError
+from faraday_client.plugins.plugin import PluginBase
+
+
+class ScanPlugin(PluginBase):
+
+    def __init__(self):
+        super().__init__()
+        self.id = 'Scan'
+        self.workspace = 'a_ws'
+
+    def parseOutputString(self, output):
+        host_id = self.createAndAddHost('10.0.0.1')
+        service_id = self.createAndAddServiceToHost(host_id, 'http', protocol='tcp', ports=[80])
+        self.createAndAddVulnToService(host_id, service_id, 'XSS', severity='high')
+
+
+class BatchedModelControllerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mappers_manager = mock.MagicMock(workspace_name='a_ws')
+        self.pending_actions = Queue()
+        self.controller = ModelController(self.mappers_manager, self.pending_actions,
+                                          batch_size=100, batch_window=0.1)
+        notifier_patch = mock.patch('faraday_client.model.controller.notifier')
+        self.notifier = notifier_patch.start()
+        self.addCleanup(notifier_patch.stop)
+        # What the server has after the bulk_create
+        self.server_objects = {
+            'get_hosts': [models.CompactHost({'id': 10, 'ip': '10.0.0.1', 'name': '10.0.0.1'}, 'a_ws')],
+            'get_services': [models.CompactService({'id': 20, 'name': 'http', 'protocol': 'tcp', 'ports': [80],
+                                                    'version': '', 'status': 'open', 'parent': 10}, 'a_ws')],
+            'get_all_vulns': [models.CompactVuln({'id': 30, 'name': 'XSS', 'desc': '', 'severity': 'high',
+                                                  'parent': 20, 'parent_type': 'Service'}, 'a_ws')],
+            'get_credentials': [],
+        }
+        for name in self.server_objects:
+            getter_patch = mock.patch.object(models, name, side_effect=lambda *args, name=name, **kwargs:
+                                             self.server_objects[name])
+            getter_patch.start()
+            self.addCleanup(getter_patch.stop)
+
+    def _add_scan(self):
+        host = self.controller.newHost('10.0.0.1')
+        self.controller.add_action((Modelactions.ADDHOST, host))
+        service = self.controller.newService('http', 'tcp', [80], parent_id=host.getID())
+        self.controller.add_action((Modelactions.ADDSERVICEHOST, service))
+        vuln = self.controller.newVuln('XSS', severity='high', parent_id=service.getID())
+        vuln.setParentType('Service')
+        self.controller.add_action((Modelactions.ADDVULNSRV, vuln))
+        return host, service, vuln
+
+    def test_ids_are_available_before_sending(self):
+        host, service, vuln = self._add_scan()
+        for obj in (host, service, vuln):
+            self.assertIsInstance(obj.getID(), TemporaryID)
+        self.assertEqual(service.getParent(), host.getID())
+
+    def test_adds_are_sent_in_one_bulk_create(self):
+        self._add_scan()
+        self.controller.processAction()
+        self.assertTrue(self.pending_actions.empty())
+        self.mappers_manager.save.assert_not_called()
+        self.mappers_manager.bulk_save.assert_called_once()
+        data = self.mappers_manager.bulk_save.call_args[0][0]
+        self.assertEqual(len(data['hosts']), 1)
+        host = data['hosts'][0]
+        self.assertEqual(host['ip'], '10.0.0.1')
+        self.assertEqual(host['services'][0]['port'], 80)
+        self.assertEqual(host['services'][0]['vulnerabilities'][0]['name'], 'XSS')
+        self.assertEqual(self.notifier.addObject.call_count, 3)
+
+    def test_children_of_a_previous_batch_repeat_their_parents(self):
+        host, service, _ = self._add_scan()
+        # Created with the temporary id of the service, before it was sent
+        vuln = self.controller.newVuln('SQLi', severity='critical', parent_id=service.getID())
+        self.controller.processAction()
+        self.controller.add_action((Modelactions.ADDVULNSRV, vuln))
+        self.server_objects['get_all_vulns'] = [
+            models.CompactVuln({'id': 31, 'name': 'SQLi', 'desc': '', 'severity': 'critical',
+                                'parent': 20, 'parent_type': 'Service'}, 'a_ws')]
+        self.controller.processAction()
+        data = self.mappers_manager.bulk_save.call_args[0][0]
+        self.assertEqual(data['hosts'][0]['ip'], '10.0.0.1')
+        self.assertEqual([vuln['name'] for vuln in data['hosts'][0]['services'][0]['vulnerabilities']],
+                         ['SQLi'])
+        self.assertEqual(vuln.getID(), 31)
+        self.assertEqual(vuln.getParent(), 20)
+
+    def test_batched_objects_get_their_server_ids(self):
+        host, service, vuln = self._add_scan()
+        self.controller.processAction()
+        self.mappers_manager.save.assert_not_called()
+        self.assertEqual((host.getID(), service.getID(), vuln.getID()), (10, 20, 30))
+        self.assertEqual(service.getParent(), 10)
+        self.assertEqual(vuln.getParent(), 20)
+        self.assertEqual(vuln.id_future.result(timeout=0), 30)
+        models.get_services.assert_called_once_with('a_ws', compact=True, host_id=10)
+
+    def test_children_not_batched_are_saved_with_the_server_id(self):
+        host = self.controller.newHost('10.0.0.1')
+        self.controller.add_action((Modelactions.ADDHOST, host))
+        note = self.controller.newNote('a note', 'text', parent_id=host.getID())
+        self.controller.add_action((Modelactions.ADDNOTEHOST, note))
+        self.mappers_manager.save.return_value = 40
+        self.controller.processAction()
+        self.mappers_manager.bulk_save.assert_called_once()
+        self.mappers_manager.save.assert_called_once()
+        self.assertEqual(note.getParent(), 10)
+        self.assertEqual(note.id_future.result(timeout=0), 40)
+
+    def test_objects_not_found_are_saved_on_their_own(self):
+        self.server_objects['get_all_vulns'] = []
+        self.mappers_manager.save.return_value = 31
+        host, service, vuln = self._add_scan()
+        self.controller.processAction()
+        self.mappers_manager.save.assert_called_once_with(vuln, None)
+        self.assertEqual(vuln.getParent(), 20)
+        self.assertEqual(vuln.id_future.result(timeout=0), 31)
+
+    def _plugin_scan(self, command_id):
+        # As the plugins put them in the queue, with the id of their command
+        host = self.controller.newHost('10.0.0.1')
+        host.setID(TemporaryID.new())
+        service = self.controller.newService('http', 'tcp', [80], parent_id=host.getID())
+        service.setID(TemporaryID.new())
+        return [(Modelactions.ADDHOST, host, command_id), (Modelactions.ADDSERVICEHOST, service, command_id)]
+
+    def test_actions_of_a_command_are_sent_with_it(self):
+        self.mappers_manager.find.return_value = CommandRunInformation(
+            command='nmap', params='-sV 10.0.0.1', user='faraday', hostname='box', itime=1588587630.5,
+            import_source='shell')
+        actions = self._plugin_scan(7)
+        self.pending_actions.put(actions[1])
+        self.controller._processBatch(actions[0])
+        self.mappers_manager.save.assert_not_called()
+        self.mappers_manager.bulk_save.assert_called_once()
+        data = self.mappers_manager.bulk_save.call_args[0][0]
+        self.assertEqual(data['command'], {
+            'tool': 'nmap', 'command': 'nmap', 'params': '-sV 10.0.0.1', 'user': 'faraday',
+            'hostname': 'box', 'import_source': 'shell', 'start_date': '2020-05-04T10:20:30.500000'})
+        self.assertEqual(data['hosts'][0]['services'][0]['port'], 80)
+        self.mappers_manager.find.assert_called_once_with('CommandRunInformation', 7)
+        self.assertEqual([action[1].getID() for action in actions], [10, 20])
+
+    def test_each_command_has_its_batch(self):
+        self.mappers_manager.find.side_effect = lambda signature, command_id: models.Command(
+            {'id': command_id, 'command': 'nmap', 'duration': 1, 'hostname': 'box', 'ip': '', 'user': 'faraday',
+             'itime': 1588587630500, 'params': str(command_id), 'workspace': 'a_ws', 'import_source': 'shell'},
+            'a_ws')
+        first, second = self._plugin_scan(7), self._plugin_scan(8)
+        for action in first[1:] + second:
+            self.pending_actions.put(action)
+        self.controller._processBatch(first[0])
+        commands = [call[0][0]['command'] for call in self.mappers_manager.bulk_save.call_args_list]
+        self.assertEqual([command['params'] for command in commands], ['7', '8'])
+        self.assertEqual(commands[0]['start_date'], '2020-05-04T10:20:30.500000')
+        self.mappers_manager.save.assert_not_called()
+
+    def test_actions_of_an_unknown_command_are_saved_one_by_one(self):
+        self.mappers_manager.find.return_value = None
+        self.mappers_manager.save.side_effect = [11, 21]
+        actions = self._plugin_scan(7)
+        self.pending_actions.put(actions[1])
+        self.controller._processBatch(actions[0])
+        self.mappers_manager.bulk_save.assert_not_called()
+        self.mappers_manager.save.assert_any_call(actions[0][1], 7)
+        self.assertEqual(actions[1][1].getParent(), 11)
+
+    def test_rejected_batch_is_saved_one_by_one(self):
+        self.mappers_manager.bulk_save.side_effect = CantCommunicateWithServerError(None, 'url', None)
+        self.mappers_manager.save.side_effect = [1, 2, 3]
+        host, service, vuln = self._add_scan()
+        self.controller.processAction()
+        self.assertEqual(self.mappers_manager.save.call_count, 3)
+        self.assertEqual((host.getID(), service.getID(), vuln.getID()), (1, 2, 3))
+        self.assertEqual(service.getParent(), 1)
+        self.assertEqual(vuln.getParent(), 2)
+
+    def test_other_actions_keep_their_order(self):
+        host = self.controller.newHost('10.0.0.1')
+        self.controller.add_action((Modelactions.ADDHOST, host))
+        self.controller.add_action((Modelactions.EDITHOST, host, None))
+        self.controller.processAction()
+        self.mappers_manager.bulk_save.assert_called_once()
+        self.mappers_manager.update.assert_called_once()
+
+    def test_batching_can_be_disabled(self):
+        controller = ModelController(self.mappers_manager, self.pending_actions, batch_size=1)
+        host = controller.newHost('10.0.0.1')
+        self.mappers_manager.save.return_value = 5
+        controller.add_action((Modelactions.ADDHOST, host))
+        controller.processAction()
+        self.mappers_manager.bulk_save.assert_not_called()
+        self.assertEqual(host.getID(), 5)
+
+
+class PluginActionsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mappers_manager = mock.MagicMock(workspace_name='a_ws')
+        self.pending_actions = Queue()
+        self.controller = ModelController(self.mappers_manager, self.pending_actions, batch_size=1)
+        notifier_patch = mock.patch('faraday_client.model.controller.notifier')
+        notifier_patch.start()
+        self.addCleanup(notifier_patch.stop)
+        self.plugin = ScanPlugin()
+        self.plugin.set_actions_queue(self.pending_actions)
+        self.plugin.setCommandID(7)
+
+    def _queued_objects(self):
+        return [action[1] for action in list(self.pending_actions.queue)]
+
+    def test_plugin_objects_get_an_id_for_their_children(self):
+        self.plugin.parseOutputString('')
+        host, service, vuln = self._queued_objects()
+        self.assertIsInstance(host.getID(), TemporaryID)
+        self.assertEqual(service.getParent(), host.getID())
+        self.assertEqual(vuln.getParent(), service.getID())
+
+    def test_parents_of_plugin_objects_are_resolved(self):
+        self.mappers_manager.save.side_effect = [10, 20, 30]
+        self.plugin.parseOutputString('')
+        host, service, vuln = self._queued_objects()
+        while not self.pending_actions.empty():
+            self.controller.processAction()
+        self.assertEqual([call[0][1] for call in self.mappers_manager.save.call_args_list], [7, 7, 7])
+        self.assertEqual(host.getID(), 10)
+        self.assertEqual(service.getParent(), 10)
+        self.assertEqual(vuln.getParent(), 20)
+
+# I'm Py3
@@ -0,0 +1,108 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import time
+import threading
+import unittest
+from queue import Queue
+from unittest import mock
+
+from faraday_client.model import Modelactions
+from faraday_client.model.controller import ModelController
+from faraday_client.model.id_future import IDFuture, ObjectNotSaved, TemporaryID
+from faraday_client.persistence.server import models
+
+
+class IDFutureTests(unittest.TestCase):
+
+    def test_callbacks_run_when_set(self):
+        future = IDFuture()
+        ids = []
+        future.add_done_callback(ids.append)
+        self.assertFalse(future.done())
+        future.set(5)
+        future.set(6)
+        future.add_done_callback(ids.append)
+        self.assertEqual(ids, [5, 5])
+        self.assertEqual(future.result(), 5)
+
+    def test_result_waits_for_the_id(self):
+        future = IDFuture()
+        self.assertIsNone(future.result(timeout=0.01))
+        threading.Timer(0.05, future.set, [7]).start()
+        self.assertEqual(future.result(timeout=5), 7)
+
+    def test_failed_futures(self):
+        future = IDFuture()
+        ids = []
+        future.add_done_callback(ids.append)
+        future.set_exception(ObjectNotSaved('rejected'))
+        future.set(5)
+        self.assertTrue(future.done())
+        self.assertEqual(ids, [None])
+        self.assertIsInstance(future.exception(), ObjectNotSaved)
+        with self.assertRaises(ObjectNotSaved):
+            future.result(timeout=0)
+
+    def test_temporary_ids_are_not_server_ids(self):
+        future = IDFuture(TemporaryID.new())
+        self.assertFalse(future.done())
+        with self.assertRaises(ValueError):
+            future.set(TemporaryID.new())
+        self.assertFalse(future.done())
+
+    def test_get_id_does_not_block(self):
+        host = models.Host({'name': '10.0.0.1'}, 'a_ws')
+        start = time.monotonic()
+        self.assertIsNone(host.getID())
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class ControllerIDsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mappers_manager = mock.MagicMock(workspace_name='a_ws')
+        self.controller = ModelController(self.mappers_manager, Queue(), batch_size=1)
+        notifier_patch = mock.patch('faraday_client.model.controller.notifier')
+        notifier_patch.start()
+        self.addCleanup(notifier_patch.stop)
+
+    def test_children_are_saved_with_the_server_id_of_their_parent(self):
+        self.mappers_manager.save.side_effect = [10, 20]
+        host = self.controller.newHost('10.0.0.1')
+        self.controller.add_action((Modelactions.ADDHOST, host))
+        service = self.controller.newService('http', 'tcp', [80], parent_id=host.getID())
+        self.controller.add_action((Modelactions.ADDSERVICEHOST, service))
+        self.assertIsInstance(service.getParent(), TemporaryID)
+        saved = []
+        host.id_future.add_done_callback(saved.append)
+
+        self.controller.processAction()
+        self.controller.processAction()
+
+        self.assertEqual(saved, [10])
+        self.assertEqual(service.getParent(), 10)
+        self.assertEqual(service.id_future.result(), 20)
+
+    def test_children_of_unsaved_parents_fail(self):
+        self.mappers_manager.save.side_effect = [None]
+        host = self.controller.newHost('10.0.0.1')
+        self.controller.add_action((Modelactions.ADDHOST, host))
+        service = self.controller.newService('http', 'tcp', [80], parent_id=host.getID())
+        self.controller.add_action((Modelactions.ADDSERVICEHOST, service))
+
+        self.controller.processAction()
+        self.controller.processAction()
+
+        with self.assertRaises(ObjectNotSaved):
+            host.id_future.result(timeout=0)
+        with self.assertRaises(ObjectNotSaved):
+            service.id_future.result(timeout=0)
+
+
+# I'm Py3
@@ -0,0 +1,118 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import time
+import threading
+import unittest
+from queue import Empty, Full, Queue
+
+from faraday_client.model import Modelactions
+from faraday_client.persistence.server import models
+from faraday_client.model.pending_actions import (
+    PendingActionsScheduler,
+    lane_of,
+    put_action,
+    FROM_PLUGIN,
+    PLUGIN_BULK,
+)
+
+
+class PendingActionsSchedulerTests(unittest.TestCase):
+
+    def test_interactive_actions_go_first(self):
+        scheduler = PendingActionsScheduler()
+        for index in range(100):
+            scheduler.put((Modelactions.ADDHOST, index), origin=FROM_PLUGIN)
+        scheduler.put((Modelactions.ADDHOST, 'gui'))
+        self.assertEqual(scheduler.get(), (Modelactions.ADDHOST, 'gui'))
+        self.assertEqual(scheduler.get(), (Modelactions.ADDHOST, 0))
+        self.assertEqual(scheduler.qsize(), 99)
+
+    def test_logging_is_not_starved(self):
+        scheduler = PendingActionsScheduler(logging_share=2)
+        for index in range(5):
+            scheduler.put((Modelactions.ADDHOST, index), origin=FROM_PLUGIN)
+        scheduler.put((Modelactions.LOG, 'log'))
+        actions = [scheduler.get()[1] for _ in range(6)]
+        self.assertEqual(actions, [0, 1, 'log', 2, 3, 4])
+
+    def test_producers_are_served_round_robin_in_order(self):
+        scheduler = PendingActionsScheduler()
+        for index in range(3):
+            scheduler.put((Modelactions.ADDHOST, 'big', index), origin=FROM_PLUGIN, producer='big import')
+        scheduler.put((Modelactions.ADDHOST, 'small', 0), origin=FROM_PLUGIN, producer='small import')
+        actions = [scheduler.get()[1:] for _ in range(4)]
+        self.assertEqual(actions, [('big', 0), ('small', 0), ('big', 1), ('big', 2)])
+
+    def test_full_lane_blocks_producers(self):
+        scheduler = PendingActionsScheduler(lane_sizes={PLUGIN_BULK: 1})
+        scheduler.put((Modelactions.ADDHOST, 0), origin=FROM_PLUGIN)
+        with self.assertRaises(Full):
+            scheduler.put((Modelactions.ADDHOST, 1), timeout=0.01, origin=FROM_PLUGIN)
+        # Other lanes are not affected
+        scheduler.put((Modelactions.EDITHOST, 'edit'), block=False)
+
+        def consume():
+            time.sleep(0.05)
+            scheduler.get()
+            scheduler.get()
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        scheduler.put((Modelactions.ADDHOST, 2), timeout=5, origin=FROM_PLUGIN)
+        consumer.join()
+        stats = scheduler.stats()[PLUGIN_BULK]
+        self.assertEqual(stats['blocked_puts'], 2)
+        self.assertEqual(stats['depth'], 1)
+
+    def test_get_timeout(self):
+        scheduler = PendingActionsScheduler()
+        with self.assertRaises(Empty):
+            scheduler.get(timeout=0.01)
+        self.assertTrue(scheduler.empty())
+
+    def test_edits_wait_for_the_add_of_their_object(self):
+        scheduler = PendingActionsScheduler()
+        host = models.Host({'name': '10.0.0.1'}, 'a_ws')
+        host.setID('tmp-host')
+        service = models.Service({'name': 'http', 'protocol': 'tcp', 'ports': [80], 'version': '',
+                                  'status': 'open', 'parent': 'tmp-host'}, 'a_ws')
+        other_host = models.Host({'name': '10.0.0.2'}, 'a_ws')
+        scheduler.put((Modelactions.ADDHOST, other_host), origin=FROM_PLUGIN, producer='nmap')
+        scheduler.put((Modelactions.ADDHOST, host), origin=FROM_PLUGIN, producer='nmap')
+        scheduler.put((Modelactions.ADDSERVICEHOST, service))
+        scheduler.put((Modelactions.EDITHOST, host))
+        scheduler.put((Modelactions.DELHOST, 'other'))
+        actions = [scheduler.get()[0:2] for _ in range(5)]
+        self.assertEqual(actions[0], (Modelactions.DELHOST, 'other'))
+        self.assertEqual([action for action, _ in actions[1:]],
+                         [Modelactions.ADDHOST, Modelactions.ADDHOST,
+                          Modelactions.ADDSERVICEHOST, Modelactions.EDITHOST])
+        # Once added, the object is not followed any more
+        scheduler.put((Modelactions.ADDHOST, other_host), origin=FROM_PLUGIN)
+        scheduler.put((Modelactions.EDITHOST, host))
+        self.assertEqual(scheduler.get()[0], Modelactions.EDITHOST)
+
+    def test_put_action(self):
+        scheduler = PendingActionsScheduler()
+        put_action(scheduler, (Modelactions.ADDHOST, 0), FROM_PLUGIN, producer='nmap')
+        self.assertEqual(scheduler.stats()[PLUGIN_BULK]['depth'], 1)
+        queue = Queue()
+        put_action(queue, (Modelactions.ADDHOST, 0), FROM_PLUGIN)
+        self.assertEqual(queue.get(), (Modelactions.ADDHOST, 0))
+
+    def test_lanes(self):
+        self.assertEqual(lane_of((Modelactions.PLUGINEND, 'nmap'), FROM_PLUGIN), 'plugin_bulk')
+        self.assertEqual(lane_of((Modelactions.ADDVULN, 'vuln'), FROM_PLUGIN), 'plugin_bulk')
+        self.assertEqual(lane_of((Modelactions.DEVLOG, 'msg'), FROM_PLUGIN), 'logging')
+        # Hosts added from the GUI or the REST API
+        self.assertEqual(lane_of((Modelactions.ADDHOST, 'host')), 'interactive')
+        self.assertEqual(lane_of((Modelactions.DELVULN, 1)), 'interactive')
+
+
+# I'm Py3
@@ -6,6 +6,7 @@ See the file 'doc/LICENSE' for the license information
 '''
 from __future__ import absolute_import
 
+import copy
 import unittest
 import json
 from faraday_client.persistence.server import models
@@ -81,5 +82,105 @@ class ModelsTest(unittest.TestCase):
         self.assertTrue(all([isinstance(v, models.Vuln) for v in vulns]))
         self.assertTrue(all([isinstance(v, models.VulnWeb) for v in vulns_web]))
 
+    def test_compact_objects_getter(self):
+        hosts = models._get_faraday_ready_objects(self.ws, [self.a_host_dictionary], 'hosts', compact=True)
+        services = models._get_faraday_ready_objects(self.ws, [self.a_service_dictionary], 'services',
+                                                     compact=True)
+        vulns = models._get_faraday_ready_vulns(self.ws, [self.a_vuln_dictionary, self.a_vuln_web_dictionary],
+                                                compact=True)
+
+        self.assertIsInstance(hosts[0], models.CompactHost)
+        self.assertIsInstance(services[0], models.CompactService)
+        self.assertEqual([type(v) for v in vulns], [models.CompactVuln, models.CompactVulnWeb])
+        for obj in hosts + services + vulns:
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_compact_objects_match_the_regular_ones(self):
+        def normalized(value):
+            return list(value) if isinstance(value, (list, tuple)) else value
+
+        for dictionary, cls, compact_cls in [
+                (self.a_host_dictionary, models.Host, models.CompactHost),
+                (self.a_service_dictionary, models.Service, models.CompactService),
+                (self.a_vuln_dictionary, models.Vuln, models.CompactVuln),
+                (self.a_vuln_web_dictionary, models.VulnWeb, models.CompactVulnWeb)]:
+            flattened = models._flatten_dictionary(dictionary)
+            obj = cls(flattened, self.ws)
+            compact = compact_cls(flattened, self.ws)
+            self.assertEqual(compact.class_signature, obj.class_signature)
+            self.assertEqual(compact.publicattrsrefs(), obj.publicattrsrefs())
+            getters = [name for name in dir(compact) if name.startswith('get') and
+                       name not in ('getMetadata', 'getUpdates', 'getVulns', 'getServices', 'getService')]
+            self.assertGreater(len(getters), 5)
+            for name in getters:
+                self.assertEqual(normalized(getattr(compact, name)()), normalized(getattr(obj, name)()), name)
+            for name in list(obj.publicattrsrefs().values()) + ['desc', 'parent_type']:
+                if hasattr(obj, name):
+                    self.assertEqual(normalized(getattr(compact, name)), normalized(getattr(obj, name)), name)
+
+    def test_compact_objects_are_lazy(self):
+        host = models.CompactHost(models._flatten_dictionary(self.a_host_dictionary), self.ws)
+        self.assertIsNone(host._id_future)
+        self.assertEqual(host.id_future.result(timeout=0), host.id)
+        self.assertIs(host.id_future, host.id_future)
+        self.assertEqual(host.getMetadata()['creator'], '')
+
+        del self.a_host_dictionary['value']['metadata']
+        host = models.CompactHost(models._flatten_dictionary(self.a_host_dictionary), self.ws)
+        self.assertIsNone(host._metadata)
+        self.assertIsInstance(host.getMetadata(), models.Metadata)
+        self.assertIs(host.getMetadata(), host.getMetadata())
+
+    def test_compact_objects_share_strings(self):
+        first, second = [models.CompactVuln(models._flatten_dictionary(json.loads(VULN_JSON_STRING)), self.ws)
+                         for _ in range(2)]
+        self.assertIs(first.severity, second.severity)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.refs, second.refs)
+        first, second = [models.CompactHost(models._flatten_dictionary(json.loads(HOST_JSON_STRING)), self.ws)
+                         for _ in range(2)]
+        self.assertIs(first.os, second.os)
+
+    def test_lazy_objects_match_the_regular_ones(self):
+        for dictionary, cls, lazy_cls in [
+                (self.a_host_dictionary, models.Host, models.LazyHost),
+                (self.a_service_dictionary, models.Service, models.LazyService),
+                (self.a_vuln_dictionary, models.Vuln, models.LazyVuln),
+                (self.a_vuln_web_dictionary, models.VulnWeb, models.LazyVulnWeb)]:
+            obj = cls(models._flatten_dictionary(dictionary), self.ws)
+            lazy = lazy_cls(dictionary, self.ws)
+            self.assertIsInstance(lazy, cls)
+            for name in vars(obj):
+                if name not in ('id_future', '_metadata'):
+                    self.assertEqual(getattr(lazy, name), getattr(obj, name), name)
+            self.assertEqual(lazy.getMetadata(), obj.getMetadata())
+            self.assertEqual(lazy.id_future.result(timeout=0), obj.id)
+
+    def test_lazy_objects_decode_on_first_access(self):
+        vuln = models.LazyVuln(self.a_vuln_dictionary, self.ws)
+        self.assertEqual(set(vars(vuln)), {'_workspace_name', '_row'})
+        self.assertEqual(vuln.name, 'Ethernet Card Manufacturer Detection')
+        self.assertEqual(set(vars(vuln)), {'_workspace_name', '_row', 'name'})
+        self.assertRaises(AttributeError, getattr, vuln, 'not_a_field')
+
+        vuln.updateAttributes(severity='HIGH', name='renamed')
+        self.assertEqual(vuln.getSeverity(), 'high')
+        self.assertEqual(vuln.getName(), 'renamed')
+        self.assertEqual(copy.copy(vuln).getName(), 'renamed')
+
+    def test_lazy_objects_getter(self):
+        vulns = models._get_faraday_ready_vulns(
+            self.ws, [self.a_vuln_web_dictionary, self.a_vuln_dictionary], lazy=True)
+        self.assertEqual([type(v) for v in vulns], [models.LazyVuln, models.LazyVulnWeb])
+        hosts = models._get_faraday_ready_hosts(self.ws, [self.a_host_dictionary], lazy=True)
+        self.assertEqual(hosts[0].getName(), hosts[0].name)
+
+    def test_standarize_severity(self):
+        vuln = models.Vuln(models._flatten_dictionary(self.a_vuln_dictionary), self.ws)
+        for severity, expected in [('INFORMATIONAL', 'info'), ('Medium', 'med'), (3, 'high'),
+                                   ('4', 'critical'), ('whatever', 'unclassified'), (None, 'unclassified')]:
+            self.assertEqual(vuln.standarize(severity), expected)
+            self.assertEqual(models._standarize_severity(severity), expected)
+
 
 # I'm Py3
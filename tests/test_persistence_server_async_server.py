@@ -0,0 +1,75 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import async_server
+from faraday_client.persistence.server import async_models
+from faraday_client.persistence.server import server_io_exceptions
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncServerTests(unittest.TestCase):
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def slow_get_hosts(workspace_name, **params):
+            with lock:
+                in_flight.append(1)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return [{'ws': workspace_name}]
+
+        with patch.object(server, 'get_hosts', side_effect=slow_get_hosts):
+            results = _run(async_server.gather(async_server.get_hosts('ws')
+                                               for _ in range(40)))
+        self.assertEqual(len(results), 40)
+        self.assertLessEqual(max(max_in_flight), async_server.MAX_CONCURRENT_REQUESTS)
+        self.assertGreater(max(max_in_flight), 1)
+
+    @responses.activate
+    def test_raises_the_same_exceptions(self):
+        url = server._create_server_delete_url('ws', 'Host', 1)
+        responses.add(responses.GET, url, status=404)
+        with self.assertRaises(server_io_exceptions.ResourceDoesNotExist):
+            _run(async_server.delete_host('ws', 1))
+
+    @responses.activate
+    def test_models_return_faraday_objects(self):
+        url = server._create_server_get_url('ws', 'hosts')
+        responses.add(responses.GET, url, json={
+            'rows': [{'id': 1, 'key': 1, 'value': {'name': '127.0.0.1', 'os': 'Linux'}}]})
+        hosts = _run(async_models.get_hosts('ws'))
+        self.assertEqual(len(hosts), 1)
+        self.assertEqual(hosts[0].getName(), '127.0.0.1')
+        self.assertEqual(hosts[0].getOS(), 'Linux')
+
+
+# I'm Py3
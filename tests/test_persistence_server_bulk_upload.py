@@ -0,0 +1,183 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import requests
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import bulk_upload
+from faraday_client.persistence.server.server_io_exceptions import BulkUploadIncomplete
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+def _host(index, services=0, vulns=0):
+    return {
+        'ip': '10.0.0.{0}'.format(index),
+        'description': 'a host',
+        'vulnerabilities': [{'name': 'vuln {0}'.format(i), 'severity': 'low'} for i in range(vulns)],
+        'services': [{'name': 'srv', 'port': port, 'protocol': 'tcp',
+                      'vulnerabilities': [{'name': 'srv vuln', 'severity': 'high'}]}
+                     for port in range(services)],
+    }
+
+
+class SplitBulkDataTests(unittest.TestCase):
+
+    def test_small_payload_is_one_chunk(self):
+        data = {'hosts': [_host(1, services=2, vulns=1)], 'command': {'tool': 'nmap'}}
+        self.assertEqual(bulk_upload.split_bulk_data(data), [data])
+
+    def test_chunks_are_bounded_and_keep_the_objects(self):
+        data = {'hosts': [_host(i, services=5, vulns=3) for i in range(30)],
+                'command': {'tool': 'nmap'}, 'execution_id': 1}
+        chunks = bulk_upload.split_bulk_data(data, max_bytes=2000)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(['command' in chunk for chunk in chunks], [True] + [False] * (len(chunks) - 1))
+        self.assertEqual(chunks[0]['command'], {'tool': 'nmap'})
+        self.assertTrue(all(chunk['execution_id'] == 1 for chunk in chunks))
+        self.assertTrue(all(len(json.dumps(chunk)) <= 2100 for chunk in chunks))
+        ports = [(host['ip'], service['port'])
+                 for chunk in chunks for host in chunk['hosts'] for service in host['services']]
+        self.assertEqual(ports, [(host['ip'], service['port'])
+                                 for host in data['hosts'] for service in host['services']])
+
+    def test_big_hosts_are_repeated_with_their_children_split(self):
+        data = {'hosts': [_host(1, services=40)]}
+        chunks = bulk_upload.split_bulk_data(data, max_bytes=1000)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertEqual([host['ip'] for host in chunk['hosts']], ['10.0.0.1'])
+            for service in chunk['hosts'][0]['services']:
+                self.assertEqual(len(service['vulnerabilities']), 1)
+        ports = [service['port'] for chunk in chunks for service in chunk['hosts'][0]['services']]
+        self.assertEqual(ports, list(range(40)))
+
+
+class BulkUploaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.state_path = tempfile.mkdtemp()
+        self.url = server._create_server_get_url('a_ws', 'bulk_create')
+        self.data = {'hosts': [_host(i, services=2, vulns=1) for i in range(20)],
+                     'command': {'tool': 'nmap'}}
+        self.uploader = bulk_upload.BulkUploader('a_ws', max_bytes=1500, workers=3,
+                                                 state_path=self.state_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.state_path)
+
+    @responses.activate
+    def test_upload(self):
+        responses.add(responses.POST, self.url, status=201, json={})
+        result = self.uploader.upload(self.data)
+        self.assertEqual(result.uploaded, result.chunks)
+        self.assertEqual(len(responses.calls), result.chunks)
+        self.assertEqual(result.objects, bulk_upload.count_objects(self.data))
+        self.assertEqual(len(result.chunk_latencies), result.chunks)
+        self.assertEqual(json.loads(responses.calls[0].request.body)['command'], {'tool': 'nmap'})
+        self.assertEqual(os.listdir(self.state_path), [])
+
+    @responses.activate
+    def test_one_command_is_created_per_upload(self):
+        commands = []
+
+        def bulk_create(request):
+            command = json.loads(request.body).get('command')
+            if command is not None:
+                commands.append(command)
+            return (201, {}, json.dumps({'message': 'Created', 'command_id': len(commands) or None}))
+
+        responses.add_callback(responses.POST, self.url, callback=bulk_create)
+        command_url = server._create_server_put_url('a_ws', 'CommandRunInformation', 1, None)
+        responses.add(responses.PUT, command_url, status=200, json={})
+        self.data['command'].update({'start_date': '2020-05-04T10:20:30', 'params': '-sV'})
+        result = self.uploader.upload(self.data)
+        self.assertGreater(result.chunks, 1)
+        self.assertEqual(commands, [self.data['command']])
+        self.assertEqual(result.command_id, 1)
+        # Updated to end with the last chunk
+        updates = [call for call in responses.calls if call.request.method == 'PUT']
+        self.assertEqual(len(updates), 1)
+        update = json.loads(updates[0].request.body)
+        self.assertEqual((update['tool'], update['params'], update['itime']), ('nmap', '-sV', 1588587630.0))
+        self.assertGreater(update['duration'], 0)
+
+    @responses.activate
+    def test_failed_upload_is_resumed(self):
+        failed_ips = set()
+
+        def fail_on_the_third_chunk(request):
+            hosts = json.loads(request.body)['hosts']
+            if '10.0.0.5' in [host['ip'] for host in hosts] and not failed_ips:
+                failed_ips.add('10.0.0.5')
+                return (400, {}, '{}')
+            return (201, {}, '{}')
+
+        responses.add_callback(responses.POST, self.url, callback=fail_on_the_third_chunk)
+        with self.assertRaises(BulkUploadIncomplete) as context:
+            self.uploader.upload(self.data)
+        chunks = context.exception.result.chunks
+        self.assertEqual(len(context.exception.result.failed), 1)
+        self.assertTrue(os.path.exists(context.exception.state_file))
+
+        calls_before = len(responses.calls)
+        result = self.uploader.upload(self.data)
+        self.assertEqual(result.skipped, chunks - 1)
+        self.assertEqual(result.uploaded, 1)
+        self.assertEqual(len(responses.calls) - calls_before, 1)
+        self.assertFalse(os.path.exists(context.exception.state_file))
+
+    def _fail_the_first_chunk_without_answer(self):
+        responses.add(responses.POST, self.url, body=requests.exceptions.ConnectionError('reset'))
+        with self.assertRaises(BulkUploadIncomplete):
+            self.uploader.upload(self.data)
+        responses.reset()
+        responses.add(responses.POST, self.url, status=201, json={})
+
+    @responses.activate
+    def test_first_chunk_is_not_sent_again_if_its_command_was_created(self):
+        self.data['command']['start_date'] = '2020-05-04T10:20:30.123456'
+        self.data['command']['params'] = '-sV 10.0.0.0/24'
+        self._fail_the_first_chunk_without_answer()
+        responses.add(responses.GET, server._create_server_get_url('a_ws', 'commands'), json={
+            'commands': [{'id': 1, 'value': {'itime': 1588587630123.0, 'params': '-sV 10.0.0.0/24',
+                                             'user': None, 'hostname': None}}]})
+        result = self.uploader.upload(self.data)
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(result.uploaded, result.chunks - 1)
+        posted = [call for call in responses.calls if call.request.method == 'POST']
+        self.assertNotEqual(json.loads(posted[0].request.body)['hosts'][0]['ip'], '10.0.0.0')
+
+    @responses.activate
+    def test_first_chunk_is_sent_again_if_its_command_is_not_there(self):
+        self.data['command']['start_date'] = '2020-05-04T10:20:30.123456'
+        self._fail_the_first_chunk_without_answer()
+        responses.add(responses.GET, server._create_server_get_url('a_ws', 'commands'),
+                      json={'commands': []})
+        result = self.uploader.upload(self.data)
+        self.assertEqual(result.skipped, 0)
+        self.assertEqual(result.uploaded, result.chunks)
+
+    @responses.activate
+    def test_other_chunks_are_not_sent_if_the_first_fails(self):
+        responses.add(responses.POST, self.url, status=400)
+        with self.assertRaises(BulkUploadIncomplete) as context:
+            self.uploader.upload(self.data)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(len(context.exception.result.failed), context.exception.result.chunks)
+
+
+# I'm Py3
@@ -0,0 +1,70 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import threading
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import models
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+models.FARADAY_UP = False
+
+
+class ServerClientTests(unittest.TestCase):
+
+    def test_default_client_follows_module_globals(self):
+        self.assertEqual(server.get_current_client(), server.get_default_client())
+        self.assertEqual(server._get_base_server_url(), server.SERVER_URL)
+        self.assertEqual(server._create_server_api_url(), server.SERVER_URL + '/_api/v3')
+
+    def test_activated_client_builds_the_urls(self):
+        client = server.ServerClient('http://staging:5985/')
+        with client.activate():
+            self.assertEqual(server._create_server_get_url('ws', 'hosts'),
+                             'http://staging:5985/_api/v3/ws/ws/hosts')
+        self.assertEqual(server._get_base_server_url(), server.SERVER_URL)
+
+    @responses.activate
+    def test_clients_in_parallel_threads(self):
+        clients = {
+            'staging': server.ServerClient('http://staging:5985', cookies={'session': 'staging'}),
+            'production': server.ServerClient('http://production:5985', cookies={'session': 'production'}),
+        }
+        for name, client in clients.items():
+            with client.activate():
+                url = server._create_server_get_url('ws', 'hosts')
+            responses.add(responses.GET, url, json={
+                'rows': [{'id': 1, 'value': {'name': name, 'os': 'Linux'}}]})
+        results = {}
+
+        def import_hosts(name):
+            results[name] = clients[name].call(models.get_hosts, 'ws')[0].getName()
+
+        threads = [threading.Thread(target=import_hosts, args=(name,)) for name in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {'staging': 'staging', 'production': 'production'})
+        sent_cookies = sorted(call.request.headers['Cookie'] for call in responses.calls)
+        self.assertEqual(sent_cookies, ['session=production', 'session=staging'])
+
+    def test_set_default_client(self):
+        client = server.ServerClient('http://other:5985')
+        previous = server.set_default_client(client)
+        try:
+            self.assertEqual(server._get_base_server_url(), 'http://other:5985')
+        finally:
+            server.set_default_client(previous)
+
+
+# I'm Py3
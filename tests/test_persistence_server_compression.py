@@ -0,0 +1,91 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import gzip
+import json
+import zlib
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import compression
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+class RequestCompressionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.compressor = compression.configure_request_compression('gzip', min_size=1024)
+        self.url = server._create_server_get_url('a_ws', 'bulk_create')
+        self.data = {'hosts': [{'ip': '10.0.0.{0}'.format(i), 'description': 'host'}
+                               for i in range(200)]}
+
+    def tearDown(self):
+        compression.configure_request_compression()
+
+    @responses.activate
+    def test_big_payloads_are_compressed(self):
+        responses.add(responses.POST, self.url, status=201, json={'hosts_created': 200})
+        self.assertEqual(server.bulk_create('a_ws', self.data), {'hosts_created': 200})
+        request = responses.calls[0].request
+        self.assertEqual(request.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(request.body)), self.data)
+        stats = self.compressor.stats()
+        self.assertEqual(stats['compressed_uploads'], 1)
+        self.assertGreater(stats['bytes_saved'], 0)
+
+    @responses.activate
+    def test_small_payloads_are_not_compressed(self):
+        responses.add(responses.POST, self.url, status=201, json={})
+        server.bulk_create('a_ws', {'hosts': []})
+        self.assertNotIn('Content-Encoding', responses.calls[0].request.headers)
+        self.assertEqual(self.compressor.stats()['bytes_saved'], 0)
+
+    @responses.activate
+    def test_deflate(self):
+        compression.configure_request_compression(encoding='deflate', min_size=0)
+        responses.add(responses.POST, self.url, status=201, json={})
+        server.bulk_create('a_ws', self.data)
+        request = responses.calls[0].request
+        self.assertEqual(request.headers['Content-Encoding'], 'deflate')
+        self.assertEqual(json.loads(zlib.decompress(request.body)), self.data)
+
+    @responses.activate
+    def test_falls_back_when_the_server_rejects_compressed_bodies(self):
+        responses.add(responses.POST, self.url, status=415)
+        responses.add(responses.POST, self.url, status=201, json={})
+        responses.add(responses.POST, self.url, status=201, json={})
+        server.bulk_create('a_ws', self.data)
+        server.bulk_create('a_ws', self.data)
+        self.assertEqual(len(responses.calls), 3)
+        self.assertEqual(json.loads(responses.calls[1].request.body), self.data)
+        self.assertNotIn('Content-Encoding', responses.calls[2].request.headers)
+        self.assertEqual(self.compressor.stats()['unsupported_servers'], ['localhost:5985'])
+
+    @responses.activate
+    def test_bad_payloads_are_not_sent_again(self):
+        responses.add(responses.POST, self.url, status=400)
+        with self.assertRaises(server.CantCommunicateWithServerError):
+            server.bulk_create('a_ws', self.data)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(self.compressor.encoding_for(self.url, 2048), 'gzip')
+
+    @responses.activate
+    def test_disabled_by_default(self):
+        compression.configure_request_compression()
+        responses.add(responses.POST, self.url, status=201, json={})
+        server.bulk_create('a_ws', self.data)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertNotIn('Content-Encoding', responses.calls[0].request.headers)
+        self.assertEqual(json.loads(responses.calls[0].request.body), self.data)
+
+
+# I'm Py3
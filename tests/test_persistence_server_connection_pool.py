@@ -0,0 +1,70 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server.connection_pool import ServerSessionPool
+
+server.FARADAY_UP = False
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'cookie': self.headers.get('Cookie')}).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'session=from_server')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServerSessionPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.httpd = HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        self.url = 'http://127.0.0.1:{0}/'.format(self.httpd.server_port)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.pool = ServerSessionPool(pool_maxsize=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            self.assertEqual(self.pool.get(self.url).status_code, 200)
+        stats = self.pool.stats()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['new_connections'], 1)
+        self.assertEqual(stats['open_connections'], 1)
+        self.assertAlmostEqual(stats['reuse_ratio'], 0.8)
+
+    def test_cookies_are_not_stored_in_the_session(self):
+        self.pool.get(self.url, cookies={'session': 'mine'})
+        answer = self.pool.get(self.url, cookies={'session': 'mine'}).json()
+        self.assertEqual(answer['cookie'], 'session=mine')
+        self.assertEqual(self.pool.get(self.url).json()['cookie'], None)
+
+    def test_unsafe_io_with_server_through_pool(self):
+        answer = server._unsafe_io_with_server(self.pool.get, [200], self.url)
+        self.assertEqual(answer.status_code, 200)
+
+
+# I'm Py3
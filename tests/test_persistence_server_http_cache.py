@@ -0,0 +1,78 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import http_cache
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+class HTTPCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = http_cache.configure_http_cache(ttls={'workspace': 60, 'hosts': 0})
+        self.summary_url = server._create_server_get_url('a_ws')
+        self.hosts_url = server._create_server_get_url('a_ws', 'hosts')
+
+    def tearDown(self):
+        http_cache.configure_http_cache()
+
+    @responses.activate
+    def test_fresh_answers_are_reused(self):
+        responses.add(responses.GET, self.summary_url, json={'stats': {'hosts': 1}})
+        first = server._get(self.summary_url)
+        first['stats']['hosts'] = 100
+        self.assertEqual(server._get(self.summary_url), {'stats': {'hosts': 1}})
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    @responses.activate
+    def test_expired_answers_are_revalidated(self):
+        responses.add(responses.GET, self.hosts_url, json={'rows': [{'id': 1}]},
+                      headers={'ETag': '"v1"'})
+        responses.add(responses.GET, self.hosts_url, status=304)
+        self.assertEqual(server._get(self.hosts_url), {'rows': [{'id': 1}]})
+        self.assertEqual(server._get(self.hosts_url), {'rows': [{'id': 1}]})
+        self.assertNotIn('If-None-Match', responses.calls[0].request.headers)
+        self.assertEqual(responses.calls[1].request.headers['If-None-Match'], '"v1"')
+        self.assertEqual(self.cache.stats()['revalidated'], 1)
+
+    @responses.activate
+    def test_answers_without_validators_nor_ttl_are_not_cached(self):
+        responses.add(responses.GET, self.hosts_url, json={'rows': []})
+        server._get(self.hosts_url)
+        server._get(self.hosts_url)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    @responses.activate
+    def test_writes_invalidate_the_workspace(self):
+        responses.add(responses.GET, self.summary_url, json={'stats': {'hosts': 1}})
+        responses.add(responses.GET, self.summary_url, json={'stats': {'hosts': 2}})
+        responses.add(responses.POST, self.hosts_url, status=201, json={'id': 2})
+        server._get(self.summary_url)
+        server._post(self.hosts_url, ip='127.0.0.1')
+        self.assertEqual(server._get(self.summary_url), {'stats': {'hosts': 2}})
+
+    def test_lru_is_bounded_by_size(self):
+        cache = http_cache.ConditionalGetCache(max_bytes=10, ttls={})
+        cache.put(('a',), http_cache.CacheEntry({}, 6, 60))
+        cache.put(('b',), http_cache.CacheEntry({}, 4, 60))
+        cache.get(('a',))
+        cache.put(('c',), http_cache.CacheEntry({}, 4, 60))
+        self.assertIsNotNone(cache.get(('a',)))
+        self.assertIsNone(cache.get(('b',)))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+# I'm Py3
@@ -0,0 +1,51 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import json
+import unittest
+
+from faraday_client.persistence.server.json_stream import JSONArrayStream, iter_json_array
+
+
+def _chunks(text, size):
+    data = text.encode('utf8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class JSONArrayStreamTests(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [{'id': i, 'value': {'name': 'vuln ñ {0}'.format(i), 'severity': 'high',
+                                         'refs': ['a', 'b'], 'score': 10.5 * i, 'ok': True}}
+                     for i in range(50)]
+        self.document = json.dumps({'count': 123456, 'vulnerabilities': self.rows, 'other': None},
+                                   indent=1)
+
+    def test_decodes_every_element_with_any_chunk_size(self):
+        for size in (1, 2, 7, 100, 4096, len(self.document)):
+            stream = JSONArrayStream(_chunks(self.document, size), 'vulnerabilities')
+            self.assertEqual(list(stream), self.rows)
+            self.assertEqual(stream.extra, {'count': 123456, 'other': None})
+
+    def test_yields_before_reading_the_whole_response(self):
+        chunks = iter(_chunks(self.document, 64))
+        first = next(iter_json_array(chunks, 'vulnerabilities'))
+        self.assertEqual(first, self.rows[0])
+        self.assertTrue(len(list(chunks)) > 0)
+
+    def test_empty_and_missing_arrays(self):
+        self.assertEqual(list(iter_json_array([b'{"rows": []}'], 'rows')), [])
+        self.assertEqual(list(iter_json_array([b'{}'], 'rows')), [])
+        self.assertEqual(list(iter_json_array([b'{"count": 0}'], 'rows')), [])
+
+    def test_truncated_response_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(_chunks(self.document[:-20], 10), 'vulnerabilities'))
+
+
+# I'm Py3
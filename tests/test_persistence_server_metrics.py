@@ -0,0 +1,58 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import server_io_exceptions
+from faraday_client.persistence.server.metrics import get_server_metrics
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+class ServerMetricsTests(unittest.TestCase):
+
+    def setUp(self):
+        get_server_metrics().reset()
+
+    @responses.activate
+    def test_requests_are_recorded_by_endpoint(self):
+        hosts_url = server._create_server_get_url('a_ws', 'hosts')
+        responses.add(responses.GET, hosts_url, body='{"rows": []}',
+                      headers={'Content-Length': '12'})
+        responses.add(responses.GET, hosts_url + '/1', status=404)
+        server._get(hosts_url)
+        with self.assertRaises(server_io_exceptions.ResourceDoesNotExist):
+            server._get(hosts_url + '/1')
+        responses.add(responses.POST, server._create_server_get_url('a_ws', 'bulk_create'), status=201)
+        server.bulk_create('a_ws', {'hosts': []})
+
+        endpoints = server.get_client_metrics()['endpoints']
+        self.assertEqual(endpoints['hosts']['requests'], 2)
+        self.assertEqual(endpoints['hosts']['in_flight'], 0)
+        self.assertEqual(endpoints['hosts']['status_codes'], {'200': 1, '404': 1})
+        self.assertEqual(endpoints['hosts']['bytes_received'], 12)
+        self.assertEqual(endpoints['bulk_create']['bytes_sent'], len(b'{"hosts": []}'))
+
+    @responses.activate
+    def test_prometheus_dump(self):
+        hosts_url = server._create_server_get_url('a_ws', 'hosts')
+        responses.add(responses.GET, hosts_url, json={'rows': []})
+        server._get(hosts_url)
+        get_server_metrics().observe_message('websocket', 10)
+        text = server.get_client_metrics_prometheus()
+        self.assertIn('faraday_client_requests_total{endpoint="hosts",status="200"} 1', text)
+        self.assertIn('faraday_client_request_duration_seconds_count{endpoint="hosts"} 1', text)
+        self.assertIn('faraday_client_request_duration_seconds_bucket{endpoint="hosts",le="+Inf"} 1', text)
+        self.assertIn('faraday_client_messages_total{endpoint="websocket"} 1', text)
+
+
+# I'm Py3
@@ -0,0 +1,104 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import models
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+models.FARADAY_UP = False
+
+
+def host(host_id, ip):
+    return models.Host({'id': host_id, 'name': ip, 'ip': ip}, 'a_ws')
+
+
+def service_row(service_id, host_id):
+    return {'id': service_id, 'key': service_id, 'value': {
+        'id': service_id, 'name': 'srv {0}'.format(service_id), 'parent': host_id, 'protocol': 'tcp',
+        'ports': [service_id], 'status': 'open', 'version': '', 'description': ''}}
+
+
+def vuln_row(vuln_id, target, parent, parent_type='Host', vuln_type='Vulnerability'):
+    return {'id': vuln_id, 'key': vuln_id, 'value': {
+        'id': vuln_id, 'name': 'vuln {0}'.format(vuln_id), 'desc': '', 'severity': 'info',
+        'target': target, 'parent': parent, 'parent_type': parent_type, 'type': vuln_type}}
+
+
+class PrefetchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.services_url = server._create_server_get_url('a_ws', 'services')
+        self.vulns_url = server._create_server_get_url('a_ws', 'vulns')
+        self.hosts = [host(1, '10.0.0.1'), host(2, '10.0.0.2'), host(3, '10.0.0.3')]
+        responses.add(responses.GET, self.services_url, json={'services': [
+            service_row(10, 1), service_row(11, 1), service_row(20, 2), service_row(90, 9)]})
+        responses.add(responses.GET, self.vulns_url, json={'vulnerabilities': [
+            vuln_row(100, '10.0.0.1', 1),
+            vuln_row(101, '10.0.0.1', 10, 'Service', 'VulnerabilityWeb'),
+            vuln_row(200, '10.0.0.2', 20, 'Service'),
+            vuln_row(900, '10.0.0.9', 9)]})
+
+    @responses.activate
+    def test_prefetch_answers_from_memory(self):
+        hosts = models.prefetch(self.hosts, 'services', 'vulns')
+        self.assertEqual(len(responses.calls), 2)
+
+        first, second, third = hosts
+        self.assertEqual([s.getID() for s in first.getServices()], [10, 11])
+        self.assertEqual(first.getService('11').getID(), 11)
+        self.assertIsNone(first.getService(20))
+        self.assertEqual(sorted(v.getID() for v in first.getVulns()), [100, 101])
+        self.assertEqual([v.getID() for v in first.getServices()[0].getVulns()], [101])
+        self.assertEqual(first.getServices()[1].getVulns(), [])
+        self.assertEqual([v.getID() for v in second.getVulns()], [200])
+        self.assertEqual(third.getServices(), [])
+        self.assertEqual(third.getVulns(), [])
+        # The vuln is built once and shared by the host and the service
+        self.assertIs([v for v in first.getVulns() if v.getID() == 101][0],
+                      first.getServices()[0].getVulns()[0])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_prefetched_lists_are_copies(self):
+        first = models.prefetch(self.hosts, 'services')[0]
+        first.getServices().clear()
+        self.assertEqual(len(first.getServices()), 2)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_prefetch_of_one_host_uses_the_filters(self):
+        first = models.prefetch(self.hosts[:1], 'services', 'vulns')[0]
+        self.assertEqual(len(responses.calls), 2)
+        self.assertIn('host_id=1', responses.calls[0].request.url)
+        self.assertIn('target=10.0.0.1', responses.calls[1].request.url)
+        # Filtered by the server, the mock answers all of them
+        self.assertEqual(len(first.getServices()), 4)
+
+    @responses.activate
+    def test_prefetch_keeps_the_kind_of_object(self):
+        hosts = [models.CompactHost({'id': 1, 'name': '10.0.0.1'}, 'a_ws'),
+                 models.CompactHost({'id': 2, 'name': '10.0.0.2'}, 'a_ws')]
+        first, _ = models.prefetch(hosts, 'services', 'vulns')
+        self.assertIsInstance(first.getServices()[0], models.CompactService)
+        self.assertIsInstance(first.getServices()[0].getVulns()[0], models.CompactVulnWeb)
+
+    @responses.activate
+    def test_services_vulns_and_unknown_relations(self):
+        service = models.Service(models._flatten_dictionary(service_row(20, 2)), 'a_ws')
+        models.prefetch([service], 'vulns')
+        self.assertEqual([v.getID() for v in service.getVulns()], [200])
+        self.assertRaises(ValueError, models.prefetch, [service], 'notes')
+        self.assertEqual(models.prefetch([], 'vulns'), [])
+
+
+# I'm Py3
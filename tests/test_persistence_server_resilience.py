@@ -0,0 +1,94 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+
+import requests
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server import resilience
+from faraday_client.persistence.server import server_io_exceptions
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+class ResilienceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.layer = resilience.configure_server_io_resilience(backoff_factor=0, failure_threshold=3)
+        self.url = server._create_server_get_url('a_ws', 'hosts')
+
+    def tearDown(self):
+        resilience.configure_server_io_resilience()
+
+    @responses.activate
+    def test_idempotent_request_is_retried(self):
+        responses.add(responses.GET, self.url, status=503)
+        responses.add(responses.GET, self.url, status=502)
+        responses.add(responses.GET, self.url, json={'rows': []})
+        self.assertEqual(server._get(self.url), {'rows': []})
+        self.assertEqual(len(responses.calls), 3)
+        self.assertEqual(self.layer.stats()['retries'], 2)
+
+    @responses.activate
+    def test_post_is_not_retried_if_the_server_may_have_processed_it(self):
+        responses.add(responses.POST, self.url, status=502)
+        with self.assertRaises(server_io_exceptions.CantCommunicateWithServerError):
+            server._post(self.url, name='host')
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_post_is_retried_when_the_server_refused_it(self):
+        responses.add(responses.POST, self.url, status=429, headers={'Retry-After': '0'})
+        responses.add(responses.POST, self.url, status=201, json={'id': 1})
+        self.assertEqual(server._post(self.url, name='host'), {'id': 1})
+
+    @responses.activate
+    def test_connection_errors_are_retried_until_exhausted(self):
+        self.layer = resilience.configure_server_io_resilience(backoff_factor=0)
+        responses.add(responses.GET, self.url, body=requests.exceptions.ConnectionError())
+        with self.assertRaises(server_io_exceptions.CantCommunicateWithServerError):
+            server._get(self.url)
+        self.assertEqual(len(responses.calls), 4)
+        self.assertEqual(self.layer.stats()['retries_exhausted'], 1)
+
+    @responses.activate
+    def test_circuit_opens_and_fails_fast(self):
+        resilience.configure_server_io_resilience(max_retries=0, failure_threshold=2)
+        responses.add(responses.GET, self.url, status=500)
+        for _ in range(2):
+            with self.assertRaises(server_io_exceptions.CantCommunicateWithServerError):
+                server._get(self.url)
+        with self.assertRaises(server_io_exceptions.ServerUnavailable):
+            server._get(self.url)
+        self.assertEqual(len(responses.calls), 2)
+        breakers = resilience.get_resilience_stats()['breakers']
+        self.assertEqual(breakers['localhost:5985/hosts']['state'], 'open')
+
+    def test_retry_budget(self):
+        budget = resilience.RetryBudget(ratio=0.5, min_retries_per_second=0)
+        for _ in range(4):
+            budget.record_request()
+        self.assertTrue(budget.try_acquire())
+        self.assertTrue(budget.try_acquire())
+        self.assertFalse(budget.try_acquire())
+
+    def test_retry_after_header(self):
+        policy = resilience.RetryPolicy(backoff_max=10)
+        response = requests.Response()
+        response.headers['Retry-After'] = '3'
+        self.assertEqual(policy.delay(0, response), 3)
+        response.headers['Retry-After'] = '300'
+        self.assertEqual(policy.delay(0, response), 10)
+        response.headers['Retry-After'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        self.assertEqual(policy.delay(0, response), 0)
+
+
+# I'm Py3
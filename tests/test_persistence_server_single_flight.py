@@ -0,0 +1,69 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import threading
+import time
+import unittest
+
+from faraday_client.persistence.server.single_flight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+
+    def _run_concurrently(self, single_flight, function, threads_count=10):
+        results = []
+        errors = []
+        started = threading.Barrier(threads_count)
+
+        def call():
+            started.wait()
+            try:
+                results.append(single_flight.do('key', function))
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=call) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_one_request(self):
+        calls = []
+
+        def slow_request():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'rows': [1, 2, 3]}
+
+        single_flight = SingleFlight()
+        results, errors = self._run_concurrently(single_flight, slow_request)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'rows': [1, 2, 3]}] * 10)
+        self.assertEqual(len(set(id(result) for result in results)), 10)
+        self.assertEqual(single_flight.stats(), {'executed': 1, 'saved': 9, 'in_flight': 0})
+
+    def test_waiters_get_the_exception(self):
+        def failing_request():
+            time.sleep(0.1)
+            raise ValueError('boom')
+
+        results, errors = self._run_concurrently(SingleFlight(), failing_request)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 10)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        single_flight = SingleFlight()
+        self.assertEqual(single_flight.do('key', lambda: 1), 1)
+        self.assertEqual(single_flight.do('key', lambda: 2), 2)
+        self.assertEqual(single_flight.stats()['saved'], 0)
+
+
+# I'm Py3
@@ -0,0 +1,104 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import re
+import math
+import unittest
+
+import responses
+
+from faraday_client.persistence.server import server
+from faraday_client.persistence.server.vuln_table import VulnTable, Mask, _timestamp, iter_vulns_by_id
+
+server.FARADAY_UP = False
+server.SERVER_URL = "http://localhost:5985"
+
+
+def vuln_row(vuln_id, name, severity='info', status='open', vuln_type='Vulnerability',
+             create_time='2020-01-01T00:00:00+00:00', target='10.0.0.1'):
+    return {'id': vuln_id, 'key': vuln_id, 'value': {
+        'id': vuln_id, 'name': name, 'severity': severity, 'status': status, 'type': vuln_type,
+        'target': target, 'metadata': {'create_time': create_time}}}
+
+
+class VulnTableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.table = VulnTable.from_rows([
+            vuln_row(1, 'ssl-cert', severity='Informational'),
+            vuln_row(2, 'SQL Injection', severity='high', vuln_type='VulnerabilityWeb',
+                     create_time='2020-06-01T00:00:00'),
+            vuln_row(3, 'ssl-date', severity='3', status='closed', target='10.0.0.2'),
+            vuln_row(4, 'XSS', severity='med', vuln_type='VulnerabilityWeb', create_time=None),
+            vuln_row(5, 'ssl-cert', severity='low', create_time=1577836800),
+        ])
+
+    def test_filters(self):
+        self.assertEqual(len(self.table), 5)
+        self.assertEqual(self.table.ids(self.table.name_matches(r'ssl\-')), [1, 3, 5])
+        self.assertEqual(self.table.ids(self.table.name_matches('sql', re.IGNORECASE)), [2])
+        self.assertEqual(self.table.ids(self.table.severity_in({'high'})), [2, 3])
+        self.assertEqual(self.table.ids(self.table.severity_in({'info', 'LOW'})), [1, 5])
+        self.assertEqual(self.table.ids(self.table.status_in({'closed'})), [3])
+        self.assertEqual(self.table.ids(self.table.type_in({'VulnerabilityWeb'})), [2, 4])
+        self.assertEqual(self.table.ids(self.table.target_in({'10.0.0.2'})), [3])
+        self.assertEqual(self.table.ids(self.table.created_before(1580000000)), [1, 3, 5])
+
+    def test_masks_combine(self):
+        ssl = self.table.name_matches('ssl')
+        closed = self.table.status_in({'closed'})
+        self.assertEqual(self.table.ids(ssl & ~closed), [1, 5])
+        self.assertEqual(self.table.ids(ssl | self.table.type_in({'VulnerabilityWeb'})), [1, 2, 3, 4, 5])
+        self.assertEqual((ssl & ~closed).count(), 2)
+        self.assertEqual((~ssl).indexes(), [1, 3])
+        self.assertEqual(self.table.all().count(), 5)
+        self.assertRaises(ValueError, lambda: ssl & Mask.all(2))
+
+    def test_values_and_group_by(self):
+        ssl = self.table.name_matches('ssl')
+        self.assertEqual(self.table.values('name', ssl), ['ssl-cert', 'ssl-date', 'ssl-cert'])
+        self.assertEqual(self.table.group_by('name'), {'ssl-cert': 2, 'ssl-date': 1,
+                                                       'SQL Injection': 1, 'XSS': 1})
+        self.assertEqual(self.table.group_by('severity', ssl), {'info': 1, 'high': 1, 'low': 1})
+        self.assertEqual(self.table.create_times(self.table.type_in({'VulnerabilityWeb'}))[0],
+                         1590969600.0)
+        self.assertRaises(ValueError, self.table.values, 'description')
+
+    def test_timestamps(self):
+        self.assertEqual(_timestamp('2020-01-01T00:00:00+00:00'), 1577836800.0)
+        self.assertEqual(_timestamp('2020-01-01T03:00:00+03:00'), 1577836800.0)
+        self.assertEqual(_timestamp('2020-01-01T00:00:00Z'), 1577836800.0)
+        self.assertEqual(_timestamp(1577836800), 1577836800.0)
+        self.assertTrue(math.isnan(_timestamp(None)))
+
+    def test_too_many_statuses(self):
+        rows = [vuln_row(i, 'vuln', status='status {0}'.format(i)) for i in range(257)]
+        self.assertRaises(ValueError, VulnTable.from_rows, rows)
+
+    @responses.activate
+    def test_from_workspace(self):
+        url = server._create_server_get_url('a_ws', 'vulns')
+        responses.add(responses.GET, url, json={'vulnerabilities': [
+            vuln_row(1, 'ssl-cert'), vuln_row(2, 'XSS', vuln_type='VulnerabilityWeb')], 'count': 2})
+        table = VulnTable.from_workspace('a_ws', page_size=0)
+        self.assertEqual(table.ids(table.type_in({'VulnerabilityWeb'})), [2])
+
+    @responses.activate
+    def test_iter_vulns_by_id(self):
+        url = server._create_server_get_url('a_ws', 'vulns')
+        rows = [vuln_row(1, 'ssl-cert'), vuln_row(2, 'XSS', vuln_type='VulnerabilityWeb'), vuln_row(3, 'ssl-date')]
+        for row in rows:
+            row['value'].update({'desc': 'a vuln', 'parent': 10, 'parent_type': 'Host', 'method': 'GET'})
+        responses.add(responses.GET, url, json={'vulnerabilities': rows, 'count': 3})
+        vulns = list(iter_vulns_by_id('a_ws', [2, 3], page_size=0))
+        self.assertEqual([(vuln.getID(), vuln.class_signature) for vuln in vulns],
+                         [(2, 'VulnerabilityWeb'), (3, 'Vulnerability')])
+        self.assertEqual(vulns[1].name, 'ssl-date')
+
+
+# I'm Py3
@@ -0,0 +1,89 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from faraday_plugins.plugins.manager import PluginsManager, CommandAnalyzer
+
+from faraday_client.plugins.command_dispatch import (
+    CommandDispatchIndex,
+    program_name,
+    regex_program_names,
+)
+
+COMMANDS = [
+    'nmap -sV 10.0.0.1', 'sudo nmap -p 80 x', './nmap -v x', 'masscan -p1 x', 'NMAP -v x', 'nmap',
+    'ls -la', 'git status', 'echo nmap -v',
+    'python dirsearch.py -u x', 'sudo python3 dirsearch.py -u x',
+    'nuclei -u x', 'lynis audit system', 'ping6 ::1', 'shodan search apache', 'shodan info',
+    'python pasteAnalyzer.py x', 'perl nikto.pl -h x', 'dnsmap example.com', 'whois x.com',
+]
+
+
+class ProgramNamesTests(unittest.TestCase):
+
+    def test_program_name(self):
+        self.assertEqual(program_name('sudo python3 ./dirsearch.py -u x'), 'dirsearch.py')
+        self.assertEqual(program_name('/usr/bin/NMAP -v'), 'nmap')
+        self.assertIsNone(program_name('sudo'))
+        self.assertIsNone(program_name(''))
+
+    def test_literal_prefixes_are_expanded(self):
+        self.assertEqual(regex_program_names(r'^(sudo nmap|nmap|\.\/nmap|sudo masscan|masscan)\s+.*?'),
+                         {'nmap', 'masscan'})
+        self.assertEqual(regex_program_names(r'^(sudo )?(python[0-9\.]? )?(dirsearch\.py)\s+?'),
+                         {'dirsearch.py'})
+        self.assertEqual(regex_program_names(r'^ping6?\s+'), {'ping', 'ping6'})
+
+    def test_regexes_which_cant_be_indexed(self):
+        # Any program
+        self.assertIsNone(regex_program_names(r'^(sudo nuclei|^.*?nuclei)\s+.*?'))
+        # Nothing after the program, it may be longer
+        self.assertIsNone(regex_program_names(r'^nmap'))
+        self.assertIsNone(regex_program_names(r'^nmap-?.*'))
+        # Only sudo
+        self.assertIsNone(regex_program_names(r'^(lynis|)\s+.*?'))
+        self.assertIsNone(regex_program_names(r'^python\s+.*?'))
+
+
+class CommandDispatchIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.plugins_manager = PluginsManager()
+
+    def setUp(self):
+        self.index = CommandDispatchIndex(self.plugins_manager)
+
+    def test_same_plugins_as_the_command_analyzer(self):
+        analyzer = CommandAnalyzer(self.plugins_manager)
+        for command in COMMANDS:
+            expected = analyzer.get_plugin(command)
+            dispatched = self.index.get_plugin(command)
+            self.assertEqual(dispatched and dispatched.id, expected and expected.id, command)
+
+    def test_only_candidates_are_created(self):
+        with mock.patch.object(self.plugins_manager, 'get_plugin',
+                               wraps=self.plugins_manager.get_plugin) as get_plugin:
+            self.assertEqual(self.index.get_plugin('nmap -sV 10.0.0.1').id, 'Nmap')
+        self.assertIn('nmap', [call[0][0] for call in get_plugin.call_args_list])
+        self.assertLess(get_plugin.call_count, len(list(self.plugins_manager.get_plugins())) / 4)
+
+    def test_plugins_are_created_for_every_command(self):
+        self.assertIsNot(self.index.get_plugin('nmap -v x'), self.index.get_plugin('nmap -v x'))
+
+    def test_build_again(self):
+        with mock.patch.object(self.plugins_manager, 'get_plugins', return_value=iter([])):
+            self.index.build()
+        self.assertIsNone(self.index.get_plugin('nmap -v x'))
+        self.index.build()
+        self.assertEqual(self.index.get_plugin('nmap -v x').id, 'Nmap')
+
+
+# I'm Py3
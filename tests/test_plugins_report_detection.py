@@ -0,0 +1,102 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import os
+import json
+import shutil
+import zipfile
+import tempfile
+import unittest
+from unittest import mock
+
+from faraday_plugins.plugins.manager import PluginsManager, ReportAnalyzer
+
+from faraday_client.plugins import report_detection
+from faraday_client.plugins.report_detection import ReportDetectionIndex, sniff_report
+
+REPORTS = {
+    'nmap.xml': b'<?xml version="1.0"?><!DOCTYPE nmaprun><nmaprun scanner="nmap"><host/></nmaprun>',
+    'scan.nessus': b'<?xml version="1.0" ?><NessusClientData_v2><Report/></NessusClientData_v2>',
+    'burp.xml': b'<?xml version="1.0"?><issues burpVersion="1"><issue/></issues>',
+    'nipper.xml': b'<document nipperstudio="2"><x/></document>',
+    'namespaced.xml': b'<ns:report xmlns:ns="http://example.com"/>',
+    'inspector.json': json.dumps({'findings': [{'x': 'y' * 40000}], 'other': 1}).encode(),
+    'crowdstrike.json': json.dumps([{'host_id': 1, 'host_type': 'x'}]).encode(),
+    'acunetix.json': json.dumps({'Generated': 'x', 'Vulnerabilities': ['z' * 100] * 1000, 'Target': {}}).encode(),
+    'hosts.csv': b'Host,Port,Name\n1,2,3\n',
+    'notes.txt': 'héllo wörld'.encode('utf8') * 5000,
+    'empty.xml': b'',
+    'nmap_faraday_nessus.xml': b'<nmaprun/>',
+    'nmap_faraday_unknown.xml': b'<?xml version="1.0"?><nmaprun/>',
+}
+
+
+class ReportDetectionIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.plugins_manager = PluginsManager()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = ReportDetectionIndex(self.plugins_manager)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as report:
+            report.write(content)
+        return path
+
+    def test_same_plugins_as_the_report_analyzer(self):
+        analyzer = ReportAnalyzer(self.plugins_manager)
+        paths = [self._write(name, content) for name, content in REPORTS.items()]
+        zip_path = os.path.join(self.directory, 'report.zip')
+        with zipfile.ZipFile(zip_path, 'w') as zip_file:
+            zip_file.writestr('report.txt', 'report')
+        for path in paths + [zip_path]:
+            expected = analyzer.get_plugin(path)
+            detected = self.index.get_plugin(path)
+            self.assertEqual(detected and detected.id, expected and expected.id, path)
+
+    def test_only_the_head_is_read(self):
+        path = self._write('scan.nessus', b'<NessusClientData_v2>' + b'<Report/>' * 1000000)
+        with mock.patch.object(report_detection, '_json_keys') as json_keys:
+            signature = sniff_report(path)
+        self.assertEqual(signature['main_tag'], 'NessusClientData_v2')
+        json_keys.assert_not_called()
+
+    def test_json_keys_after_a_long_value(self):
+        path = self._write('report.json', json.dumps({'a': 'x' * 100000, 'b': 1}).encode())
+        self.assertEqual(sniff_report(path)['file_json_keys'], {'a', 'b'})
+
+    def test_only_candidates_are_asked(self):
+        path = self._write('nmap.xml', REPORTS['nmap.xml'])
+        candidates = self.index.candidates('.xml', 'nmaprun')
+        self.assertIn('Nmap', [plugin.id for plugin in candidates])
+        self.assertLess(len(candidates), len(list(self.plugins_manager.get_plugins())) / 4)
+        self.assertEqual(self.index.get_plugin(path).id, 'Nmap')
+
+    def test_answers_are_cached_by_size_and_mtime(self):
+        path = self._write('nmap.xml', REPORTS['nmap.xml'])
+        with mock.patch.object(report_detection, 'sniff_report', wraps=sniff_report) as sniff:
+            self.index.get_plugin(path)
+            self.index.get_plugin(path)
+            self.assertEqual(sniff.call_count, 1)
+            self._write('nmap.xml', REPORTS['burp.xml'])
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(self.index.get_plugin(path).id, 'Burp')
+            self.assertEqual(sniff.call_count, 2)
+
+    def test_missing_reports(self):
+        self.assertIsNone(self.index.get_plugin(os.path.join(self.directory, 'missing.xml')))
+
+
+# I'm Py3
@@ -0,0 +1,117 @@
+'''
+Faraday Penetration Test IDE
+Copyright (C) 2020  Infobyte LLC (http://www.infobytesec.com/)
+See the file 'doc/LICENSE' for the license information
+
+'''
+from __future__ import absolute_import
+
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from faraday_client.plugins.plugin import PluginXMLFormat
+from faraday_client.plugins.report_stream import (
+    decode_report,
+    iter_xml_elements,
+    mapped_report,
+    parse_report,
+)
+
+
+class ReportHostsPlugin(PluginXMLFormat):
+
+    def __init__(self):
+        super().__init__()
+        self.id = 'ReportHosts'
+        self.stream_tags = ['ReportHost']
+        self.hosts = []
+
+    def parseElement(self, element):
+        self.hosts.append((element.get('name'), len(element.findall('ReportItem'))))
+
+
+class IterXMLElementsTests(unittest.TestCase):
+
+    def test_elements_are_yielded_complete_and_cleared(self):
+        stream = io.BytesIO(b'<Report><Policy/><ReportHost name="a"><ReportItem/><ReportItem/></ReportHost>'
+                            b'<ReportHost name="b"><ReportItem/></ReportHost></Report>')
+        seen = []
+        elements = []
+        for element in iter_xml_elements(stream, 'ReportHost'):
+            seen.append((element.get('name'), len(element)))
+            elements.append(element)
+        self.assertEqual(seen, [('a', 2), ('b', 1)])
+        self.assertEqual([len(element) for element in elements], [0, 0])
+
+    def test_nested_elements_stay_in_their_parent(self):
+        stream = io.BytesIO(b'<r><item id="1"><item id="2"/></item><item id="3"/></r>')
+        seen = [(element.get('id'), len(element)) for element in iter_xml_elements(stream, ['item'])]
+        self.assertEqual(seen, [('1', 1), ('3', 0)])
+
+    def test_memory_doesnt_depend_on_the_report_size(self):
+        def peak(hosts):
+            body = b''.join(b'<ReportHost name="h%d"><ReportItem port="80">%s</ReportItem></ReportHost>'
+                            % (i, b'x' * 200) for i in range(hosts))
+            stream = io.BytesIO(b'<Report>' + body + b'</Report>')
+            tracemalloc.start()
+            try:
+                for _ in iter_xml_elements(stream, 'ReportHost'):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        # 10 times the hosts, about the same memory
+        self.assertLess(peak(20000), 2 * peak(2000))
+
+
+class ParseReportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _report(self, content):
+        path = os.path.join(self.directory, 'report.xml')
+        with open(path, 'wb') as report:
+            report.write(content)
+        return path
+
+    def test_decode_report(self):
+        self.assertEqual(decode_report(self._report('<a>ñ</a>'.encode('utf8'))), '<a>ñ</a>')
+        self.assertEqual(decode_report(self._report(b'')), '')
+
+    def test_mapped_report_is_not_a_copy(self):
+        with mapped_report(self._report(b'<a/>')) as mapped:
+            self.assertEqual(mapped[:], b'<a/>')
+            self.assertNotIsInstance(mapped, bytes)
+
+    @mock.patch('faraday_client.plugins.plugin.CONF')
+    def test_streaming_plugins_get_the_elements(self, conf):
+        plugin = ReportHostsPlugin()
+        plugin.processOutput = mock.Mock()
+        parse_report(plugin, self._report(
+            b'<Report><ReportHost name="a"><ReportItem/></ReportHost><ReportHost name="b"/></Report>'))
+        self.assertEqual(plugin.hosts, [('a', 1), ('b', 0)])
+        plugin.processOutput.assert_not_called()
+
+    @mock.patch('faraday_client.plugins.plugin.CONF')
+    def test_xml_plugins_without_stream_tags_get_the_whole_report(self, conf):
+        plugin = PluginXMLFormat()
+        plugin.parseOutputString = mock.Mock()
+        parse_report(plugin, self._report(b'<Report/>'))
+        plugin.parseOutputString.assert_called_once_with('<Report/>')
+
+    def test_other_plugins_get_the_decoded_report(self):
+        plugin = mock.Mock(spec=['processOutput', 'get_json'])
+        parse_report(plugin, self._report(b'<Report/>'))
+        plugin.processOutput.assert_called_once_with('<Report/>')
+
+
+# I'm Py3
@@ -8,6 +8,7 @@ from __future__ import absolute_import
 
 import os
 import sys
+import json
 import unittest
 
 import responses
@@ -168,5 +169,39 @@ class ClientServerAPITests(unittest.TestCase):
         with self.assertRaises(server_io_exceptions.WrongObjectSignature):
             server.get_objects('a', 'not a signature')
 
+    @responses.activate
+    def test_iter_hosts_walks_the_pages(self):
+        rows = [{'id': i, 'value': {'name': str(i)}} for i in range(7)]
+
+        def hosts_page(request):
+            page = int(request.params['page'])
+            page_size = int(request.params['page_size'])
+            start = (page - 1) * page_size
+            body = {'count': len(rows), 'rows': rows[start:start + page_size]}
+            return 200, {}, json.dumps(body)
+
+        url = server._create_server_get_url('a_ws', 'hosts')
+        responses.add_callback(responses.GET, url, callback=hosts_page)
+        hosts = list(server.iter_hosts('a_ws', page_size=3))
+        self.assertEqual(hosts, rows)
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_iter_services_without_pagination_in_server(self):
+        rows = [{'id': i, 'value': {'name': str(i)}} for i in range(3)]
+        url = server._create_server_get_url('a_ws', 'services')
+        responses.add(responses.GET, url, json={'services': rows})
+        services = list(server.iter_services('a_ws', page_size=3))
+        self.assertEqual(services, rows)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_iter_vulns_in_a_single_streamed_response(self):
+        rows = [{'id': i, 'value': {'name': str(i)}} for i in range(10)]
+        url = server._create_server_get_url('a_ws', 'vulns')
+        responses.add(responses.GET, url, json={'vulnerabilities': rows, 'count': 10})
+        vulns = list(server.iter_vulns('a_ws', page_size=0, full_table=False))
+        self.assertEqual(vulns, [row['value'] for row in rows])
+        self.assertEqual(len(responses.calls), 1)
 
 # I'm Py3